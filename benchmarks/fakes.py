@@ -0,0 +1,172 @@
+"""
+Fakes - Gemini e Discord de mentira para medir o bot sem rede
+
+- FakeGeminiModel: mesmo "formato" do genai.GenerativeModel que o engine
+  usa (model_name, generate_content com e sem stream), com latência,
+  velocidade de geração e taxa de erro configuráveis
+- FakeUser / FakeGuild / FakeChannel / FakeMessage: só o que o
+  TesseraDiscordBot lê de uma mensagem (e o que ele chama para responder)
+
+O modelo falso BLOQUEIA a thread (time.sleep), exatamente como o SDK
+real: assim o benchmark mede também o scheduler e o pool de threads.
+
+Conceitos que você vai aprender aqui:
+- Test doubles (fakes) no lugar de serviços externos
+- Distribuição log-normal para latências (cauda longa, como na vida real)
+"""
+
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+_ANSWER_WORDS = (
+    "a matrícula deve ser feita pelo portal do aluno dentro do prazo previsto "
+    "no calendário acadêmico e os documentos necessários estão listados no edital"
+).split()
+
+
+class FakeResponse:
+    """Resposta (ou pedaço de resposta em streaming) do modelo falso."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.parts = [text] if text else []
+
+
+class FakeGeminiModel:
+    """
+    Stand-in local do Gemini.
+
+    A latência até o primeiro token segue uma log-normal com mediana
+    `latency_ms`; depois os tokens saem a `tokens_per_second`.
+    """
+
+    model_name = "fake-gemini"
+
+    def __init__(self, latency_ms: float = 800, latency_sigma: float = 0.5,
+                 tokens_per_second: float = 80, answer_tokens: int = 150,
+                 chunk_tokens: int = 8, error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency_ms: Mediana do tempo até o primeiro token
+            latency_sigma: Dispersão da log-normal (0 = latência fixa)
+            tokens_per_second: Velocidade de geração depois do primeiro token
+            answer_tokens: Tamanho de cada resposta (em palavras)
+            chunk_tokens: Palavras por pedaço no streaming
+            error_rate: Fração das chamadas que falham
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        # O modelo é chamado de várias threads do scheduler ao mesmo tempo
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _plan_call(self):
+        """Sorteia latência, resposta e falha de uma chamada."""
+        with self._lock:
+            self.calls += 1
+            latency = self.latency_ms / 1000 * self._rng.lognormvariate(0, self.latency_sigma)
+            fails = self._rng.random() < self.error_rate
+            if fails:
+                self.errors += 1
+            words = [self._rng.choice(_ANSWER_WORDS) for _ in range(self.answer_tokens)]
+        return latency, fails, words
+
+    def generate_content(self, prompt, stream: bool = False, generation_config=None, **kwargs):
+        latency, fails, words = self._plan_call()
+        time.sleep(latency)
+        if fails:
+            raise RuntimeError("503 Serviço indisponível (erro simulado)")
+
+        if stream:
+            return self._stream(words)
+
+        time.sleep(len(words) / self.tokens_per_second)
+        return FakeResponse(" ".join(words))
+
+    def _stream(self, words: List[str]):
+        for start in range(0, len(words), self.chunk_tokens):
+            chunk = words[start:start + self.chunk_tokens]
+            if start:
+                time.sleep(len(chunk) / self.tokens_per_second)
+            yield FakeResponse(" ".join(chunk) + " ")
+        # Como no Gemini: o último pedaço pode vir sem texto
+        yield FakeResponse("")
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str, bot: bool = False):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeSentMessage:
+    """Mensagem enviada pelo bot; registra as edições."""
+
+    def __init__(self, channel: "FakeChannel", embed):
+        self.channel = channel
+        self.embed = embed
+
+    async def edit(self, embed=None, **kwargs):
+        self.embed = embed
+        self.channel.edits += 1
+        self.channel.last_update_at = time.perf_counter()
+
+
+class FakeChannel:
+    """
+    Canal de uma única mensagem recebida: anota quando o bot respondeu.
+
+    first_send_at  -> o estudante viu o primeiro texto
+    last_update_at -> a resposta final ficou pronta
+    """
+
+    def __init__(self, channel_id: int, guild: Optional[FakeGuild]):
+        self.id = channel_id
+        self.guild = guild
+        self.sent: List[FakeSentMessage] = []
+        self.edits = 0
+        self.first_send_at: Optional[float] = None
+        self.last_update_at: Optional[float] = None
+
+    async def send(self, content=None, embed=None, **kwargs):
+        now = time.perf_counter()
+        if self.first_send_at is None:
+            self.first_send_at = now
+        self.last_update_at = now
+        message = FakeSentMessage(self, embed)
+        self.sent.append(message)
+        return message
+
+    @asynccontextmanager
+    async def typing(self):
+        yield
+
+
+class FakeMessage:
+    """Mensagem recebida (o que o on_message lê)."""
+
+    def __init__(self, author: FakeUser, content: str, guild: Optional[FakeGuild],
+                 channel: FakeChannel, mentions: Optional[List[FakeUser]] = None,
+                 clean_content: Optional[str] = None):
+        self.author = author
+        self.content = content
+        self.clean_content = clean_content if clean_content is not None else content
+        self.guild = guild
+        self.channel = channel
+        self.mentions = mentions or []
@@ -0,0 +1,288 @@
+"""
+Load Test - O bot inteiro sob carga, sem Discord e sem Gemini
+
+Monta um TesseraBotEngine com o modelo falso (benchmarks/fakes.py) e um
+TesseraDiscordBot que nunca conecta, e reproduz um fluxo sintético de
+eventos on_message: conversa entre estudantes, mensagens de outros
+bots e perguntas para o TesseraBot (algumas repetidas, como na vida real).
+
+Relatório:
+- Vazão (perguntas respondidas por segundo)
+- Latência p50/p95/p99 até o primeiro texto e até a resposta final
+- Atraso do event loop (quanto o loop ficou travado)
+- Memória (RSS atual e pico)
+
+Roda em qualquer Linux, sem rede:
+
+    python benchmarks/load_test.py --messages 3000 --rate 200 --latency-ms 600
+    python benchmarks/load_test.py --json resultado.json   # para comparar versões
+
+Conceitos que você vai aprender aqui:
+- Carga em "malha aberta" (chegadas de Poisson, não espera a resposta)
+- Percentis de latência (a média esconde a cauda)
+- Medir o atraso do event loop
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Adiciona o diretório raiz ao Python path para imports funcionarem
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.fakes import FakeChannel, FakeGeminiModel, FakeGuild, FakeMessage, FakeUser
+from src.core.metrics import percentile
+
+BOT_ID = 1100000000000000001
+BOT_NAME = "TesseraBot"
+
+_QUESTIONS = [
+    "quando começa a rematrícula", "quais documentos preciso para a matrícula",
+    "qual o prazo do edital de monitoria", "como trancar uma disciplina",
+    "onde vejo o calendário acadêmico", "como pedir aproveitamento de estudos",
+    "quando saem as notas finais", "qual o horário da secretaria",
+    "como solicitar o histórico escolar", "quando abre o edital de iniciação científica",
+]
+_CHATTER = (
+    "alguém sabe se a prova vai ser presencial galera o professor postou a lista "
+    "vou no ru depois da aula quem vai no grupo de estudos hoje o trabalho é em dupla"
+).split()
+
+
+def summarize_ms(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max em milissegundos."""
+    return {
+        name: round(percentile(values, fraction) * 1000, 1)
+        for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+    }
+
+
+def make_events(count: int, natural_fraction: float, bot_fraction: float,
+                distinct_questions: int, users: int, guilds: int, seed: int):
+    """
+    Gera o fluxo de mensagens.
+
+    As perguntas seguem uma distribuição tipo Zipf: poucas perguntas
+    muito repetidas (prazo da matrícula!) e uma cauda de perguntas raras.
+    """
+    rng = random.Random(seed)
+    students = [FakeUser(2000 + i, f"estudante{i}") for i in range(users)]
+    other_bot = FakeUser(42, "OutroBot", bot=True)
+    servers = [FakeGuild(900 + i) for i in range(guilds)]
+    questions = [
+        f"{_QUESTIONS[i % len(_QUESTIONS)]} ({i // len(_QUESTIONS)})" if i >= len(_QUESTIONS)
+        else _QUESTIONS[i]
+        for i in range(distinct_questions)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(questions))]
+
+    events = []
+    for _ in range(count):
+        guild = rng.choice(servers)
+        channel = FakeChannel(rng.randint(1, 50), guild)
+        roll = rng.random()
+        if roll < natural_fraction:
+            question = rng.choices(questions, weights)[0]
+            events.append(FakeMessage(
+                rng.choice(students), f"<@{BOT_ID}> {question}?", guild, channel,
+                clean_content=f"@{BOT_NAME} {question}?"
+            ))
+        elif roll < natural_fraction + bot_fraction:
+            events.append(FakeMessage(other_bot, "🎵 Tocando agora: lofi para estudar", guild, channel))
+        else:
+            text = " ".join(rng.choice(_CHATTER) for _ in range(rng.randint(3, 40)))
+            events.append(FakeMessage(rng.choice(students), text, guild, channel))
+    return events
+
+
+class LoopLagMonitor:
+    """Mede quanto cada `sleep(interval)` atrasou: é o tempo que o loop ficou ocupado."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+def configure_environment(args):
+    """Configura o engine via variáveis de ambiente (antes de importá-lo)."""
+    os.environ["GOOGLE_API_KEY"] = os.environ.get("GOOGLE_API_KEY") or "offline-benchmark"
+    os.environ["DISCORD_BOT_TOKEN"] = os.environ.get("DISCORD_BOT_TOKEN") or "offline-benchmark"
+    os.environ["INDEX_DIR"] = args.index_dir or str(Path(tempfile.gettempdir()) / "tessera-sem-indice")
+    os.environ["LLM_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    os.environ["STREAM_RESPONSES"] = "0" if args.no_stream else "1"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Cache em disco, log de perguntas e FAQ desligados: cada rodada começa fria e não suja data/
+    os.environ["CACHE_DB"] = ""
+    os.environ["QUESTION_LOG_DIR"] = ""
+    os.environ["FAQ_PATH"] = ""
+    if not args.with_admission:
+        # Sem limites: mede a capacidade bruta do bot
+        for name in ("ADMISSION_USER_PER_MINUTE", "ADMISSION_GUILD_PER_MINUTE", "ADMISSION_MAX_QUEUE"):
+            os.environ[name] = "0"
+
+
+async def run_load(args) -> Dict:
+    """Monta engine + adapter com fakes, dispara os eventos e mede."""
+    from src.adapters.discord_adapter import TesseraDiscordBot
+    from src.adapters.triage import MessageTriage
+    from src.core.bot_engine import TesseraBotEngine
+    from src.core.log import setup_logging
+    from src.core.vector_store import process_rss_bytes
+
+    setup_logging()
+
+    model = FakeGeminiModel(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second, answer_tokens=args.answer_tokens,
+        error_rate=args.error_rate, seed=args.seed
+    )
+    engine = TesseraBotEngine(model=model)
+    adapter = TesseraDiscordBot(engine=engine)
+    # Sem login o bot não sabe o próprio ID: a triagem é montada à mão
+    adapter._triage = MessageTriage(BOT_ID, prefix=adapter.bot_prefix,
+                                    channel_allowlist=adapter.channel_allowlist)
+
+    events = make_events(args.messages, args.natural_fraction, args.bot_fraction,
+                         args.distinct_questions, args.users, args.guilds, args.seed)
+    rng = random.Random(args.seed + 1)
+    rss_before = process_rss_bytes()
+
+    totals: List[float] = []
+    firsts: List[float] = []
+    failures = 0
+
+    async def deliver(message: FakeMessage):
+        nonlocal failures
+        started = time.perf_counter()
+        try:
+            await adapter.bot.on_message(message)
+        except Exception:
+            failures += 1
+            return
+        channel = message.channel
+        if channel.first_send_at is not None:
+            firsts.append(channel.first_send_at - started)
+            totals.append(channel.last_update_at - started)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    tasks = []
+    started = time.perf_counter()
+    next_at = started
+    for message in events:
+        # Chegadas de Poisson: intervalos exponenciais com média 1/rate
+        next_at += rng.expovariate(args.rate)
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(deliver(message)))
+    dispatched = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+
+    status = engine.get_status()
+    engine.close()
+
+    return {
+        "events": len(events),
+        "answered": len(totals),
+        "seconds": round(elapsed, 2),
+        "answers_per_second": round(len(totals) / elapsed, 2),
+        "events_per_second": round(len(events) / dispatched, 1),
+        "first_response_ms": summarize_ms(firsts),
+        "total_response_ms": summarize_ms(totals),
+        "event_loop_lag_ms": summarize_ms(monitor.lags),
+        "llm_calls": model.calls,
+        "llm_errors": model.errors,
+        "handler_failures": failures,
+        "cache_hits": status["response_cache"]["hits"] + status["response_cache"]["similar_hits"],
+        "coalesced": status["coalescing"]["coalesced"],
+        "shed": status["admission"]["shed"],
+        "rss_mb": round(process_rss_bytes() / 1024 / 1024, 1),
+        "rss_growth_mb": round((process_rss_bytes() - rss_before) / 1024 / 1024, 1),
+        # No Linux, ru_maxrss vem em KB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Relatório legível."""
+    def line(name, values):
+        return (f"   {name:<22} p50 {values['p50']:>8} • p95 {values['p95']:>8} • "
+                f"p99 {values['p99']:>8} • max {values['max']:>8} ms")
+
+    return "\n".join([
+        "=" * 70,
+        f"📨 {report['events']} eventos em {report['seconds']}s ({report['events_per_second']} eventos/s)",
+        f"💬 {report['answered']} respostas ({report['answers_per_second']} respostas/s)",
+        f"🤖 {report['llm_calls']} chamadas ao LLM ({report['llm_errors']} com erro) • "
+        f"cache: {report['cache_hits']} • agrupadas: {report['coalesced']} • recusadas: {report['shed']}",
+        "⏱️ Latência:",
+        line("primeiro texto", report["first_response_ms"]),
+        line("resposta completa", report["total_response_ms"]),
+        line("atraso do event loop", report["event_loop_lag_ms"]),
+        f"🧠 Memória: RSS {report['rss_mb']} MB (+{report['rss_growth_mb']} MB) • pico {report['peak_rss_mb']} MB",
+        "=" * 70,
+    ])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga offline do TesseraBot")
+    parser.add_argument("--messages", type=int, default=1500, help="Eventos on_message a disparar")
+    parser.add_argument("--rate", type=float, default=150, help="Eventos por segundo (média)")
+    parser.add_argument("--natural-fraction", type=float, default=0.05, help="Fração que são perguntas ao bot")
+    parser.add_argument("--bot-fraction", type=float, default=0.03, help="Fração vinda de outros bots")
+    parser.add_argument("--distinct-questions", type=int, default=40)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=300, help="Mediana até o primeiro token")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    parser.add_argument("--answer-tokens", type=int, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--no-stream", action="store_true", help="Desliga as respostas em streaming")
+    parser.add_argument("--with-admission", action="store_true",
+                        help="Mantém os limites ADMISSION_* do ambiente")
+    parser.add_argument("--index-dir", default=None, help="Índice de documentos (padrão: sem índice)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Também grava o relatório neste arquivo JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+    report = asyncio.run(run_load(args))
+    print(format_report(report))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Triage Benchmark - Quantas mensagens por segundo o bot consegue descartar?
+
+Gera um tráfego sintético parecido com o de um servidor grande
+(quase tudo conversa entre estudantes, algumas mensagens de bots,
+poucas perguntas para o TesseraBot) e mede a vazão de:
+
+- "antes": as verificações que o on_message fazia por mensagem
+  (mentioned_in, f-string da menção, lower() do texto inteiro)
+- "triagem": o MessageTriage pré-compilado
+- "triagem + allowlist": servidor com allowlist, mensagem fora dela
+
+Não precisa de Discord nem de chaves de API:
+
+    python benchmarks/triage_benchmark.py --messages 200000
+
+Conceitos que você vai aprender aqui:
+- Micro-benchmarks com time.perf_counter
+- Medir antes de otimizar (e depois, para provar)
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Adiciona o diretório raiz ao Python path para imports funcionarem
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.adapters.triage import IGNORE, MessageTriage
+
+BOT_ID = 1100000000000000001
+GUILD_ID = 900000000000000001
+ALLOWED_CHANNEL = 800000000000000001
+OTHER_CHANNEL = 800000000000000002
+
+_WORDS = (
+    "alguém sabe se a prova de cálculo vai ser presencial amanhã galera "
+    "o professor postou a lista no moodle vou no ru depois da aula kkkk "
+    "quem vai no grupo de estudos hoje à noite o trabalho é em dupla"
+).split()
+
+
+class _DMChannel:
+    """Só para o isinstance() do caminho antigo."""
+
+
+def make_messages(count: int, seed: int = 0):
+    """Tráfego sintético: 95% conversa, 3% bots, 1% perguntas, 1% comandos."""
+    rng = random.Random(seed)
+    bot_user = SimpleNamespace(id=BOT_ID, bot=True)
+    students = [SimpleNamespace(id=1000 + i, bot=False) for i in range(500)]
+    other_bot = SimpleNamespace(id=42, bot=True)
+    guild = SimpleNamespace(id=GUILD_ID)
+
+    messages = []
+    for _ in range(count):
+        roll = rng.random()
+        text = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 60)))
+        author = rng.choice(students)
+        mentions = []
+        if roll < 0.03:
+            author = other_bot
+        elif roll < 0.04:
+            text = f"<@{BOT_ID}> quando é a rematrícula?"
+            mentions = [bot_user]
+        elif roll < 0.05:
+            text = "!status"
+        channel = SimpleNamespace(id=rng.choice((ALLOWED_CHANNEL, OTHER_CHANNEL)))
+        messages.append(SimpleNamespace(
+            author=author, content=text, guild=guild, channel=channel,
+            mentions=mentions, mention_everyone=False,
+        ))
+    return messages, bot_user
+
+
+def legacy_classify(message, bot_user, prefix: str = "!") -> bool:
+    """As verificações do on_message antigo (sem os prints)."""
+    if message.author == bot_user or message.author.bot:
+        return False
+    is_mention = message.mention_everyone or any(user.id == bot_user.id for user in message.mentions)
+    is_command = message.content.startswith(prefix)
+    is_dm = isinstance(message.channel, _DMChannel)
+    bot_mentioned_text = f"<@{bot_user.id}>" in message.content
+    tesserabot_mentioned = "tesserabot" in message.content.lower()
+    return is_mention or is_dm or tesserabot_mentioned or bot_mentioned_text or is_command
+
+
+def measure(name: str, classify, messages, repeat: int):
+    """Roda `classify` sobre todas as mensagens e mostra a vazão."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            classify(message)
+        best = min(best, time.perf_counter() - started)
+    rate = len(messages) / best
+    print(f"{name:<22} {rate:>14,.0f} msg/s {best * 1e9 / len(messages):>10.0f} ns/msg")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede a vazão da triagem de mensagens")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    messages, bot_user = make_messages(args.messages)
+    triage = MessageTriage(BOT_ID, prefix="!")
+    with_allowlist = MessageTriage(BOT_ID, prefix="!", channel_allowlist={GUILD_ID: frozenset({ALLOWED_CHANNEL})})
+
+    ignored = sum(triage.classify(message) == IGNORE for message in messages)
+    print(f"📨 {len(messages)} mensagens sintéticas ({ignored / len(messages):.0%} descartadas)\n")
+
+    measure("antes", lambda message: legacy_classify(message, bot_user), messages, args.repeat)
+    measure("triagem", triage.classify, messages, args.repeat)
+    measure("triagem + allowlist", with_allowlist.classify, messages, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
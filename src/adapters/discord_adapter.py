@@ -14,17 +14,125 @@ Conceitos que você vai aprender:
 """
 
 import os
+import time
 import asyncio
+import logging
 from typing import Optional
 import discord
 from discord.ext import commands
-from dotenv import load_dotenv
 
 # Importa nosso Core Engine (independente de plataforma)
-from src.core.bot_engine import bot_engine, BotResponse
+from src.adapters.sharding import ShardAssignment, aggregate_status, read_status, write_status
+from src.adapters.triage import IGNORE, NATURAL, MessageTriage, parse_channel_allowlist
+from src.core.bot_engine import BotResponse, get_engine
+from src.core.log import fields, get_logger, sampled
+from src.core.metrics import metrics
 
-# Carrega configurações
-load_dotenv()
+logger = get_logger("discord")
+
+# Limite de caracteres da descrição de um embed no Discord
+EMBED_DESCRIPTION_LIMIT = 4096
+
+# Indicador de "ainda escrevendo" no fim das respostas parciais
+STREAM_CURSOR = " ▌"
+
+# Etapas mostradas no !status (nome da métrica -> rótulo)
+STATUS_STAGES = (
+    ("cache_lookup", "Cache"),
+    ("retrieval", "Busca"),
+    ("prompt_build", "Prompt"),
+    ("llm_queue_wait", "Fila"),
+    ("llm_call", "Gemini"),
+    ("discord_send", "Envio"),
+    ("request", "Total"),
+)
+
+
+def _fit_description(text: str, suffix: str = "") -> str:
+    """Corta o texto para caber na descrição do embed."""
+    limit = EMBED_DESCRIPTION_LIMIT - len(suffix)
+    if len(text) > limit:
+        text = text[:limit - 1] + "…"
+    return text + suffix
+
+
+class StreamingReply:
+    """
+    Uma resposta do Discord que vai sendo editada conforme o texto chega.
+    
+    Por que não editar a cada pedaço?
+    - O Discord limita edições por canal (rate limit): editar a cada
+      token faria o bot ser bloqueado temporariamente
+    - Então as edições são agrupadas: no máximo uma a cada
+      `min_interval` segundos, sempre com o texto mais recente
+    
+    Conceito: Coalescing (juntar várias atualizações numa só)
+    """
+    
+    def __init__(self, send_func, min_interval: float = 1.2):
+        """
+        Args:
+            send_func: Função para enviar (channel.send ou ctx.send)
+            min_interval: Intervalo mínimo entre edições da mensagem
+        """
+        self.send_func = send_func
+        self.min_interval = min_interval
+        self.message = None
+        self.edits = 0
+        self._text = ""
+        self._shown = ""
+        self._last_edit = 0.0
+        self._pending_flush: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+    
+    async def append(self, delta: str):
+        """Acrescenta texto novo; a mensagem é atualizada sem estourar o limite."""
+        self._text += delta
+        
+        if self.message is None:
+            # Primeiro pedaço: publica a mensagem na hora (é o que o estudante espera)
+            await self._flush()
+            return
+        
+        wait = self.min_interval - (time.monotonic() - self._last_edit)
+        if wait <= 0:
+            await self._flush()
+        elif self._pending_flush is None:
+            # Cedo demais: agenda UMA edição para quando for permitido
+            self._pending_flush = asyncio.ensure_future(self._flush_later(wait))
+    
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._pending_flush = None
+        await self._flush()
+    
+    async def _flush(self):
+        """Mostra o texto mais recente (se mudou desde a última edição)."""
+        async with self._lock:
+            if self._text == self._shown:
+                return
+            self._shown = self._text
+            embed = discord.Embed(description=_fit_description(self._text, STREAM_CURSOR), color=0x3498db)
+            with metrics.span("discord_send"):
+                if self.message is None:
+                    self.message = await self.send_func(embed=embed)
+                else:
+                    await self.message.edit(embed=embed)
+                    self.edits += 1
+            self._last_edit = time.monotonic()
+    
+    async def finish(self, embed: discord.Embed):
+        """Troca o texto parcial pela resposta final (com fontes no rodapé)."""
+        if self._pending_flush is not None:
+            self._pending_flush.cancel()
+            self._pending_flush = None
+        async with self._lock:
+            with metrics.span("discord_send"):
+                if self.message is None:
+                    self.message = await self.send_func(embed=embed)
+                else:
+                    await self.message.edit(embed=embed)
+                    self.edits += 1
 
 class TesseraDiscordBot:
     """
@@ -42,13 +150,42 @@ class TesseraDiscordBot:
     - NÃO processar IA (isso é do Core Engine)
     """
     
-    def __init__(self):
-        """Inicializa o bot Discord."""
+    def __init__(self, engine=None, discord_token: Optional[str] = None, prewarm: bool = False,
+                 shards: Optional[ShardAssignment] = None):
+        """
+        Inicializa o bot Discord.
+        
+        Args:
+            engine: Core Engine a usar (padrão: get_engine()).
+                Benchmarks e testes passam um engine com modelo falso.
+            discord_token: Token do bot (padrão: DISCORD_BOT_TOKEN)
+            prewarm: Aquece o engine em segundo plano assim que conectar
+                (índice, cache, modelo de embeddings)
+            shards: Shards deste processo no modo multi-processo (None =
+                processo único, um shard)
+        """
+        self.engine = engine or get_engine()
+        self.prewarm = prewarm
+        self._prewarm_task: Optional[asyncio.Task] = None
+        
+        # Modo multi-processo: cada worker publica o próprio status num
+        # arquivo e o !status soma os de todos (ver sharding.py)
+        self.shards = shards
+        self.shard_status_interval = float(os.getenv('SHARD_STATUS_SECONDS', '15'))
+        self._status_task: Optional[asyncio.Task] = None
         
         # Configurações do Discord
-        self.discord_token = os.getenv('DISCORD_BOT_TOKEN')
+        self.discord_token = discord_token or os.getenv('DISCORD_BOT_TOKEN')
         self.bot_prefix = os.getenv('BOT_PREFIX', '!')
         
+        # Streaming: a resposta aparece enquanto é gerada
+        self.stream_responses = os.getenv('STREAM_RESPONSES', '1') == '1'
+        self.stream_edit_interval = float(os.getenv('STREAM_EDIT_INTERVAL', '1.2'))
+        
+        # Triagem das mensagens: criada quando o ID do bot for conhecido
+        self.channel_allowlist = parse_channel_allowlist(os.getenv('DISCORD_CHANNEL_ALLOWLIST'))
+        self._triage: Optional[MessageTriage] = None
+        
         if not self.discord_token:
             raise ValueError("❌ DISCORD_BOT_TOKEN não encontrado no arquivo .env")
         
@@ -58,17 +195,27 @@ class TesseraDiscordBot:
         intents.message_content = True  # Necessário para ler mensagens (novo no Discord)
         
         # Cria o cliente Discord
-        self.bot = commands.Bot(
-            command_prefix=self.bot_prefix,
-            intents=intents,
-            help_command=None  # Vamos criar nosso próprio help
-        )
+        if shards is not None:
+            # Só os shards deste worker; os outros rodam nos outros processos
+            self.bot = commands.AutoShardedBot(
+                command_prefix=self.bot_prefix,
+                intents=intents,
+                help_command=None,
+                shard_ids=shards.shard_ids,
+                shard_count=shards.shard_count
+            )
+        else:
+            self.bot = commands.Bot(
+                command_prefix=self.bot_prefix,
+                intents=intents,
+                help_command=None  # Vamos criar nosso próprio help
+            )
         
         # Registra eventos
         self._setup_events()
         self._setup_commands()
         
-        print(f"✅ Discord Adapter configurado (prefix: {self.bot_prefix})")
+        logger.info("✅ Discord Adapter configurado (prefix: %s)", self.bot_prefix)
     
     def _setup_events(self):
         """
@@ -82,8 +229,14 @@ class TesseraDiscordBot:
         @self.bot.event
         async def on_ready():
             """Executado quando o bot conecta com sucesso."""
-            print(f"🤖 {self.bot.user} conectado ao Discord!")
-            print(f"📊 Conectado a {len(self.bot.guilds)} servidor(es)")
+            logger.info("🤖 %s conectado ao Discord!", self.bot.user, extra=fields(guilds=len(self.bot.guilds)))
+            self._build_triage()
+            
+            # on_ready dispara de novo a cada reconexão: aquece uma vez só
+            if self.prewarm and self._prewarm_task is None:
+                self._prewarm_task = asyncio.create_task(self._prewarm_engine())
+            if self.shards is not None and self._status_task is None:
+                self._status_task = asyncio.create_task(self._publish_status_loop())
             
             # Define status do bot
             activity = discord.Activity(
@@ -99,45 +252,31 @@ class TesseraDiscordBot:
             
             Args:
                 message: Objeto Message do Discord com todos os dados
-            """
             
-            print(f"📩 Mensagem recebida: '{message.content}' de {message.author}")
+            Caminho quente: roda para TODA mensagem de todo canal que o bot
+            vê. Por isso nada de print() aqui - os logs de debug são
+            amostrados e, em produção (INFO), nem chegam a ser montados.
+            A decisão em si fica na triagem pré-compilada (ver triage.py).
+            """
             
-            # Ignora mensagens do próprio bot (evita loops infinitos!)
-            if message.author == self.bot.user:
-                print("🚫 Ignorando mensagem do próprio bot")
-                return
+            kind = (self._triage or self._build_triage()).classify(message)
             
-            # Ignora bots (opcional)
-            if message.author.bot:
-                print("🚫 Ignorando mensagem de outro bot")
+            if kind == IGNORE:
                 return
             
-            # Se a mensagem menciona o bot OU começa com o prefix
-            is_mention = self.bot.user.mentioned_in(message)
-            is_command = message.content.startswith(self.bot_prefix)
-            is_dm = isinstance(message.channel, discord.DMChannel)
-            
-            # Verifica se menciona o bot de outras formas
-            bot_mentioned_text = f"<@{self.bot.user.id}>" in message.content
-            tesserabot_mentioned = "tesserabot" in message.content.lower()
-            
-            print(f"🔍 Análise detalhada:")
-            print(f"  - is_mention: {is_mention}")
-            print(f"  - is_command: {is_command}")
-            print(f"  - is_dm: {is_dm}")
-            print(f"  - bot_mentioned_text: {bot_mentioned_text}")
-            print(f"  - tesserabot_mentioned: {tesserabot_mentioned}")
-            print(f"  - message.content: '{message.content}'")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📩 Mensagem recebida", extra=sampled(
+                    user_id=message.author.id,
+                    guild=message.guild.id if message.guild else None,
+                    natural=kind == NATURAL
+                ))
             
             # Processa mensagem natural (sem comandos)
-            if is_mention or is_dm or tesserabot_mentioned or bot_mentioned_text:
-                print("💬 Processando como mensagem natural")
+            if kind == NATURAL:
                 await self._handle_natural_message(message)
                 return
             
             # Processa comandos normalmente
-            print("⚡ Processando como comando")
             await self.bot.process_commands(message)
         
         @self.bot.event
@@ -146,7 +285,7 @@ class TesseraDiscordBot:
             if isinstance(error, commands.CommandNotFound):
                 await ctx.send("🤔 Comando não encontrado. Use `!help` para ver comandos disponíveis.")
             else:
-                print(f"❌ Erro no comando: {error}")
+                logger.error("❌ Erro no comando: %s", error, extra=fields(command=ctx.invoked_with))
                 await ctx.send("😅 Ops! Algo deu errado. Tente novamente.")
     
     def _setup_commands(self):
@@ -163,7 +302,7 @@ class TesseraDiscordBot:
         async def status_command(ctx):
             """Mostra status do bot."""
             
-            engine_status = bot_engine.get_status()
+            engine_status = await self.engine.fetch_status()
             
             embed = discord.Embed(
                 title="📊 Status do TesseraBot",
@@ -176,18 +315,107 @@ class TesseraDiscordBot:
                 inline=True
             )
             
+            if not engine_status['has_api_key']:
+                gemini_status = "❌ Sem chave"
+            elif engine_status['llm_client']['breaker']['state'] == 'open':
+                gemini_status = "⚠️ Instável (circuito aberto)"
+            else:
+                gemini_status = "✅ Conectada"
             embed.add_field(
                 name="API Gemini",
-                value="✅ Conectada" if engine_status['has_api_key'] else "❌ Sem chave",
+                value=gemini_status,
                 inline=True
             )
             
+            cluster = await self._cluster_status()
             embed.add_field(
                 name="Servidores",
-                value=f"{len(self.bot.guilds)}",
+                value=f"{cluster['guilds']} ({len(self.bot.guilds)} neste processo)"
+                      if cluster else f"{len(self.bot.guilds)}",
                 inline=True
             )
-            
+
+            scheduler = engine_status['llm_scheduler']
+            embed.add_field(
+                name="Fila LLM",
+                value=f"{scheduler['in_flight']}/{scheduler['max_in_flight']} em execução\n"
+                      f"{scheduler['queue_depth']} aguardando\n"
+                      f"Espera média: {scheduler['avg_wait_ms']} ms\n"
+                      f"1º texto (p95): {engine_status['streaming']['p95_first_token_ms']} ms\n"
+                      f"Recusadas por excesso: {engine_status['admission']['shed']}\n"
+                      f"Retries: {engine_status['llm_client']['retries']} • Hedges: {engine_status['llm_client']['hedged']}\n"
+                      f"Tokens: {engine_status['tokens']['input_tokens']} entrada • "
+                      f"{engine_status['tokens']['output_tokens']} saída "
+                      f"(média {engine_status['tokens']['avg_input_tokens']} / {engine_status['tokens']['avg_output_tokens']})",
+                inline=True
+            )
+
+            routing = engine_status['routing']
+            decisions = routing['decisions']
+            embed.add_field(
+                name="Roteamento",
+                value=(f"Saudações: {decisions.get('greeting', 0)} • Consultas: {decisions.get('lookup', 0)} • "
+                       f"Complexas: {decisions.get('complex', 0)}\n"
+                       + "\n".join(
+                           f"{name}: {tier['in_flight']}/{tier['max_in_flight']} • p95 {tier['p95_latency_ms']} ms"
+                           for name, tier in routing['tiers'].items()
+                       )) if routing['enabled'] else "Desligado (tudo no modelo completo)",
+                inline=True
+            )
+
+            cache = engine_status['response_cache']
+            embed.add_field(
+                name="Cache de Respostas",
+                value=f"{cache['entries']} respostas\n"
+                      f"Acertos: {cache['hits'] + cache['similar_hits']} • Erros: {cache['misses']}\n"
+                      f"Remoções: {cache['evictions']}\n"
+                      f"Perguntas agrupadas: {engine_status['coalescing']['coalesced']}\n"
+                      f"Conversas lembradas: {engine_status['conversations']['users']}"
+                      + (f"\nDisco: {engine_status['persistent_cache']['hits']} acertos"
+                         if engine_status['persistent_cache'] else "")
+                      + (f"\nFAQ: {engine_status['faq']['entries']} perguntas • {engine_status['faq']['hits']} acertos"
+                         if engine_status['faq'] else ""),
+                inline=True
+            )
+
+            index = engine_status['vector_index']
+            embed.add_field(
+                name="Documentos",
+                value=f"{index['chunks']} trechos (carregado em {index['load_ms']} ms)\n"
+                      f"Geração: {index['generation'] or 'única'} • Trocas: {index['reloads']}\n"
+                      f"Mapeado: {index['mapped_mb']} MB • RSS: {index['process_rss_mb']} MB\n"
+                      f"Respostas diretas (sem IA): {engine_status['extractive']['served']}"
+                      if index['loaded'] else "Índice ainda não carregado",
+                inline=True
+            )
+
+            if cluster:
+                worker_lines = [
+                    f"{'✅' if snapshot['online'] else '❌'} #{snapshot['worker']} "
+                    f"(shards {', '.join(map(str, snapshot['shard_ids']))}): "
+                    f"{snapshot['guilds']} servidores • {snapshot['latency_ms'] or '?'} ms"
+                    for snapshot in cluster['snapshots']
+                ]
+                embed.add_field(
+                    name=f"Processos ({cluster['online']}/{cluster['workers']} online)",
+                    value="\n".join(worker_lines) + "\n"
+                          f"Total: {cluster['requests']} perguntas • {cluster['llm_calls']} chamadas ao Gemini\n"
+                          f"Tokens: {cluster['input_tokens']} entrada • {cluster['output_tokens']} saída\n"
+                          f"Cache: {cluster['cache_hits']} acertos • Recusadas: {cluster['shed']} • RSS: {cluster['rss_mb']} MB",
+                    inline=False
+                )
+
+            stages = engine_status['stages']
+            stage_lines = [
+                f"{label}: {stages[stage]['p50_ms']} / {stages[stage]['p95_ms']} ms"
+                for stage, label in STATUS_STAGES if stage in stages
+            ]
+            embed.add_field(
+                name="Tempo por etapa (p50 / p95)",
+                value="\n".join(stage_lines) or "Nenhuma pergunta ainda",
+                inline=False
+            )
+
             await ctx.send(embed=embed)
         
         @self.bot.command(name='help', aliases=['ajuda'])
@@ -232,11 +460,11 @@ class TesseraDiscordBot:
         async def test_command(ctx, *, message="Olá! Como você pode me ajudar?"):
             """Testa o Core Engine."""
             
-            print(f"🧪 Comando test executado: '{message}'")
+            logger.debug("🧪 Comando test executado", extra=fields(user_id=ctx.author.id))
             
             # Mostra que está processando
             async with ctx.typing():
-                response = await self._process_with_engine(message, ctx.author)
+                response = await self._process_with_engine(message, ctx.author, ctx.guild)
             
             await self._send_response(ctx.send, response)
         
@@ -251,6 +479,15 @@ class TesseraDiscordBot:
             
             await ctx.send(embed=embed)
     
+    def _build_triage(self) -> MessageTriage:
+        """Compila a triagem (precisa do ID do bot, conhecido após o login)."""
+        self._triage = MessageTriage(
+            self.bot.user.id,
+            prefix=self.bot_prefix,
+            channel_allowlist=self.channel_allowlist
+        )
+        return self._triage
+    
     async def _handle_natural_message(self, message):
         """
         Processa mensagem natural (sem comando).
@@ -264,27 +501,76 @@ class TesseraDiscordBot:
         if clean_content.lower().startswith('tesserabot'):
             clean_content = clean_content[10:].strip()  # Remove "tesserabot"
         
-        # Mostra que está "pensando" (boa UX!)
-        async with message.channel.typing():
-            response = await self._process_with_engine(clean_content, message.author)
+        started = time.perf_counter()
+        
+        if self.stream_responses:
+            response = await self._stream_with_engine(message.channel, clean_content, message.author, message.guild)
+        else:
+            # Mostra que está "pensando" (boa UX!)
+            async with message.channel.typing():
+                response = await self._process_with_engine(clean_content, message.author, message.guild)
+            
+            await self._send_response(message.channel.send, response)
         
-        await self._send_response(message.channel.send, response)
+        logger.info("💬 Pergunta respondida", extra=fields(
+            user_id=message.author.id,
+            guild=message.guild.id if message.guild else None,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            cached=response.cached,
+            streamed=self.stream_responses,
+            error=response.error
+        ))
     
-    async def _process_with_engine(self, text: str, author) -> BotResponse:
+    async def _stream_with_engine(self, channel, text: str, author, guild=None) -> BotResponse:
+        """
+        Responde em streaming: publica o primeiro pedaço assim que chega
+        e edita a mensagem conforme o resto da resposta é gerado.
+        
+        O "digitando..." fica ativo só até o primeiro pedaço aparecer.
+        """
+        reply = StreamingReply(channel.send, self.stream_edit_interval)
+        response = None
+        
+        async with channel.typing():
+            events = self.engine.stream_message(text, self._build_user_context(author, guild))
+            async for event in events:
+                if event.done:
+                    response = event.response
+                    break
+                await reply.append(event.delta)
+                if reply.message is not None:
+                    break
+        
+        # Primeiro pedaço publicado: o resto chega sem o "digitando..."
+        if response is None:
+            async for event in events:
+                if event.done:
+                    response = event.response
+                    break
+                await reply.append(event.delta)
+        
+        await reply.finish(self._build_embed(response))
+        return response
+    
+    async def _process_with_engine(self, text: str, author, guild=None) -> BotResponse:
         """
         Processa texto usando o Core Engine.
         
         Esta é a ponte entre Discord e nosso Core Engine!
         """
         
-        user_context = {
+        # Aqui é onde a mágica acontece: chama o Core Engine!
+        return await self.engine.process_message(text, self._build_user_context(author, guild))
+    
+    @staticmethod
+    def _build_user_context(author, guild=None) -> dict:
+        """Contexto do usuário enviado ao Core Engine (guild=None em DMs)."""
+        return {
             'username': author.display_name,
             'user_id': str(author.id),
+            'guild_id': str(guild.id) if guild is not None else None,
             'platform': 'discord'
         }
-        
-        # Aqui é onde a mágica acontece: chama o Core Engine!
-        return await bot_engine.process_message(text, user_context)
     
     async def _send_response(self, send_func, response: BotResponse):
         """
@@ -294,56 +580,139 @@ class TesseraDiscordBot:
             send_func: Função para enviar (channel.send ou ctx.send)
             response: Resposta do Core Engine
         """
+        with metrics.span("discord_send"):
+            await send_func(embed=self._build_embed(response))
+    
+    @staticmethod
+    def _build_embed(response: BotResponse) -> discord.Embed:
+        """Formata a resposta final do Core Engine como embed."""
+        
+        if response.retry_after is not None:
+            # Pergunta recusada por excesso de perguntas: não é um erro do bot
+            return discord.Embed(
+                title="⏳ Calma aí!",
+                description=response.content,
+                color=0xf39c12
+            )
         
         if response.error:
             # Se houve erro, envia mensagem de erro amigável
-            embed = discord.Embed(
+            return discord.Embed(
                 title="❌ Erro",
                 description=response.content,
                 color=0xff0000
             )
-            await send_func(embed=embed)
-            return
         
         # Resposta normal
         embed = discord.Embed(
-            description=response.content,
+            description=_fit_description(response.content),
             color=0x3498db,
             timestamp=response.timestamp
         )
         
-        # Adiciona fontes se existirem
+        # Adiciona fontes (e se veio do cache) no rodapé
+        footer_parts = []
         if response.sources:
-            embed.set_footer(text=f"Fontes: {', '.join(response.sources)}")
+            footer_parts.append(f"Fontes: {', '.join(response.sources)}")
+        if response.cached:
+            footer_parts.append("⚡ Resposta em cache")
+        if response.faq:
+            footer_parts.append("📌 Pergunta frequente")
+        if footer_parts:
+            embed.set_footer(text=" • ".join(footer_parts))
+        
+        return embed
+    
+    async def _prewarm_engine(self):
+        """
+        Aquece o engine com o bot já online.
+        
+        Por que depois de conectar?
+        - O bot aparece online em segundos, mesmo num restart no meio de
+          um incidente
+        - Perguntas que chegarem antes do fim só esperam o índice (o
+          engine carrega sob demanda o que ainda faltar)
+        """
+        started = time.perf_counter()
+        try:
+            await self.engine.warmup()
+        except Exception as e:
+            logger.warning("⚠️ Falha ao aquecer o engine: %s", e)
+            return
+        logger.info("🔥 Engine aquecido", extra=fields(
+            warmup_ms=round((time.perf_counter() - started) * 1000, 1)
+        ))
+    
+    async def _publish_status(self):
+        """Grava o status deste worker para os outros lerem."""
+        engine_status = await self.engine.fetch_status()
+        await asyncio.to_thread(
+            write_status, self.shards, len(self.bot.guilds), self.bot.latency, engine_status
+        )
+    
+    async def _publish_status_loop(self):
+        while True:
+            try:
+                await self._publish_status()
+            except OSError as e:
+                logger.warning("⚠️ Falha ao gravar status do worker: %s", e)
+            await asyncio.sleep(self.shard_status_interval)
+    
+    async def _cluster_status(self) -> Optional[dict]:
+        """
+        Status somado de todos os workers (None no modo processo único).
         
-        await send_func(embed=embed)
+        O deste worker é regravado antes, para o !status não mostrar
+        números de até SHARD_STATUS_SECONDS atrás.
+        """
+        if self.shards is None:
+            return None
+        try:
+            await self._publish_status()
+        except OSError as e:
+            logger.warning("⚠️ Falha ao gravar status do worker: %s", e)
+        # Sem atualizar há 3 intervalos = worker caído ou travado
+        snapshots = await asyncio.to_thread(
+            read_status, self.shards.status_dir, self.shard_status_interval * 3
+        )
+        return {**aggregate_status(snapshots), "snapshots": snapshots}
     
     async def start(self):
         """Inicia o bot Discord."""
         try:
-            print("🚀 Iniciando TesseraBot...")
+            logger.info("🚀 Iniciando TesseraBot...")
             await self.bot.start(self.discord_token)
         except Exception as e:
-            print(f"❌ Erro ao iniciar bot Discord: {e}")
+            logger.error("❌ Erro ao iniciar bot Discord: %s", e)
             raise
     
     async def stop(self):
         """Para o bot Discord."""
+        for task in (self._prewarm_task, self._status_task):
+            if task is not None and not task.done():
+                task.cancel()
         await self.bot.close()
-        print("🛑 Bot Discord desconectado")
+        logger.info("🛑 Bot Discord desconectado")
 
 # Função para executar o bot (será chamada do main.py)
-async def run_discord_bot():
-    """Função principal para executar o bot Discord."""
+async def run_discord_bot(engine=None, prewarm: bool = False, shards: Optional[ShardAssignment] = None):
+    """
+    Função principal para executar o bot Discord.
+    
+    Args:
+        engine: Core Engine já criado pelo main.py (padrão: get_engine())
+        prewarm: Aquece o engine em segundo plano depois de conectar
+        shards: Shards deste worker (modo multi-processo, ver sharding.py)
+    """
     
-    discord_bot = TesseraDiscordBot()
+    discord_bot = TesseraDiscordBot(engine=engine, prewarm=prewarm, shards=shards)
     
     try:
         await discord_bot.start()
     except KeyboardInterrupt:
-        print("\n⏹️ Interrompido pelo usuário")
+        logger.info("⏹️ Interrompido pelo usuário")
         await discord_bot.stop()
     except Exception as e:
-        print(f"❌ Erro crítico: {e}")
+        logger.error("❌ Erro crítico: %s", e)
         await discord_bot.stop()
         raise
\ No newline at end of file
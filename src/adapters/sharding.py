@@ -0,0 +1,292 @@
+"""
+Sharding - Vários processos do bot, cada um com parte dos servidores
+
+Um `commands.Bot` roda num processo só: todos os servidores dividem um
+event loop e um núcleo de CPU. O Discord resolve isso com shards (cada
+conexão do gateway atende uma fatia dos servidores); aqui cada processo
+roda alguns shards:
+
+    main.py (supervisor)
+    ├── worker 0  ->  shards 0, 2   (AutoShardedBot + engine próprio)
+    └── worker 1  ->  shards 1, 3
+
+O que os workers dividem fica em disco: índice (mmap), cache SQLite,
+FAQ e log de perguntas. O que é de cada um (fila do LLM, cache em
+memória) aparece no !status somado a partir de arquivos de status:
+
+    data/shards/worker-0.json   # reescrito a cada SHARD_STATUS_SECONDS
+
+O supervisor não carrega engine nem Discord: só sobe os workers e
+reinicia quem cair (com espera crescente, para não entrar em loop).
+
+Conceitos que você vai aprender aqui:
+- Sharding do gateway do Discord (shard_ids / shard_count)
+- Supervisor de processos com backoff exponencial
+- Estado agregado via arquivos (sem servidor central)
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.log import fields, get_logger
+from src.ingestion.manifest import atomic_write_text
+
+logger = get_logger("shards")
+
+# Arquivos de status dos workers (um por worker: worker-0.json, ...)
+STATUS_PREFIX = "worker-"
+STATUS_SUFFIX = ".json"
+
+# Um worker que caiu antes disso conta como "crash em loop" (backoff cresce)
+STABLE_SECONDS = 60
+
+
+def shard_ids_for(worker: int, workers: int, shard_count: int) -> List[int]:
+    """Shards de um worker (intercalados: 0, N, 2N... ficam no worker 0)."""
+    return [shard for shard in range(shard_count) if shard % workers == worker]
+
+
+@dataclass
+class ShardAssignment:
+    """Os shards de um worker e onde ele publica o próprio status."""
+    worker: int
+    shard_ids: List[int]
+    shard_count: int
+    status_dir: Path
+
+    @property
+    def status_file(self) -> Path:
+        return Path(self.status_dir) / f"{STATUS_PREFIX}{self.worker}{STATUS_SUFFIX}"
+
+
+def write_status(assignment: ShardAssignment, guilds: int, latency: float, engine_status: Dict[str, Any]):
+    """Grava o status de um worker (atômico: quem lê nunca vê arquivo pela metade)."""
+    snapshot = {
+        "worker": assignment.worker,
+        "pid": os.getpid(),
+        "shard_ids": assignment.shard_ids,
+        "shard_count": assignment.shard_count,
+        "guilds": guilds,
+        # latency é inf/nan enquanto o gateway não respondeu o 1º heartbeat
+        "latency_ms": round(latency * 1000, 1) if latency == latency and latency != float("inf") else None,
+        "updated_at": time.time(),
+        "engine": engine_status,
+    }
+    atomic_write_text(assignment.status_file, json.dumps(snapshot, ensure_ascii=False, default=str))
+
+
+def read_status(status_dir: Path, max_age: float) -> List[Dict[str, Any]]:
+    """
+    Status de todos os workers (ordenados), marcando os desatualizados.
+
+    Um arquivo com mais de `max_age` segundos é de um worker que caiu ou
+    travou: entra na lista com "online": False.
+    """
+    now = time.time()
+    snapshots = []
+    for path in sorted(Path(status_dir).glob(f"{STATUS_PREFIX}*{STATUS_SUFFIX}")):
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        snapshot["online"] = now - snapshot.get("updated_at", 0) <= max_age
+        snapshots.append(snapshot)
+    return sorted(snapshots, key=lambda snapshot: snapshot.get("worker", 0))
+
+
+def aggregate_status(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Soma os números de todos os workers online (para o !status)."""
+    online = [snapshot for snapshot in snapshots if snapshot["online"]]
+
+    def total(getter) -> int:
+        values = []
+        for snapshot in online:
+            try:
+                values.append(getter(snapshot["engine"]) or 0)
+            except (KeyError, TypeError):
+                continue
+        return sum(values)
+
+    return {
+        "workers": len(snapshots),
+        "online": len(online),
+        "shards": sum(len(snapshot["shard_ids"]) for snapshot in online),
+        "guilds": sum(snapshot["guilds"] for snapshot in online),
+        "requests": total(lambda engine: engine["stages"].get("request", {}).get("count")),
+        "llm_calls": total(lambda engine: sum(tier["calls"] for tier in engine["routing"]["tiers"].values())),
+        "input_tokens": total(lambda engine: engine["tokens"]["input_tokens"]),
+        "output_tokens": total(lambda engine: engine["tokens"]["output_tokens"]),
+        "cache_hits": total(lambda engine: engine["response_cache"]["hits"] + engine["response_cache"]["similar_hits"]),
+        "shed": total(lambda engine: engine["admission"]["shed"]),
+        "rss_mb": round(total(lambda engine: engine["vector_index"]["process_rss_mb"]), 1),
+    }
+
+
+def _worker_main(assignment: ShardAssignment, prewarm: bool):
+    """Processo de um worker: engine próprio + AutoShardedBot com seus shards."""
+    # SIGTERM do supervisor vira KeyboardInterrupt: o engine fecha direito
+    # (log de perguntas, worker de embeddings) em vez de morrer no meio
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    from src.core.log import setup_logging
+    setup_logging()
+    try:
+        sys.exit(asyncio.run(_run_worker(assignment, prewarm)))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+async def _run_worker(assignment: ShardAssignment, prewarm: bool) -> int:
+    from src.adapters.discord_adapter import run_discord_bot
+    from src.service.client import open_engine
+
+    # Com ENGINE_SERVICE, os workers dividem um engine só (ver src/service/)
+    try:
+        engine = await open_engine()
+    except ConnectionError as e:
+        logger.error("❌ %s", e, extra=fields(worker=assignment.worker))
+        return 1
+    if not engine.is_initialized:
+        logger.error("❌ Core Engine não inicializou no worker", extra=fields(worker=assignment.worker))
+        return 1
+
+    # Cada worker tem o próprio endpoint de métricas: METRICS_PORT + worker
+    metrics_port = int(os.getenv('METRICS_PORT', '0'))
+    if metrics_port:
+        from src.core.metrics import metrics, start_metrics_server
+        await start_metrics_server(metrics, os.getenv('METRICS_HOST', '127.0.0.1'), metrics_port + assignment.worker)
+
+    try:
+        await run_discord_bot(engine, prewarm=prewarm, shards=assignment)
+    finally:
+        engine.close()
+    return 0
+
+
+class ShardSupervisor:
+    """
+    Sobe os workers e os mantém vivos.
+
+    Uso:
+        supervisor = ShardSupervisor(workers=2, shard_count=4, status_dir=Path("data/shards"))
+        await supervisor.run()      # até Ctrl+C / SIGTERM
+    """
+
+    def __init__(self, workers: int, shard_count: int, status_dir: Path,
+                 prewarm: bool = True, max_restart_delay: float = 60.0):
+        """
+        Args:
+            workers: Quantidade de processos
+            shard_count: Total de shards (>= workers; o Discord exige ao
+                menos 1 shard a cada 2500 servidores)
+            status_dir: Pasta dos arquivos de status dos workers
+            prewarm: Workers aquecem o engine depois de conectar
+            max_restart_delay: Espera máxima antes de reiniciar um worker
+        """
+        if shard_count < workers:
+            raise ValueError(f"SHARD_COUNT ({shard_count}) menor que SHARD_WORKERS ({workers})")
+        self.workers = workers
+        self.shard_count = shard_count
+        self.status_dir = Path(status_dir)
+        self.prewarm = prewarm
+        self.max_restart_delay = max_restart_delay
+
+        # "spawn": cada worker começa limpo (sem loop, sockets ou threads herdados)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, Any] = {}
+        self._started_at: Dict[int, float] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._crashes: Dict[int, int] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        self._stats = {"starts": 0, "restarts": 0}
+
+    async def run(self) -> int:
+        """Sobe todos os workers e reinicia os que caírem até receber um sinal de parada."""
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self._stopping.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: só Ctrl+C
+
+        self.status_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.status_dir.glob(f"{STATUS_PREFIX}*{STATUS_SUFFIX}"):
+            path.unlink()  # Status de uma execução anterior (talvez com outro número de workers)
+
+        logger.info("🧩 Iniciando workers", extra=fields(workers=self.workers, shards=self.shard_count))
+        try:
+            for worker in range(self.workers):
+                self._start(worker)
+            while not self._stopping.is_set():
+                self._check_workers()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.stop()
+        return 0
+
+    def _start(self, worker: int):
+        assignment = ShardAssignment(
+            worker=worker,
+            shard_ids=shard_ids_for(worker, self.workers, self.shard_count),
+            shard_count=self.shard_count,
+            status_dir=self.status_dir,
+        )
+        # Não-daemon: o worker sobe o próprio processo de embeddings, e
+        # processos daemon não podem ter filhos
+        process = self._context.Process(
+            target=_worker_main,
+            args=(assignment, self.prewarm),
+            name=f"tessera-shard-{worker}",
+        )
+        process.start()
+        self._processes[worker] = process
+        self._started_at[worker] = time.monotonic()
+        self._restart_at.pop(worker, None)
+        self._stats["starts"] += 1
+        logger.info("🚀 Worker iniciado", extra=fields(
+            worker=worker, pid=process.pid, shard_ids=assignment.shard_ids
+        ))
+
+    def _check_workers(self):
+        """Agenda o restart de quem caiu e reinicia quem já esperou o suficiente."""
+        now = time.monotonic()
+        for worker, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            if worker not in self._restart_at:
+                if now - self._started_at[worker] >= STABLE_SECONDS:
+                    self._crashes[worker] = 0  # Rodou bem por um tempo: recomeça o backoff
+                self._crashes[worker] = self._crashes.get(worker, 0) + 1
+                delay = min(self.max_restart_delay, 2 ** (self._crashes[worker] - 1))
+                self._restart_at[worker] = now + delay
+                logger.warning("💥 Worker caiu", extra=fields(
+                    worker=worker, exitcode=process.exitcode, restart_in_s=delay
+                ))
+            elif now >= self._restart_at[worker]:
+                self._stats["restarts"] += 1
+                self._start(worker)
+
+    def stop(self, timeout: float = 15.0):
+        """Pede para cada worker encerrar (SIGTERM) e força quem não sair a tempo."""
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._processes.clear()
+        logger.info("🛑 Workers encerrados", extra=fields(**self._stats))
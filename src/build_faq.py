@@ -0,0 +1,160 @@
+"""
+TesseraBot - Job de Perguntas Frequentes (FAQ)
+
+Transforma as perguntas registradas pelo bot em respostas prontas:
+agrupa as perguntas parecidas, gera uma resposta canônica para cada
+grupo frequente (com o próprio engine: documentos + Gemini) e publica
+o índice de FAQ. O bot em execução troca o índice sozinho, sem restart.
+
+Uso:
+    python src/build_faq.py
+    python src/build_faq.py --min-count 5 --similarity 0.88
+    python src/build_faq.py --max-answers 20     # limita chamadas ao Gemini por execução
+    python src/build_faq.py --no-answers         # só agrupa (sem chamar o Gemini)
+
+Rodar de novo é barato: só linhas novas dos logs são lidas, e só grupos
+sem resposta (ou com documentos alterados) chamam o Gemini.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao Python path para imports funcionarem
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+
+from src.core.embeddings import SentenceEmbedder
+from src.core.log import setup_logging
+from src.core.vector_store import META_FILENAME, active_index_dir, index_exists
+from src.ingestion.faq_builder import FaqBuilder
+
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o índice de perguntas frequentes do TesseraBot")
+    parser.add_argument(
+        "--log-dir", default=os.getenv('QUESTION_LOG_DIR') or str(project_root / 'data' / 'questions'),
+        help="Pasta dos logs de perguntas (padrão: $QUESTION_LOG_DIR ou data/questions)"
+    )
+    parser.add_argument(
+        "--faq-dir", default=str(Path(os.getenv('FAQ_PATH') or project_root / 'data' / 'faq' / 'faq.npz').parent),
+        help="Pasta do estado e do índice de FAQ (padrão: pasta do $FAQ_PATH ou data/faq)"
+    )
+    parser.add_argument(
+        "--index-dir", default=os.getenv('INDEX_DIR', str(project_root / 'data' / 'index')),
+        help="Índice de documentos (define o modelo de embeddings e a versão dos documentos)"
+    )
+    parser.add_argument("--similarity", type=float, default=0.85, help="Cosseno mínimo para agrupar perguntas")
+    parser.add_argument("--min-count", type=int, default=3, help="Perguntas mínimas para um grupo virar FAQ")
+    parser.add_argument("--max-answers", type=int, default=50, help="Respostas geradas por execução (as mais pedidas)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Respostas geradas ao mesmo tempo")
+    parser.add_argument("--min-confidence", type=float, default=0.5, help="Confiança mínima para publicar uma resposta")
+    parser.add_argument("--no-answers", action="store_true", help="Só agrupa as perguntas (sem chamar o Gemini)")
+    return parser.parse_args(argv)
+
+
+async def generate_answers(builder: FaqBuilder, pending, corpus_version: str, args) -> int:
+    """Responde a pergunta canônica de cada grupo com o próprio engine."""
+    # O job não pode responder com o FAQ que está gerando, nem registrar
+    # as próprias perguntas no log que ele lê
+    os.environ["FAQ_PATH"] = ""
+    os.environ["QUESTION_LOG_DIR"] = ""
+    from src.core.bot_engine import TesseraBotEngine
+    from src.core.router import TIER_GREETING
+
+    engine = TesseraBotEngine()
+    if not engine.is_initialized:
+        print("❌ Engine não inicializado (confira GOOGLE_API_KEY)")
+        return 0
+
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    answered = 0
+
+    async def answer(cluster):
+        nonlocal answered
+        question = builder.canonical_question(cluster)
+        async with semaphore:
+            response = await engine.process_message(question, {})
+        if response.error or response.retry_after is not None:
+            print(f"   ⚠️ Sem resposta para \"{question}\": {response.error}")
+            return
+        # Gemini fora do ar: os trechos de emergência não podem virar a
+        # resposta oficial do FAQ até a próxima versão do corpus
+        if response.fallback:
+            print(f"   ⚠️ Gemini indisponível para \"{question}\" (só trechos dos documentos)")
+            return
+        if response.tier == TIER_GREETING:
+            print(f"   ⏭️ Saudação, não pergunta: \"{question}\"")
+            return
+        if response.confidence < args.min_confidence:
+            print(f"   ⏭️ Confiança baixa ({response.confidence}) para \"{question}\"")
+            return
+        builder.set_answer(cluster, response.content, response.confidence, response.sources, corpus_version)
+        answered += 1
+
+    try:
+        await asyncio.gather(*(answer(cluster) for cluster in pending))
+    finally:
+        engine.close()
+    return answered
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup_logging()
+    index_dir = Path(args.index_dir)
+
+    if not index_exists(index_dir):
+        print(f"❌ Nenhum índice de documentos em {index_dir}. Rode a ingestão primeiro.")
+        return 1
+    meta = json.loads((active_index_dir(index_dir) / META_FILENAME).read_text(encoding="utf-8"))
+    embedding_model, corpus_version = meta["embedding_model"], meta["corpus_version"]
+
+    started = time.perf_counter()
+    builder = FaqBuilder(
+        Path(args.faq_dir), Path(args.log_dir),
+        embedder=SentenceEmbedder(model_name=embedding_model),
+        embedding_model=embedding_model,
+        similarity=args.similarity,
+        min_count=args.min_count,
+    )
+
+    print(f"📥 Lendo perguntas novas de {args.log_dir}...")
+    summary = builder.ingest_logs()
+    # Salva já: os offsets avançam mesmo se a geração de respostas falhar
+    builder.save()
+
+    pending = builder.pending_answers(corpus_version)
+    answered = 0
+    if pending and not args.no_answers:
+        batch = pending[:max(0, args.max_answers)]
+        print(f"🤖 Gerando {len(batch)} respostas canônicas ({len(pending)} grupos pendentes)...")
+        answered = asyncio.run(generate_answers(builder, batch, corpus_version, args))
+        builder.save()
+
+    published = builder.publish(corpus_version)
+
+    print("\n" + "="*50)
+    print(f"✅ FAQ atualizado em {time.perf_counter() - started:.1f}s")
+    print(f"   • Perguntas novas: {summary['lines']}  • Distintas: {summary['distinct']}")
+    print(f"   • Grupos: {summary['clusters']} (novos: {summary['new_clusters']})")
+    print(f"   • Respostas geradas: {answered}  • Pendentes: {len(pending) - answered}")
+    print(f"   • Publicadas: {published} -> {builder.faq_path}")
+    print("="*50)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrompido - rode de novo para continuar de onde parou")
+        sys.exit(130)
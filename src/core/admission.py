@@ -0,0 +1,167 @@
+"""
+Admission Control - Quem entra na fila do Gemini (e quem espera um pouco)
+
+Sem limite nenhum, um único estudante mandando 50 perguntas seguidas
+(ou um raid num servidor) gasta a cota do Gemini e coloca todo mundo
+atrás dele na fila. Melhor recusar rápido e com educação do que
+atender todo mundo devagar.
+
+Três portas, verificadas antes de qualquer chamada ao LLM:
+1. Fila global: se já tem perguntas demais esperando, recusa
+2. Balde de tokens por usuário: rajadas curtas ok, spam não
+3. Balde de tokens por servidor: um servidor não monopoliza o bot
+
+Recusas vêm com "tente em X s", calculado pelo próprio balde.
+
+Conceitos que você vai aprender aqui:
+- Token bucket (taxa média + rajada)
+- Load shedding (recusar cedo para manter a latência de quem entrou)
+- Memória limitada para estado por usuário (LRU)
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Motivos de recusa
+SHED_USER = "user"
+SHED_GUILD = "guild"
+SHED_OVERLOAD = "overload"
+
+
+@dataclass
+class AdmissionDecision:
+    """Resultado da verificação de admissão."""
+    admitted: bool
+    retry_after: float = 0.0        # segundos até valer a pena tentar de novo
+    reason: Optional[str] = None    # SHED_USER, SHED_GUILD ou SHED_OVERLOAD
+
+
+class TokenBucket:
+    """
+    Balde de tokens: enche `rate` tokens por segundo, até `capacity`.
+
+    Cada pergunta gasta um token. Um balde cheio permite uma rajada de
+    `capacity` perguntas; depois disso, uma a cada 1/rate segundos.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Segundos até existir um token (0 = pode passar agora)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class AdmissionController:
+    """
+    Decide se uma pergunta pode seguir para o LLM.
+
+    Uso:
+        decision = controller.admit(user_id, guild_id, queue_depth)
+        if not decision.admitted:
+            responder(f"tente em {decision.retry_after:.0f} s")
+    """
+
+    def __init__(self, user_per_minute: float = 6, user_burst: int = 3,
+                 guild_per_minute: float = 60, guild_burst: int = 20,
+                 max_queue_depth: int = 32, overload_retry_after: float = 5.0,
+                 max_tracked: int = 10000):
+        """
+        Args:
+            user_per_minute: Perguntas por minuto de cada usuário (0 = sem limite)
+            user_burst: Rajada máxima de um usuário
+            guild_per_minute: Perguntas por minuto de cada servidor (0 = sem limite)
+            guild_burst: Rajada máxima de um servidor
+            max_queue_depth: Máximo de perguntas esperando o LLM (0 = sem limite)
+            overload_retry_after: Sugestão de espera quando a fila está cheia
+            max_tracked: Máximo de baldes guardados (por tipo)
+        """
+        self.user_rate = user_per_minute / 60
+        self.user_burst = max(1, user_burst)
+        self.guild_rate = guild_per_minute / 60
+        self.guild_burst = max(1, guild_burst)
+        self.max_queue_depth = max_queue_depth
+        self.overload_retry_after = overload_retry_after
+        self.max_tracked = max_tracked
+
+        # Baldes inativos estão cheios: esquecer o mais antigo não muda nada
+        self._users: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._guilds: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        self._stats = {"admitted": 0, "shed_user": 0, "shed_guild": 0, "shed_overload": 0}
+
+    def admit(self, user_id: Optional[str], guild_id: Optional[str] = None,
+              queue_depth: int = 0) -> AdmissionDecision:
+        """
+        Verifica as três portas; só gasta tokens se a pergunta for admitida.
+
+        Args:
+            user_id: Quem perguntou (None = sem limite por usuário)
+            guild_id: Servidor de origem (None = DM ou outra plataforma)
+            queue_depth: Perguntas esperando o LLM agora
+        """
+        if self.max_queue_depth and queue_depth >= self.max_queue_depth:
+            return self._shed(SHED_OVERLOAD, self.overload_retry_after)
+
+        now = time.monotonic()
+        user_bucket = self._bucket(self._users, user_id, self.user_rate, self.user_burst, now)
+        guild_bucket = self._bucket(self._guilds, guild_id, self.guild_rate, self.guild_burst, now)
+
+        if user_bucket is not None:
+            wait = user_bucket.wait_time(now)
+            if wait > 0:
+                return self._shed(SHED_USER, wait)
+        if guild_bucket is not None:
+            wait = guild_bucket.wait_time(now)
+            if wait > 0:
+                return self._shed(SHED_GUILD, wait)
+
+        if user_bucket is not None:
+            user_bucket.take()
+        if guild_bucket is not None:
+            guild_bucket.take()
+        self._stats["admitted"] += 1
+        return AdmissionDecision(admitted=True)
+
+    def _bucket(self, buckets: "OrderedDict[str, TokenBucket]", key: Optional[str],
+                rate: float, burst: int, now: float) -> Optional[TokenBucket]:
+        """Balde da chave (criado cheio), ou None se não houver limite."""
+        if key is None or rate <= 0:
+            return None
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+            if len(buckets) > self.max_tracked:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+        return bucket
+
+    def _shed(self, reason: str, retry_after: float) -> AdmissionDecision:
+        self._stats[f"shed_{reason}"] += 1
+        return AdmissionDecision(admitted=False, retry_after=retry_after, reason=reason)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de admissão para o get_status()."""
+        shed = self._stats["shed_user"] + self._stats["shed_guild"] + self._stats["shed_overload"]
+        return {
+            **self._stats,
+            "shed": shed,
+            "tracked_users": len(self._users),
+            "tracked_guilds": len(self._guilds),
+            "max_queue_depth": self.max_queue_depth,
+        }
@@ -11,14 +11,76 @@ Conceitos que você vai aprender aqui:
 """
 
 import os
-from typing import Optional, Dict, Any
+import math
+import inspect
+import time
+import asyncio
+import logging
+from pathlib import Path
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Iterator, Tuple
 from datetime import datetime
-from dataclasses import dataclass
-import google.generativeai as genai
-from dotenv import load_dotenv
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 
-# Carrega as variáveis de ambiente
-load_dotenv()
+from src.core.admission import SHED_GUILD, SHED_USER, AdmissionController
+from src.core.cache import CachedAnswer, ResponseCache, normalize_question
+from src.core.conversation import ConversationHistory, ConversationMemory, clip
+from src.core.embedding_worker import EmbeddingWorkerClient
+from src.core.embeddings import SentenceEmbedder
+from src.core.extractive import ExtractiveAnswer, ExtractiveAnswerer
+from src.core.faq import FAQ_FILENAME, FaqStore
+from src.core.index_generation import IndexGeneration, unchanged_sources
+from src.core.lexical_index import LexicalIndex, lexical_index_exists
+from src.core.llm_client import BREAKER_OPEN, CircuitBreaker, CircuitOpenError, LLMClient
+from src.core.log import fields, get_logger
+from src.core.metrics import metrics, percentile
+from src.core.persistent_cache import ANSWERS, RETRIEVALS, PersistentCache
+from src.core.prompt import PromptAssembler, PromptTemplate, estimate_tokens
+from src.core.question_log import QuestionLog
+from src.core.retriever import HybridRetriever
+from src.core.router import TIER_COMPLEX, TIER_GREETING, TIER_LOOKUP, ModelTier, QuestionRouter, Route
+from src.core.scheduler import LLMScheduler
+from src.core.singleflight import SingleFlight
+from src.core.vector_store import (
+    SearchHit,
+    VectorIndex,
+    active_index_dir,
+    current_generation,
+    index_exists,
+    process_rss_bytes,
+)
+
+logger = get_logger("engine")
+
+# Pasta padrão do índice gerado por src/ingest.py
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parents[2] / 'data' / 'index'
+
+# Arquivo padrão do cache em disco (compartilhado entre processos)
+DEFAULT_CACHE_DB = Path(__file__).resolve().parents[2] / 'data' / 'cache' / 'tessera.sqlite3'
+
+# Perguntas registradas e índice de FAQ gerado por src/build_faq.py
+DEFAULT_QUESTION_LOG_DIR = Path(__file__).resolve().parents[2] / 'data' / 'questions'
+DEFAULT_FAQ_PATH = Path(__file__).resolve().parents[2] / 'data' / 'faq' / FAQ_FILENAME
+
+# Instruções fixas do prompt (compiladas uma vez em PromptTemplate)
+UNIVERSITY_CONTEXT = """
+Você é o TesseraBot, um assistente virtual especializado em ajudar universitários.
+
+CONTEXTO: Você atende estudantes com dúvidas sobre:
+- Matrícula e rematrícula
+- Cronogramas acadêmicos
+- Editais de bolsas e projetos
+- Regulamentos da universidade
+- Procedimentos administrativos
+
+INSTRUÇÕES:
+- Seja objetivo e direto
+- Use linguagem amigável e acessível
+- Se não souber a resposta específica, seja honesto
+- Sugira onde o estudante pode encontrar informações oficiais
+- Sempre mantenha tom helpful e encorajador
+"""
 
 @dataclass
 class BotResponse:
@@ -35,6 +97,13 @@ class BotResponse:
     sources: list = None
     timestamp: datetime = None
     error: Optional[str] = None
+    cached: bool = False  # True quando veio do cache de respostas
+    faq: bool = False  # True quando veio do índice de perguntas frequentes
+    fallback: bool = False  # True quando o Gemini falhou e a resposta são só trechos dos documentos
+    retry_after: Optional[float] = None  # Pergunta recusada por excesso: segundos até tentar de novo
+    tier: Optional[str] = None  # Faixa do roteador que gerou a resposta (greeting, lookup, complex)
+    input_tokens: Optional[int] = None  # Tokens do prompt enviado ao Gemini (estimativa local)
+    output_tokens: Optional[int] = None  # Tokens da resposta gerada (None = não chamou o Gemini)
     
     def __post_init__(self):
         """Executa após __init__ para definir valores padrão"""
@@ -43,6 +112,21 @@ class BotResponse:
         if self.sources is None:
             self.sources = []
 
+@dataclass
+class StreamEvent:
+    """
+    Um pedaço de uma resposta em streaming (ver stream_message).
+    
+    - Eventos intermediários trazem só `delta` (texto novo)
+    - O último evento traz `response` com a resposta completa
+    """
+    delta: str = ""
+    response: Optional[BotResponse] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.response is not None
+
 class TesseraBotEngine:
     """
     O motor principal do TesseraBot.
@@ -59,10 +143,15 @@ class TesseraBotEngine:
     - Manutenção: mudanças no core não afetam as interfaces
     """
     
-    def __init__(self):
+    def __init__(self, model=None):
         """
         Inicializa o motor do bot.
         
+        Args:
+            model: Modelo a usar no lugar do Gemini (Dependency Injection).
+                Qualquer objeto com `model_name` e `generate_content()`
+                serve - ex: o modelo falso de benchmarks/fakes.py
+        
         Conceito: Lazy Loading
         - Só carrega o que precisa, quando precisa
         - Economiza memória (importante no nosso caso!)
@@ -70,7 +159,186 @@ class TesseraBotEngine:
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
         self.bot_name = os.getenv('BOT_NAME', 'TesseraBot')
         self.is_initialized = False
-        self._setup_gemini()
+
+        # Fila de chamadas ao LLM: o SDK do Gemini é bloqueante, então as
+        # chamadas rodam num pool limitado sem travar o event loop
+        self.scheduler = LLMScheduler(
+            max_in_flight=int(os.getenv('LLM_MAX_IN_FLIGHT', '4')),
+            max_workers=int(os.getenv('LLM_MAX_WORKERS', '0')) or None
+        )
+        
+        # Roteamento: saudações têm resposta pronta; consultas curtas vão
+        # para um modelo com orçamento pequeno e fila própria (a fila acima
+        # fica com as perguntas complexas)
+        self.routing = os.getenv('ROUTING', '1') == '1'
+        self.router = QuestionRouter(
+            complex_min_words=int(os.getenv('ROUTING_COMPLEX_MIN_WORDS', '25')),
+            bot_name=self.bot_name
+        )
+        self.lookup_scheduler = LLMScheduler(
+            max_in_flight=int(os.getenv('LLM_LOOKUP_MAX_IN_FLIGHT', '4'))
+        )
+        self._routes = metrics.counter("tessera_routes_total", "Mensagens por faixa do roteador")
+
+        # Cache de respostas: perguntas repetidas não gastam chamada ao Gemini
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv('CACHE_MAX_ENTRIES', '1000')),
+            max_bytes=int(os.getenv('CACHE_MAX_BYTES', str(4 * 1024 * 1024))),
+            ttl_seconds=float(os.getenv('CACHE_TTL_SECONDS', str(6 * 3600))),
+            similarity_threshold=float(os.getenv('CACHE_SIMILARITY_THRESHOLD', '0.92'))
+        )
+
+        # Cache em disco (L2): sobrevive a restarts e é compartilhado entre
+        # os processos do mesmo host (CACHE_DB vazio = desligado)
+        cache_db = os.getenv('CACHE_DB', str(DEFAULT_CACHE_DB))
+        self.persistent_cache = PersistentCache(
+            Path(cache_db),
+            answer_ttl_seconds=self.response_cache.ttl_seconds,
+            retrieval_ttl_seconds=float(os.getenv('CACHE_DB_RETRIEVAL_TTL_SECONDS', str(24 * 3600))),
+            max_entries=int(os.getenv('CACHE_DB_MAX_ENTRIES', '50000')),
+            max_bytes=int(os.getenv('CACHE_DB_MAX_BYTES', str(64 * 1024 * 1024))),
+            compact_interval=float(os.getenv('CACHE_DB_COMPACT_INTERVAL', '300'))
+        ) if cache_db else None
+        self.cache_warm_entries = int(os.getenv('CACHE_DB_WARM_ENTRIES', '200'))
+        
+        # Perguntas frequentes: o log alimenta o job offline (src/build_faq.py)
+        # e o índice que ele gera é consultado antes da busca e do Gemini
+        question_log_dir = os.getenv('QUESTION_LOG_DIR', str(DEFAULT_QUESTION_LOG_DIR))
+        self.question_log = QuestionLog(Path(question_log_dir)) if question_log_dir else None
+        faq_path = os.getenv('FAQ_PATH', str(DEFAULT_FAQ_PATH))
+        self.faq = FaqStore(
+            Path(faq_path),
+            min_score=float(os.getenv('FAQ_MIN_SCORE', '0.9')),
+            check_interval=float(os.getenv('FAQ_CHECK_SECONDS', '30'))
+        ) if faq_path else None
+        
+        # Perguntas iguais simultâneas compartilham uma única chamada
+        self._in_flight = SingleFlight()
+
+        # Controle de admissão: limita perguntas por usuário/servidor e
+        # recusa cedo quando a fila do LLM está cheia
+        self.admission = AdmissionController(
+            user_per_minute=float(os.getenv('ADMISSION_USER_PER_MINUTE', '6')),
+            user_burst=int(os.getenv('ADMISSION_USER_BURST', '3')),
+            guild_per_minute=float(os.getenv('ADMISSION_GUILD_PER_MINUTE', '60')),
+            guild_burst=int(os.getenv('ADMISSION_GUILD_BURST', '20')),
+            max_queue_depth=int(os.getenv('ADMISSION_MAX_QUEUE', '32')),
+            overload_retry_after=float(os.getenv('ADMISSION_OVERLOAD_RETRY', '5'))
+        )
+
+        # Memória de conversa: perguntas de seguimento ("e para veteranos?")
+        # chegam ao Gemini com as últimas trocas do estudante
+        self.conversations = ConversationMemory(
+            max_turns=int(os.getenv('CONVERSATION_MAX_TURNS', '4')),
+            idle_seconds=float(os.getenv('CONVERSATION_IDLE_SECONDS', '900')),
+            max_users=int(os.getenv('CONVERSATION_MAX_USERS', '10000')),
+            max_bytes=int(os.getenv('CONVERSATION_MAX_BYTES', str(4 * 1024 * 1024)))
+        )
+        
+        # Orçamento do prompt: instruções + pergunta + histórico + documentos
+        # cabem em PROMPT_MAX_TOKENS; as instruções são compiladas uma vez
+        self.prompt_template = PromptTemplate(UNIVERSITY_CONTEXT)
+        self.prompt_assembler = PromptAssembler(
+            self.prompt_template,
+            max_tokens=int(os.getenv('PROMPT_MAX_TOKENS', '3000')),
+            history_share=float(os.getenv('PROMPT_HISTORY_SHARE', '0.3')),
+            question_share=float(os.getenv('PROMPT_QUESTION_SHARE', '0.25'))
+        )
+        self._output_tokens = {"responses": 0, "tokens": 0}
+        self._tokens = metrics.counter("tessera_llm_tokens_total", "Tokens enviados e gerados pelo Gemini (estimativa)")
+        
+        # Respostas extrativas: se uma frase dos documentos já responde com
+        # confiança alta, ela vai direto para o estudante (sem chamar o Gemini)
+        self.extractive_answers = os.getenv('EXTRACTIVE_ANSWERS', '1') == '1'
+        self.extractive = ExtractiveAnswerer(
+            min_confidence=float(os.getenv('EXTRACTIVE_MIN_CONFIDENCE', '0.75'))
+        )
+        self._extractive_served = 0
+        
+        # Streaming: quanto o estudante espera até ver o primeiro texto
+        self._stream_stats = {"streams": 0, "streamed": 0}
+        self._first_token_times = deque(maxlen=256)
+
+        # Índice de documentos (RAG): mapeado em memória e carregado só
+        # na primeira pergunta que precisar dele; gerações novas (ingestão
+        # rodando ao lado) são trocadas sem restart
+        self.index_dir = Path(os.getenv('INDEX_DIR', str(DEFAULT_INDEX_DIR)))
+        self.retrieval_top_k = int(os.getenv('RETRIEVAL_TOP_K', '4'))
+        self.retrieval_min_score = float(os.getenv('RETRIEVAL_MIN_SCORE', '0.3'))
+        self.retrieval_nprobe = int(os.getenv('RETRIEVAL_NPROBE', '8'))
+        self.retrieval_rerank_factor = int(os.getenv('RETRIEVAL_RERANK_FACTOR', '4'))
+        self.index_check_interval = float(os.getenv('INDEX_CHECK_SECONDS', '30'))
+        self._generation: Optional[IndexGeneration] = None
+        self._retired_generations: List[IndexGeneration] = []
+        self._index_checked_at = 0.0
+        self._index_reload: Optional[asyncio.Task] = None
+        self._index_reloads = 0
+        self._embedder: Optional[SentenceEmbedder] = None
+        self._embedding_model: Optional[str] = None
+        
+        # Embeddings das perguntas: num processo dedicado, em micro-lotes
+        self.use_embedding_worker = os.getenv('EMBEDDING_WORKER', '1') == '1'
+        self.embedding_max_batch = int(os.getenv('EMBEDDING_MAX_BATCH', '16'))
+        self.embedding_max_wait_ms = float(os.getenv('EMBEDDING_MAX_WAIT_MS', '5'))
+        self.embedding_worker: Optional[EmbeddingWorkerClient] = None
+        # Vetores das últimas perguntas: FAQ, cache semântico e busca usam o
+        # mesmo embedding (um round-trip ao worker por pergunta, não três)
+        self._query_vectors: "OrderedDict[str, Any]" = OrderedDict()
+        self._query_vectors_max = 256
+        self._index_checked = False
+        self._index_lock: Optional[asyncio.Lock] = None
+        
+        # Métricas: tempo por etapa (spans) + contadores e gauges exportados
+        self._requests = metrics.counter("tessera_requests_total", "Perguntas atendidas por resultado")
+        metrics.gauge("tessera_llm_in_flight", "Chamadas ao LLM executando",
+                      lambda: self.scheduler.in_flight + self.lookup_scheduler.in_flight)
+        metrics.gauge("tessera_llm_queue_depth", "Chamadas ao LLM esperando vaga",
+                      lambda: self.scheduler.queue_depth + self.lookup_scheduler.queue_depth)
+        metrics.gauge("tessera_questions_in_flight", "Perguntas distintas em andamento", lambda: len(self._in_flight))
+        metrics.gauge("tessera_cache_entries", "Respostas no cache", lambda: len(self.response_cache))
+        metrics.gauge("tessera_conversations", "Conversas guardadas na memória", lambda: len(self.conversations))
+        metrics.gauge("tessera_faq_entries", "Perguntas no índice de FAQ",
+                      lambda: len(self.faq.index) if self.faq is not None and self.faq.index is not None else 0)
+
+        # Orçamento de saída de cada faixa de modelo
+        self.complex_max_output_tokens = int(os.getenv('LLM_COMPLEX_MAX_OUTPUT_TOKENS', '1000'))
+        self.lookup_max_output_tokens = int(os.getenv('LLM_LOOKUP_MAX_OUTPUT_TOKENS', '300'))
+        
+        # True quando os modelos receberam as instruções como system_instruction
+        self.system_instruction = False
+        
+        if model is not None:
+            # Modelo injetado: não precisa de chave de API nem de rede
+            self.model = model
+            self.lookup_model = model
+            self.is_initialized = True
+        else:
+            self._setup_gemini()
+        
+        # Cliente resiliente: timeout, retries com jitter, hedging e circuit breaker.
+        # As faixas dividem o breaker: é a mesma API (e a mesma chave) por trás
+        breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', '5')),
+            reset_timeout=float(os.getenv('LLM_BREAKER_RESET_SECONDS', '30'))
+        )
+        llm_options = dict(
+            timeout=float(os.getenv('LLM_TIMEOUT_SECONDS', '30')),
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', '2')),
+            hedge=os.getenv('LLM_HEDGE', '1') == '1',
+            breaker=breaker
+        )
+        self.llm = LLMClient(getattr(self, 'model', None), self.scheduler, **llm_options)
+        self.tiers = {
+            TIER_COMPLEX: ModelTier(TIER_COMPLEX, self.llm, self.complex_max_output_tokens),
+            TIER_LOOKUP: ModelTier(
+                TIER_LOOKUP,
+                LLMClient(getattr(self, 'lookup_model', None), self.lookup_scheduler, **llm_options),
+                self.lookup_max_output_tokens
+            ),
+        }
+        self._llm_fallbacks = 0
+        metrics.gauge("tessera_llm_breaker_open", "Circuito do LLM aberto (1) ou fechado (0)",
+                      lambda: self.llm.breaker.state == BREAKER_OPEN)
         
     def _setup_gemini(self):
         """
@@ -84,26 +352,52 @@ class TesseraBotEngine:
             if not self.google_api_key:
                 raise ValueError("GOOGLE_API_KEY não encontrada no arquivo .env")
             
+            # Import aqui, não no topo: o SDK leva ~1s para carregar e quem
+            # só importa este módulo (adapters, job de FAQ, benchmarks com
+            # modelo falso) não deve pagar esse preço
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.google_api_key)
             
-            # Configura o modelo Gemini com parâmetros otimizados
-            model_name = "gemini-1.5-flash"
-            print(f"🤖 Configurando modelo Gemini: {model_name}")
+            # SDKs mais novos aceitam as instruções fixas como system_instruction:
+            # vão uma vez, na criação do modelo, e o provedor pode reaproveitá-las.
+            # Nos antigos, elas seguem como prefixo (sempre igual) do prompt.
+            self.system_instruction = "system_instruction" in inspect.signature(genai.GenerativeModel).parameters
+            system_options = {"system_instruction": self.prompt_template.system} if self.system_instruction else {}
+            
+            # Configura os modelos Gemini com parâmetros otimizados: um por
+            # faixa do roteador (perguntas complexas e consultas curtas)
+            model_name = os.getenv('LLM_COMPLEX_MODEL', 'gemini-1.5-flash')
+            lookup_model_name = os.getenv('LLM_LOOKUP_MODEL', 'gemini-1.5-flash')
+            logger.info("🤖 Configurando modelo Gemini: %s", model_name,
+                        extra=fields(lookup_model=lookup_model_name))
             self.model = genai.GenerativeModel(
                 model_name=model_name,
                 generation_config={
                     "temperature": 0.3,  # Baixo = mais consistente, alto = mais criativo
                     "top_p": 0.8,
                     "top_k": 40,
-                    "max_output_tokens": 1000,  # Controla tamanho da resposta
-                }
+                    "max_output_tokens": self.complex_max_output_tokens,  # Controla tamanho da resposta
+                },
+                **system_options
+            )
+            # Consulta factual: resposta curta e o mais literal possível
+            self.lookup_model = genai.GenerativeModel(
+                model_name=lookup_model_name,
+                generation_config={
+                    "temperature": 0.2,
+                    "top_p": 0.8,
+                    "top_k": 40,
+                    "max_output_tokens": self.lookup_max_output_tokens,
+                },
+                **system_options
             )
             
             self.is_initialized = True
-            print(f"✅ {self.bot_name} engine inicializado com sucesso!")
+            logger.info("✅ %s engine inicializado com sucesso!", self.bot_name)
             
         except Exception as e:
-            print(f"❌ Erro ao inicializar Gemini: {e}")
+            logger.error("❌ Erro ao inicializar Gemini: %s", e)
             self.is_initialized = False
     
     async def process_message(self, user_message: str, user_context: Dict[str, Any] = None) -> BotResponse:
@@ -121,93 +415,876 @@ class TesseraBotEngine:
         - Chamadas para APIs são lentas (rede)
         - async permite que outras operações continuem enquanto espera
         - Essencial para bots que atendem múltiplos usuários
+        
+        Cada etapa (cache, busca, prompt, fila, Gemini) é medida e
+        registrada em src/core/metrics.py.
         """
         
+        with metrics.trace() as stages, metrics.span("request"):
+            response = await self._respond(user_message, user_context)
+        
+        self._record_outcome(response)
+        self._remember(user_message, user_context, response)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🧭 Etapas da resposta", extra=fields(
+                user_id=(user_context or {}).get('user_id'),
+                **{f"{stage}_ms": round(seconds * 1000, 1) for stage, seconds in stages.items()}
+            ))
+        return response
+    
+    async def _respond(self, user_message: str, user_context: Optional[Dict[str, Any]]) -> BotResponse:
+        """Corpo do process_message: cache -> admissão -> resposta (compartilhada)."""
         if not self.is_initialized:
-            return BotResponse(
-                content="❌ Bot não está configurado corretamente. Verifique as chaves da API.",
-                error="Gemini não inicializado"
-            )
+            return self._not_initialized_response()
         
         try:
             # Contexto padrão para perguntas universitárias
             if user_context is None:
                 user_context = {}
             
-            # Monta o prompt com contexto universitário
-            system_prompt = self._build_university_prompt(user_message, user_context)
+            cache_key, history = self._question_key(user_message, user_context)
+            
+            # Saudação? Resposta pronta, sem cache, busca nem Gemini
+            route = self._route(user_message, history)
+            if route.tier == TIER_GREETING:
+                return self._greeting_response(route)
+            
+            # Pergunta repetida? Responde direto do cache
+            with metrics.span("cache_lookup"):
+                result = await self._cached_response(user_message, cache_key, history)
+            
+            # Pergunta frequente? Resposta pronta, sem busca nem Gemini
+            if result is None:
+                result = await self._faq_response(user_message, history)
+            
+            if result is None:
+                # Excesso de perguntas? Recusa antes de gastar o LLM
+                shed = self._admit(user_context, cache_key)
+                if shed is not None:
+                    return shed
+                
+                # Pergunta igual já sendo respondida? Espera a mesma resposta
+                result, _ = await self._in_flight.do(
+                    cache_key,
+                    lambda: self._answer(user_message, user_context, cache_key, history=history,
+                                         tier=route.tier)
+                )
+            
+            self._log_question(user_message, history, result)
+            return result
+            
+        except Exception as e:
+            logger.exception("❌ Erro ao processar mensagem", extra=fields(user_id=(user_context or {}).get('user_id')))
+            return self._technical_error_response(e)
+    
+    async def stream_message(self, user_message: str,
+                             user_context: Dict[str, Any] = None) -> AsyncIterator[StreamEvent]:
+        """
+        Versão em streaming do process_message.
+        
+        Uso:
+            async for event in engine.stream_message(pergunta, contexto):
+                if event.done:
+                    resposta = event.response   # BotResponse completa
+                else:
+                    mostrar(event.delta)        # texto novo
+        
+        Por que streaming?
+        - Uma resposta longa leva segundos para ser gerada por inteiro
+        - Mostrando os pedaços conforme chegam, o estudante espera só
+          pelo primeiro token (time-to-first-token), não pela resposta toda
+        
+        Respostas do cache (ou de uma pergunta igual já em andamento)
+        chegam inteiras, num único evento final.
+        """
+        if not self.is_initialized:
+            yield StreamEvent(response=self._not_initialized_response())
+            return
+        
+        started = time.perf_counter()
+        self._stream_stats["streams"] += 1
+        first_token = True
+        
+        try:
+            if user_context is None:
+                user_context = {}
+            
+            cache_key, history = self._question_key(user_message, user_context)
+            
+            route = self._route(user_message, history)
+            if route.tier == TIER_GREETING:
+                greeting = self._greeting_response(route)
+                self._record_first_token(started)
+                self._record_outcome(greeting)
+                yield StreamEvent(response=greeting)
+                return
+            
+            with metrics.span("cache_lookup"):
+                ready = await self._cached_response(user_message, cache_key, history)
+            if ready is None:
+                ready = await self._faq_response(user_message, history)
+            if ready is not None:
+                self._record_first_token(started)
+                self._record_outcome(ready)
+                self._remember(user_message, user_context, ready)
+                self._log_question(user_message, history, ready)
+                yield StreamEvent(response=ready)
+                return
             
-            # Chama o Gemini (aqui é onde a mágica acontece!)
-            response = await self._call_gemini(system_prompt)
+            shed = self._admit(user_context, cache_key)
+            if shed is not None:
+                self._record_outcome(shed)
+                yield StreamEvent(response=shed)
+                return
             
+            # Os pedaços chegam pela fila; se outra pergunta igual já estiver
+            # em andamento, `on_delta` nunca é chamado e só a resposta final vem
+            deltas: asyncio.Queue = asyncio.Queue()
+            answer = asyncio.ensure_future(self._in_flight.do(
+                cache_key,
+                lambda: self._answer(user_message, user_context, cache_key, history=history,
+                                     on_delta=deltas.put_nowait, tier=route.tier)
+            ))
+            
+            try:
+                while True:
+                    next_delta = asyncio.ensure_future(deltas.get())
+                    await asyncio.wait({next_delta, answer}, return_when=asyncio.FIRST_COMPLETED)
+                    if not next_delta.done():
+                        next_delta.cancel()
+                        break
+                    if first_token:
+                        first_token = False
+                        self._stream_stats["streamed"] += 1
+                        self._record_first_token(started)
+                    yield StreamEvent(delta=next_delta.result())
+            finally:
+                if not answer.done():
+                    answer.cancel()
+            
+            # Pedaços que chegaram junto com o fim da resposta
+            while not deltas.empty():
+                yield StreamEvent(delta=deltas.get_nowait())
+            
+            result, _ = answer.result()
+            if first_token:
+                self._record_first_token(started)
+            metrics.observe("request", time.perf_counter() - started)
+            self._record_outcome(result)
+            self._remember(user_message, user_context, result)
+            self._log_question(user_message, history, result)
+            yield StreamEvent(response=result)
+            
+        except Exception as e:
+            logger.exception("❌ Erro ao processar mensagem", extra=fields(user_id=(user_context or {}).get('user_id')))
+            error = self._technical_error_response(e)
+            self._record_outcome(error)
+            yield StreamEvent(response=error)
+    
+    def _question_key(self, user_message: str,
+                      user_context: Dict[str, Any]) -> Tuple[str, Optional[ConversationHistory]]:
+        """
+        Chave da pergunta (cache e perguntas simultâneas) + histórico do estudante.
+        
+        Com histórico, a resposta depende da conversa: "e para veteranos?"
+        significa coisas diferentes para estudantes diferentes. Por isso
+        a chave ganha o fingerprint do histórico.
+        """
+        cache_key = normalize_question(user_message)
+        history = self.conversations.get(user_context.get('user_id'))
+        if history is not None:
+            cache_key = f"{cache_key}#{history.fingerprint}"
+        return cache_key, history
+    
+    def _route(self, user_message: str, history: Optional[ConversationHistory] = None) -> Route:
+        """
+        Faixa da mensagem (com ROUTING=0, tudo vai para o modelo completo).
+        
+        No meio de uma conversa nada vira saudação: "tudo bem?" depois de
+        uma resposta pode ser seguimento, e a memória precisa ver a pergunta.
+        """
+        if not self.routing:
+            route = Route(TIER_COMPLEX, "routing_off")
+        else:
+            route = self.router.classify(user_message, allow_greeting=history is None)
+        self._routes.inc(tier=route.tier)
+        return route
+    
+    def _greeting_response(self, route: Route) -> BotResponse:
+        """Saudação, agradecimento ou despedida: resposta pronta, sem custo."""
+        return BotResponse(
+            content=self.router.greeting_response(route),
+            confidence=1.0,
+            sources=[self.bot_name],
+            tier=TIER_GREETING
+        )
+    
+    def _remember(self, user_message: str, user_context: Optional[Dict[str, Any]], response: BotResponse):
+        """Guarda a troca na memória de conversa (só respostas de verdade)."""
+        if response.error or response.retry_after is not None or response.tier == TIER_GREETING:
+            return
+        self.conversations.record((user_context or {}).get('user_id'), user_message, response.content)
+    
+    def _log_question(self, user_message: str, history: Optional[ConversationHistory], response: BotResponse):
+        """
+        Registra a pergunta para o job de FAQ.
+        
+        Perguntas de seguimento ("e para veteranos?") ficam de fora: sem
+        a conversa, elas não fazem sentido como pergunta frequente.
+        """
+        if self.question_log is None or history is not None:
+            return
+        if response.error or response.retry_after is not None:
+            return
+        kind = "faq" if response.faq else "cached" if response.cached else "answer"
+        self.question_log.record(user_message, response.confidence, kind)
+    
+    def _admit(self, user_context: Dict[str, Any], cache_key: str) -> Optional[BotResponse]:
+        """
+        Controle de admissão: None se a pergunta pode seguir, senão a
+        resposta de recusa com "tente em X s".
+        
+        Só vale para perguntas que custariam uma chamada ao LLM: respostas
+        do cache e perguntas iguais já em andamento não gastam tokens.
+        """
+        if cache_key in self._in_flight:
+            return None
+        
+        # Esperando o LLM = respostas em andamento que ainda não estão executando
+        # (inclui as que estão na busca de documentos, antes do scheduler)
+        executing = sum(tier.scheduler.in_flight for tier in self.tiers.values())
+        waiting = max(0, len(self._in_flight) - executing)
+        decision = self.admission.admit(
+            user_context.get('user_id'),
+            user_context.get('guild_id'),
+            queue_depth=waiting
+        )
+        if decision.admitted:
+            return None
+        
+        seconds = max(1, math.ceil(decision.retry_after))
+        if decision.reason == SHED_USER:
+            content = f"⏳ Você fez muitas perguntas seguidas, tente em {seconds} s."
+        elif decision.reason == SHED_GUILD:
+            content = f"⏳ Muitas perguntas neste servidor agora, tente em {seconds} s."
+        else:
+            content = f"⏳ Muitas perguntas agora, tente em {seconds} s."
+        
+        logger.info("⏳ Pergunta recusada", extra=fields(
+            user_id=user_context.get('user_id'),
+            guild=user_context.get('guild_id'),
+            reason=decision.reason,
+            retry_after=seconds
+        ))
+        return BotResponse(content=content, error=f"shed:{decision.reason}", retry_after=seconds)
+    
+    def _record_first_token(self, started: float):
+        """Registra quanto tempo o estudante esperou pelo primeiro texto."""
+        elapsed = time.perf_counter() - started
+        self._first_token_times.append(elapsed)
+        metrics.observe("first_token", elapsed)
+    
+    def _record_outcome(self, response: BotResponse):
+        """Conta a pergunta pelo resultado (respondida, cache, recusada, erro)."""
+        if response.cached:
+            outcome = "cached"
+        elif response.tier == TIER_GREETING:
+            outcome = "greeting"
+        elif response.faq:
+            outcome = "faq"
+        elif response.retry_after is not None:
+            outcome = "shed"
+        elif response.error:
+            outcome = "error"
+        else:
+            outcome = "answered"
+        self._requests.inc(outcome=outcome)
+    
+    async def _cached_response(self, user_message: str, cache_key: str,
+                               history: Optional[ConversationHistory] = None) -> Optional[BotResponse]:
+        """Resposta guardada no cache (memória, depois disco) para esta pergunta (ou None)."""
+        # Com histórico, só a chave exata (pergunta + conversa) vale
+        cached = await self.response_cache.get(user_message, key=cache_key, semantic=history is None)
+        if cached is None:
+            cached = await self._persisted_answer(user_message, cache_key, history)
+        if cached is None:
+            return None
+        return BotResponse(
+            content=cached.content,
+            confidence=cached.confidence,
+            sources=list(cached.sources),
+            cached=True
+        )
+    
+    async def _faq_response(self, user_message: str,
+                            history: Optional[ConversationHistory] = None) -> Optional[BotResponse]:
+        """
+        Resposta pronta do índice de FAQ para esta pergunta (ou None).
+        
+        Custa um embedding da pergunta e um produto matriz x vetor com
+        algumas centenas de linhas - bem menos que busca + Gemini.
+        """
+        if self.faq is None or history is not None:
+            return None
+        await self.faq.refresh()
+        if not self.faq.loaded or await self._ensure_index() is None:
+            return None
+        
+        with metrics.span("faq_lookup"):
+            try:
+                query = await self._embed_query(user_message)
+            except Exception as e:
+                logger.warning("⚠️ FAQ indisponível (embedding falhou): %s", e)
+                return None
+            found = self.faq.lookup(query, self.vector_index.embedding_model, self.vector_index.corpus_version)
+        if found is None:
+            return None
+        
+        entry, score = found
+        logger.debug("📌 Resposta do FAQ", extra=fields(question=entry.question, score=round(score, 3)))
+        return BotResponse(
+            content=entry.answer,
+            confidence=entry.confidence,
+            sources=list(entry.sources),
+            faq=True
+        )
+    
+    async def _persisted_answer(self, user_message: str, cache_key: str,
+                                history: Optional[ConversationHistory]) -> Optional[CachedAnswer]:
+        """
+        Procura a resposta no cache em disco e, se achar, promove para a memória.
+        
+        Por que promover?
+        - A próxima pergunta igual nem chega ao disco
+        - A idade original vai junto: a resposta não ganha um TTL novo
+        """
+        if self.persistent_cache is None:
+            return None
+        found = await self.persistent_cache.get(ANSWERS, cache_key, self.response_cache.corpus_version)
+        if found is None:
+            return None
+        payload, age = found
+        answer = CachedAnswer(**payload)
+        await self.response_cache.put(user_message, answer, key=cache_key, semantic=history is None, age=age)
+        return answer
+    
+    @staticmethod
+    def _not_initialized_response() -> BotResponse:
+        return BotResponse(
+            content="❌ Bot não está configurado corretamente. Verifique as chaves da API.",
+            error="Gemini não inicializado"
+        )
+    
+    @staticmethod
+    def _technical_error_response(error: Exception) -> BotResponse:
+        if isinstance(error, CircuitOpenError):
+            seconds = max(1, math.ceil(error.retry_after))
             return BotResponse(
-                content=response,
-                confidence=0.8,  # Por enquanto, valor fixo
-                sources=["Gemini 1.5 Flash"]  # Futuramente: documentos PDF
+                content=f"⚠️ O serviço de IA está instável agora. Tente novamente em {seconds} s.",
+                error=str(error)
             )
+        return BotResponse(
+            content="Desculpe, tive um problema técnico. Tente novamente em alguns segundos.",
+            error=str(error)
+        )
+    
+    def _fallback_response(self, documents: List[SearchHit],
+                           best: Optional[ExtractiveAnswer] = None) -> Optional[BotResponse]:
+        """
+        Resposta sem o Gemini (API fora ou circuito aberto): os trechos
+        mais relevantes dos documentos, com a fonte de cada um.
+        
+        Por que não só pedir para tentar depois?
+        - O cache (memória e disco) já foi consultado e não tinha a resposta
+        - Um trecho do edital certo costuma resolver a dúvida mesmo assim
+        
+        Com uma frase extrativa (`best`), ela vem primeiro e a confiança
+        da resposta é a dela; sem, os dois primeiros trechos valem 0.4.
+        
+        Não vai para o cache: quando a API voltar, a pergunta merece a
+        resposta completa.
+        """
+        if not documents:
+            return None
+        self._llm_fallbacks += 1
+        if best is not None:
+            return BotResponse(
+                content="⚠️ Não consegui falar com a IA agora, mas encontrei isto nos documentos oficiais:\n\n"
+                        f"> {best.text}\n— {best.citation}",
+                confidence=min(best.confidence, 0.6),  # Sem interpretação: nunca tão confiável quanto o Gemini
+                sources=[best.citation],
+                fallback=True
+            )
+        top = documents[:2]
+        excerpts = "\n\n".join(f"> {clip(hit.chunk['text'], 500)}\n— {hit.citation}" for hit in top)
+        return BotResponse(
+            content="⚠️ Não consegui falar com a IA agora, mas encontrei isto nos documentos oficiais:\n\n"
+                    f"{excerpts}",
+            confidence=0.4,  # Resposta parcial: só os trechos, sem interpretação
+            sources=list(dict.fromkeys(hit.citation for hit in top)),
+            fallback=True
+        )
+    
+    def _extractive_response(self, best: ExtractiveAnswer) -> BotResponse:
+        """Resposta copiada do documento: a frase e a fonte (documento e página)."""
+        self._extractive_served += 1
+        return BotResponse(
+            content=f"📄 Segundo {best.citation}:\n\n> {best.text}",
+            confidence=best.confidence,
+            sources=[best.citation]
+        )
+    
+    @staticmethod
+    def _generated_confidence(documents: List[SearchHit], best: Optional[ExtractiveAnswer]) -> float:
+        """
+        Confiança de uma resposta gerada pelo Gemini.
+        
+        Sem documentos, é só o conhecimento geral do modelo (baixa); com
+        documentos, sobe conforme a melhor frase encontrada cobre a pergunta.
+        """
+        if not documents:
+            return 0.3
+        return round(0.5 + 0.45 * (best.confidence if best is not None else 0.0), 2)
+    
+    @property
+    def vector_index(self) -> Optional[VectorIndex]:
+        """Índice vetorial da geração atual (None = sem índice)."""
+        return self._generation.vector_index if self._generation is not None else None
+    
+    @property
+    def retriever(self) -> Optional[HybridRetriever]:
+        return self._generation.retriever if self._generation is not None else None
+    
+    async def _ensure_index(self) -> Optional[VectorIndex]:
+        """
+        Abre o índice de documentos na primeira vez que for necessário.
+        
+        Conceito: Lazy Loading + mmap
+        - Abrir o índice só mapeia os arquivos (não lê os vetores para a RAM)
+        - O lock evita que duas perguntas simultâneas abram o índice duas vezes
+        
+        Depois disso, confere a cada INDEX_CHECK_SECONDS se a ingestão
+        publicou uma geração nova e, se sim, troca em segundo plano.
+        """
+        if self._index_checked:
+            self._maybe_reload_index()
+            return self.vector_index
+        
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        
+        async with self._index_lock:
+            if self._index_checked:
+                return self.vector_index
+            self._index_checked = True
+            self._index_checked_at = time.monotonic()
             
+            if not index_exists(self.index_dir):
+                logger.info("ℹ️ Nenhum índice em %s - respondendo sem documentos", self.index_dir)
+                return None
+            await self._load_generation()
+        
+        return self.vector_index
+    
+    def _maybe_reload_index(self):
+        """Agenda a troca de geração se o CURRENT apontar para outra (barato: um arquivo pequeno)."""
+        now = time.monotonic()
+        if now - self._index_checked_at < self.index_check_interval:
+            return
+        self._index_checked_at = now
+        if self._index_reload is not None and not self._index_reload.done():
+            return
+        active = self._generation.name if self._generation is not None else None
+        if current_generation(self.index_dir) not in (None, active):
+            # As perguntas continuam na geração atual enquanto a nova abre
+            self._index_reload = asyncio.ensure_future(self.reload_index())
+    
+    async def reload_index(self) -> bool:
+        """
+        Troca para a geração ativa do índice, se ela mudou (True = trocou).
+        
+        Sem restart e sem downtime: buscas em andamento terminam na
+        geração antiga, que só é fechada depois da última delas.
+        """
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            self._index_checked = True
+            active = self._generation.name if self._generation is not None else None
+            if self._generation is not None and current_generation(self.index_dir) in (None, active):
+                return False
+            if not index_exists(self.index_dir):
+                return False
+            return await self._load_generation()
+    
+    async def _load_generation(self) -> bool:
+        """Abre a geração ativa e a coloca no lugar da atual."""
+        started = time.perf_counter()
+        try:
+            vector_index, lexical_index = await asyncio.to_thread(self._open_indexes)
         except Exception as e:
-            print(f"❌ Erro ao processar mensagem: {e}")
-            return BotResponse(
-                content="Desculpe, tive um problema técnico. Tente novamente em alguns segundos.",
-                error=str(e)
+            logger.error("❌ Erro ao abrir índice de documentos: %s", e)
+            return False
+        
+        # A pergunta precisa ser codificada com o mesmo modelo dos documentos
+        self._use_embedding_model(vector_index.embedding_model)
+        
+        # Tier semântico do cache (opcional): reaproveita os mesmos embeddings
+        if os.getenv('CACHE_SEMANTIC', '0') == '1':
+            self.response_cache.embed_fn = self._embed_query
+        retriever = HybridRetriever(
+            vector_index,
+            lexical_index,
+            embed_fn=self._embed_query,
+            top_k=self.retrieval_top_k,
+            min_dense_score=self.retrieval_min_score
+        )
+        generation = IndexGeneration(vector_index, lexical_index, retriever, time.perf_counter() - started)
+        
+        # A troca em si: uma atribuição, sem await no meio
+        previous, self._generation = self._generation, generation
+        
+        # Termos raros (IDF alto) pesam mais na confiança extrativa
+        self.extractive.idf_fn = lexical_index.term_idf if lexical_index is not None else None
+        
+        # Documentos novos = respostas antigas podem estar desatualizadas
+        # (só as que dependem de documentos que mudaram, quando dá para saber)
+        invalidated = self.response_cache.set_corpus_version(
+            vector_index.corpus_version, keep_sources=unchanged_sources(previous, generation)
+        )
+        
+        if previous is None:
+            logger.info("📚 Índice carregado", extra=fields(
+                generation=generation.name,
+                chunks=len(vector_index),
+                load_ms=round(generation.load_seconds * 1000, 1)
+            ))
+            return True
+        
+        previous.retire()
+        self._retired_generations = [
+            old for old in self._retired_generations + [previous] if not old.closed
+        ]
+        self._index_reloads += 1
+        logger.info("🔄 Índice trocado", extra=fields(
+            generation=generation.name,
+            previous=previous.name,
+            chunks=len(vector_index),
+            load_ms=round(generation.load_seconds * 1000, 1),
+            cache_invalidated=invalidated
+        ))
+        return True
+    
+    def _use_embedding_model(self, model_name: str):
+        """Prepara o codificador de perguntas para o modelo da geração."""
+        if model_name == self._embedding_model:
+            return
+        if self._embedding_model is not None:
+            logger.warning("⚠️ Modelo de embeddings mudou: %s -> %s", self._embedding_model, model_name)
+        if self.use_embedding_worker:
+            if self.embedding_worker is not None:
+                self.embedding_worker.stop()
+            self.embedding_worker = EmbeddingWorkerClient(
+                model_name,
+                max_batch=self.embedding_max_batch,
+                max_wait_ms=self.embedding_max_wait_ms
             )
+        else:
+            self._embedder = SentenceEmbedder(model_name=model_name)
+        self._embedding_model = model_name
+        self._query_vectors.clear()  # Vetores do modelo antigo não servem mais
     
-    def _build_university_prompt(self, user_message: str, context: Dict[str, Any]) -> str:
+    @contextmanager
+    def _using_index(self) -> Iterator[Optional[IndexGeneration]]:
+        """Segura a geração atual durante uma busca (ela não fecha no meio)."""
+        generation = self._generation
+        if generation is None:
+            yield None
+            return
+        generation.acquire()
+        try:
+            yield generation
+        finally:
+            generation.release()
+    
+    def _open_indexes(self):
+        """Abre o índice vetorial e o lexical (BM25) da geração ativa."""
+        index_dir = active_index_dir(self.index_dir)
+        vector_index = VectorIndex.open(
+            index_dir, self.retrieval_nprobe, self.retrieval_rerank_factor
+        )
+        lexical_index = LexicalIndex.open(index_dir) if lexical_index_exists(index_dir) else None
+        return vector_index, lexical_index
+    
+    async def _embed_query(self, text: str):
         """
-        Constrói o prompt otimizado para contexto universitário.
+        Codifica a pergunta fora do event loop (é CPU-bound).
         
-        Conceito: Prompt Engineering
-        - A qualidade da resposta depende muito de como formulamos a pergunta
-        - Contexto específico melhora drasticamente os resultados
+        Com o worker, perguntas simultâneas viram um único lote no
+        processo de embeddings; sem ele, usamos uma thread local.
+        
+        O vetor fica guardado: a mesma pergunta passa pelo FAQ, pelo cache
+        semântico e pela busca, e só a primeira etapa paga o embedding.
         """
+        vector = self._query_vectors.get(text)
+        if vector is not None:
+            self._query_vectors.move_to_end(text)
+            return vector
+        with metrics.span("embed_query"):
+            if self.embedding_worker is not None:
+                vector = await self.embedding_worker.embed(text)
+            else:
+                vector = await asyncio.to_thread(self._embedder.encode_one, text)
+        self._query_vectors[text] = vector
+        if len(self._query_vectors) > self._query_vectors_max:
+            self._query_vectors.popitem(last=False)
+        return vector
+    
+    async def warmup(self):
+        """
+        Prepara o que for pesado antes do primeiro estudante chegar.
         
-        base_context = """
-Você é o TesseraBot, um assistente virtual especializado em ajudar universitários.
-
-CONTEXTO: Você atende estudantes com dúvidas sobre:
-- Matrícula e rematrícula
-- Cronogramas acadêmicos
-- Editais de bolsas e projetos
-- Regulamentos da universidade
-- Procedimentos administrativos
-
-INSTRUÇÕES:
-- Seja objetivo e direto
-- Use linguagem amigável e acessível
-- Se não souber a resposta específica, seja honesto
-- Sugira onde o estudante pode encontrar informações oficiais
-- Sempre mantenha tom helpful e encorajador
-
-PERGUNTA DO ESTUDANTE:
-"""
+        Abre o índice, recarrega do disco as respostas mais pedidas e o FAQ, e sobe
+        o worker de embeddings (que carrega e aquece o modelo). Se algo
+        falhar, o bot continua funcionando: a primeira pergunta tenta de novo.
+        """
+        index = await self._ensure_index()
+        await self._warm_response_cache()
+        if self.faq is not None:
+            await self.faq.refresh(force=True)
+        if index is None or self.embedding_worker is None:
+            return
+        try:
+            await self.embedding_worker.start()
+        except Exception as e:
+            logger.warning("⚠️ Não foi possível aquecer o worker de embeddings: %s", e)
+    
+    async def _warm_response_cache(self):
+        """
+        Warm-load: as respostas mais acessadas voltam do disco para a memória.
+        
+        Assim um deploy (ou crash) não vira uma onda de chamadas ao Gemini
+        para as perguntas de sempre.
+        """
+        if self.persistent_cache is None:
+            return
+        self.persistent_cache.start_compaction()
         
-        user_info = ""
-        if context.get('username'):
-            user_info = f"Usuário: {context['username']}\n"
+        limit = min(self.cache_warm_entries, self.response_cache.max_entries)
+        if limit <= 0:
+            return
+        started = time.perf_counter()
+        entries = await self.persistent_cache.warm(ANSWERS, self.response_cache.corpus_version, limit)
+        # Da menos para a mais acessada: as mais acessadas ficam no fim do LRU
+        for key, payload, age in reversed(entries):
+            await self.response_cache.put(key, CachedAnswer(**payload), key=key, semantic=False, age=age)
+        if entries:
+            logger.info("💾 Respostas recarregadas do disco", extra=fields(
+                entries=len(entries),
+                load_ms=round((time.perf_counter() - started) * 1000, 1)
+            ))
+    
+    def close(self):
+        """Libera recursos (processo de embeddings, pool de threads, arquivos em disco)."""
+        if self.embedding_worker is not None:
+            self.embedding_worker.stop()
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+        if self.question_log is not None:
+            self.question_log.close()
+        self.scheduler.shutdown()
+        self.lookup_scheduler.shutdown()
+    
+    async def _retrieve(self, question: str) -> List[SearchHit]:
+        """
+        Busca os trechos de documentos mais relevantes para a pergunta.
+        
+        A busca é híbrida: palavras exatas (BM25) primeiro, embeddings só
+        quando necessário (ver src/core/retriever.py).
         
-        return f"{base_context}\n{user_info}{user_message}"
+        Se não houver índice (ou a busca falhar), retorna lista vazia e o
+        bot responde só com o conhecimento do modelo.
+        """
+        if await self._ensure_index() is None:
+            return []
+        
+        with self._using_index() as generation:
+            if generation is None:
+                return []
+            vector_index = generation.vector_index
+            
+            # Mesma pergunta (mesmos documentos) já buscada por este ou outro processo?
+            key = f"{self.retrieval_top_k}:{normalize_question(question)}"
+            hits = await self._persisted_retrieval(key, vector_index)
+            if hits is not None:
+                return hits
+            
+            try:
+                hits = await generation.retriever.retrieve(question)
+            except Exception as e:
+                logger.warning("⚠️ Falha na busca de documentos: %s", e)
+                return []
+        
+        if hits and self.persistent_cache is not None:
+            self.persistent_cache.put(RETRIEVALS, key, vector_index.corpus_version, [
+                [hit.row, hit.score, hit.dense_score, hit.lexical_score] for hit in hits
+            ])
+        return hits
+    
+    async def _persisted_retrieval(self, key: str, vector_index: VectorIndex) -> Optional[List[SearchHit]]:
+        """Resultado de busca guardado no disco (só as linhas; o texto vem do índice)."""
+        if self.persistent_cache is None:
+            return None
+        found = await self.persistent_cache.get(RETRIEVALS, key, vector_index.corpus_version)
+        if found is None:
+            return None
+        rows, _ = found
+        try:
+            return [
+                SearchHit(row, score, vector_index.get_chunk(row), dense_score=dense, lexical_score=lexical)
+                for row, score, dense, lexical in rows
+            ]
+        except (IndexError, ValueError) as e:
+            logger.warning("⚠️ Busca guardada inválida, refazendo: %s", e)
+            return None
     
-    async def _call_gemini(self, prompt: str) -> str:
+    async def _answer(self, user_message: str, user_context: Dict[str, Any], cache_key: str,
+                      history: Optional[ConversationHistory] = None,
+                      on_delta: Optional[Callable[[str], None]] = None,
+                      tier: str = TIER_COMPLEX) -> BotResponse:
+        """
+        Gera a resposta de fato: busca documentos, monta o prompt e chama o Gemini.
+        
+        Roda uma única vez por pergunta em andamento (ver SingleFlight),
+        então o resultado não pode depender de quem perguntou - só da
+        pergunta e do histórico (que já está na chave).
+        
+        Com `on_delta`, a resposta é gerada em streaming e cada pedaço
+        de texto é entregue a essa função assim que chega.
+        
+        `tier` (do roteador) escolhe o modelo: consulta curta ou pergunta
+        complexa, cada uma com seu orçamento de saída e sua fila.
+        """
+        # Busca trechos relevantes nos documentos da universidade
+        with metrics.span("retrieval"):
+            documents = await self._retrieve(user_message)
+        
+        # A resposta já está escrita numa frase dos documentos?
+        best = None
+        if documents:
+            with metrics.span("extractive"):
+                best = self.extractive.best(user_message, documents)
+        
+        # Confiança alta e conversa nova: a frase e a fonte, sem o Gemini.
+        # Com histórico, a pergunta ("e para veteranos?") depende do contexto
+        # e a busca por palavras não basta.
+        if (self.extractive_answers and history is None and best is not None
+                and best.confidence >= self.extractive.min_confidence):
+            result = self._extractive_response(best)
+            await self._store_answer(user_message, cache_key, result, history)
+            return result
+        
+        # Monta o prompt com contexto universitário: histórico e documentos
+        # disputam o mesmo orçamento de tokens. O nome do usuário NÃO entra:
+        # a mesma resposta é compartilhada entre estudantes (cache e
+        # perguntas simultâneas)
+        with metrics.span("prompt_build"):
+            prompt = self.prompt_assembler.build(
+                user_message, documents, history, with_system=not self.system_instruction
+            )
+            documents = prompt.documents
+        
+        # Chama o Gemini (aqui é onde a mágica acontece!)
+        model_tier = self.tiers[tier]
+        with metrics.span("llm_call"), metrics.span(f"llm_call_{model_tier.name}"):
+            try:
+                response = await self._call_gemini(prompt.text, user_context.get('user_id'), on_delta,
+                                                   model_tier)
+            except Exception:
+                # Retries esgotados ou circuito aberto: responde com os documentos, se houver
+                fallback = self._fallback_response(documents, best)
+                if fallback is None:
+                    raise
+                return fallback
+        
+        # Fontes: documentos usados no prompt (sem repetir) ou o próprio modelo
+        sources = list(dict.fromkeys(hit.citation for hit in documents)) or ["Gemini 1.5 Flash"]
+        
+        output_tokens = estimate_tokens(response)
+        self._output_tokens["responses"] += 1
+        self._output_tokens["tokens"] += output_tokens
+        self._tokens.inc(prompt.input_tokens, direction="input", tier=model_tier.name)
+        self._tokens.inc(output_tokens, direction="output", tier=model_tier.name)
+        
+        result = BotResponse(
+            content=response,
+            confidence=self._generated_confidence(documents, best),
+            sources=sources,
+            tier=model_tier.name,
+            input_tokens=prompt.input_tokens,
+            output_tokens=output_tokens
+        )
+        await self._store_answer(user_message, cache_key, result, history)
+        return result
+    
+    async def _store_answer(self, user_message: str, cache_key: str, result: BotResponse,
+                            history: Optional[ConversationHistory]):
+        """Guarda a resposta no cache em memória e no disco."""
+        answer = CachedAnswer(result.content, result.confidence, list(result.sources))
+        await self.response_cache.put(user_message, answer, key=cache_key, semantic=history is None)
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(ANSWERS, cache_key, self.response_cache.corpus_version, asdict(answer))
+    
+    def _token_stats(self) -> Dict[str, Any]:
+        """Tokens de entrada (prompts montados) e de saída (respostas geradas)."""
+        generated = self._output_tokens["responses"]
+        return {
+            **self.prompt_assembler.get_stats(),
+            "system_instruction": self.system_instruction,
+            "responses": generated,
+            "output_tokens": self._output_tokens["tokens"],
+            "avg_output_tokens": round(self._output_tokens["tokens"] / generated, 1) if generated else 0.0,
+        }
+    
+    async def _call_gemini(self, prompt: str, user_id: Optional[str] = None,
+                           on_delta: Optional[Callable[[str], None]] = None,
+                           tier: Optional[ModelTier] = None) -> str:
         """
         Faz a chamada para a API do Gemini.
         
         Por que método separado?
         - Facilita testing (podemos mockar só esta função)
         - Isola a lógica de API do processamento de negócio
-        - Permite retry logic futuro
+        
+        O LLMClient (src/core/llm_client.py) cuida do resto:
+        - Scheduler: generate_content() é bloqueante e roda no pool, sem
+          travar o event loop; usuários são atendidos em round-robin
+        - Timeout, retries com backoff, hedging e circuit breaker
         """
         
+        tier = tier or self.tiers[TIER_COMPLEX]
         try:
-            print(f"🔍 Chamando Gemini modelo: {self.model.model_name}")
-            response = self.model.generate_content(prompt)
-            print(f"✅ Resposta recebida: {response.text[:100]}...")
-            return response.text.strip()
+            started = time.perf_counter()
+            text = await tier.llm.generate(prompt, user_id=user_id, on_delta=on_delta)
+            logger.debug("✅ Resposta do Gemini recebida", extra=fields(
+                user_id=user_id,
+                model=tier.model_name,
+                tier=tier.name,
+                streamed=on_delta is not None,
+                latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                chars=len(text)
+            ))
+            return text.strip()
             
+        except CircuitOpenError as e:
+            # Nem chamamos a API: o circuito já foi registrado quando abriu
+            logger.warning("🔌 Gemini indisponível: %s", e, extra=fields(user_id=user_id))
+            raise
         except Exception as e:
             # Log do erro para debugging
-            print(f"❌ Erro na API Gemini: {e}")
-            print(f"🔍 Modelo usado: {self.model.model_name}")
+            logger.error("❌ Erro na API Gemini: %s", e, extra=fields(
+                user_id=user_id, model=tier.model_name, tier=tier.name
+            ))
             raise  # Re-levanta o erro para ser tratado no nível superior
     
     def get_status(self) -> Dict[str, Any]:
@@ -223,11 +1300,89 @@ PERGUNTA DO ESTUDANTE:
             "initialized": self.is_initialized,
             "bot_name": self.bot_name,
             "has_api_key": bool(self.google_api_key),
+            "llm_scheduler": self.scheduler.get_stats(),
+            "llm_client": {**self.llm.get_stats(), "fallbacks": self._llm_fallbacks},
+            "tokens": self._token_stats(),
+            "response_cache": self.response_cache.get_stats(),
+            "persistent_cache": self.persistent_cache.get_stats() if self.persistent_cache else None,
+            "coalescing": self._in_flight.get_stats(),
+            "admission": self.admission.get_stats(),
+            "conversations": self.conversations.get_stats(),
+            "faq": self.faq.get_stats() if self.faq else None,
+            "question_log": self.question_log.get_stats() if self.question_log else None,
+            "extractive": {**self.extractive.get_stats(), "enabled": self.extractive_answers,
+                           "served": self._extractive_served},
+            "routing": {**self.router.get_stats(), "enabled": self.routing,
+                        "tiers": {name: tier.get_stats() for name, tier in self.tiers.items()}},
+            "streaming": self._get_stream_status(),
+            "stages": metrics.summary(),
+            "vector_index": self._get_index_status(),
             "timestamp": datetime.now().isoformat()
         }
 
-# Instância global do engine (Singleton pattern)
-# Por que singleton? 
+    async def fetch_status(self) -> Dict[str, Any]:
+        """
+        Versão async do get_status.
+        
+        É a que os adapters usam: com o engine em outro processo (ver
+        src/service/client.py) o status precisa de uma ida e volta.
+        """
+        return self.get_status()
+    
+    def _get_stream_status(self) -> Dict[str, Any]:
+        """Tempo até o primeiro texto nas respostas em streaming."""
+        recent = self._first_token_times
+        p95 = percentile(recent, 0.95)
+        avg = sum(recent) / len(recent) if recent else 0.0
+        return {
+            **self._stream_stats,
+            "avg_first_token_ms": round(avg * 1000, 1),
+            "p95_first_token_ms": round(p95 * 1000, 1),
+        }
+
+    def _get_index_status(self) -> Dict[str, Any]:
+        """Resumo do índice de documentos (carregado sob demanda) e das trocas de geração."""
+        status = {
+            "loaded": self.vector_index is not None,
+            "path": str(self.index_dir),
+            "process_rss_mb": round(process_rss_bytes() / 1024 / 1024, 1),
+            "reloads": self._index_reloads,
+        }
+        generation = self._generation
+        if generation is not None:
+            vector_index = generation.vector_index
+            status.update({
+                **generation.get_stats(),
+                "chunks": len(vector_index),
+                "dimension": vector_index.dimension,
+                "corpus_version": vector_index.corpus_version,
+                "mapped_mb": round(vector_index.mapped_bytes() / 1024 / 1024, 1),
+                "quantization": vector_index.quantization,
+                "search_mb": round(vector_index.search_bytes() / 1024 / 1024, 1),
+                "retired_in_use": sum(1 for old in self._retired_generations if not old.closed),
+                "retrieval": generation.retriever.get_stats(),
+                "embedding_worker": self.embedding_worker.get_stats() if self.embedding_worker else None,
+            })
+        return status
+
+# Instância global do engine (Singleton pattern), criada sob demanda
+# Por que singleton?
 # - Economiza recursos (só uma conexão com Gemini)
 # - Consistência (mesmo estado em toda aplicação)
-bot_engine = TesseraBotEngine()
\ No newline at end of file
+_engine: Optional[TesseraBotEngine] = None
+
+
+def get_engine() -> TesseraBotEngine:
+    """
+    Engine da aplicação, criado na primeira chamada.
+    
+    Por que uma função em vez de `bot_engine = TesseraBotEngine()`?
+    - Importar o módulo não configura o Gemini nem lê o .env: o main.py
+      decide quando o engine nasce (depois de conferir a configuração)
+    - Um restart fica rápido: o que é pesado (SDK, índice, modelo de
+      embeddings) só carrega quando alguém precisa
+    """
+    global _engine
+    if _engine is None:
+        _engine = TesseraBotEngine()
+    return _engine
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""
+Response Cache - Memória de Respostas Recentes
+
+Boa parte das perguntas que chegam ao bot são a mesma pergunta escrita
+de jeitos diferentes ("Quando é a matrícula?", "quando e a matricula").
+Cada uma custaria uma chamada completa ao Gemini - a não ser que a gente
+lembre da resposta!
+
+Camadas do cache:
+1. Chave exata: texto normalizado (sem acento, minúsculo, sem pontuação)
+2. Similaridade (opcional): embeddings para pegar quase-duplicatas
+
+Conceitos que você vai aprender aqui:
+- Normalização de texto (Unicode NFKD)
+- LRU (Least Recently Used) com OrderedDict
+- TTL (Time To Live) e invalidação de cache
+"""
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.core.log import get_logger
+
+logger = get_logger("cache")
+
+# Tudo que não for letra ou número vira espaço
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+# Custo fixo aproximado de cada entrada (objetos Python, chaves, etc.)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def normalize_question(text: str) -> str:
+    """
+    Normaliza uma pergunta para usar como chave de cache.
+
+    Exemplo:
+        "Quando é a MATRÍCULA??" -> "quando e a matricula"
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", without_accents).strip()
+
+
+def citation_source(citation: str) -> str:
+    """Documento de uma fonte citada: 'edital.pdf (p. 3)' -> 'edital.pdf'."""
+    return citation.rsplit(" (p. ", 1)[0]
+
+
+@dataclass
+class CachedAnswer:
+    """O que guardamos de uma resposta (sem timestamp: ele é da entrega)."""
+    content: str
+    confidence: float
+    sources: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _CacheEntry:
+    answer: CachedAnswer
+    created_at: float
+    size: int
+    vector: Any = None  # numpy array normalizado (tier de similaridade)
+
+
+class ResponseCache:
+    """
+    Cache LRU + TTL de respostas, limitado por quantidade e por memória.
+
+    Por que OrderedDict?
+    - move_to_end() marca uma entrada como "usada agora" em O(1)
+    - popitem(last=False) remove a menos usada em O(1)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 4 * 1024 * 1024,
+        ttl_seconds: float = 6 * 3600,
+        similarity_threshold: float = 0.92,
+        embed_fn: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            max_entries: Máximo de respostas guardadas
+            max_bytes: Memória aproximada máxima do cache
+            ttl_seconds: Tempo de vida de cada resposta
+            similarity_threshold: Similaridade de cosseno mínima no tier semântico
+            embed_fn: Função async texto -> vetor; sem ela, só o tier exato funciona
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self.corpus_version: Optional[str] = None
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "invalidated": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, question: str, key: Optional[str] = None,
+                  semantic: bool = True) -> Optional[CachedAnswer]:
+        """
+        Procura uma resposta para a pergunta.
+
+        Args:
+            question: Pergunta original do usuário
+            key: Chave já normalizada (evita normalizar duas vezes)
+            semantic: False = só a chave exata (ex: a chave inclui o
+                histórico da conversa, que o texto da pergunta não tem)
+        """
+        key = key or normalize_question(question)
+        entry = self._get_fresh(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.answer
+
+        if semantic and self.embed_fn is not None and self._entries:
+            similar = await self._find_similar(question)
+            if similar is not None:
+                self._stats["similar_hits"] += 1
+                return similar.answer
+
+        self._stats["misses"] += 1
+        return None
+
+    async def put(self, question: str, answer: CachedAnswer, key: Optional[str] = None,
+                  semantic: bool = True, age: float = 0.0):
+        """
+        Guarda uma resposta, removendo as menos usadas se passar do limite.
+
+        Com semantic=False a entrada não ganha vetor: só a chave exata a encontra.
+        `age` é a idade da resposta em segundos (ex: vinda do cache em disco),
+        para que ela não ganhe um TTL novo.
+        """
+        key = key or normalize_question(question)
+        if not key:
+            return
+
+        vector = await self._embed(question) if semantic and self.embed_fn is not None else None
+        size = self._estimate_size(key, answer, vector)
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = _CacheEntry(answer, time.monotonic() - age, size, vector)
+        self._bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._stats["evictions"] += 1
+
+    def set_corpus_version(self, version: Optional[str], keep_sources: Optional[Set[str]] = None) -> int:
+        """
+        Informa a versão atual dos documentos.
+
+        Se os documentos mudaram, as respostas guardadas podem estar
+        desatualizadas. Sem `keep_sources`, limpamos tudo; com ele (os
+        documentos que não mudaram), só sobrevivem as respostas que citam
+        apenas esses documentos - respostas sem fonte ou que citam um
+        documento alterado/removido são descartadas.
+
+        Returns:
+            Quantas respostas foram descartadas
+        """
+        if version == self.corpus_version:
+            return 0
+        stale: List[str] = []
+        if self._entries:
+            if keep_sources is None:
+                stale = list(self._entries)
+            else:
+                stale = [
+                    key for key, entry in self._entries.items()
+                    if not entry.answer.sources
+                    or any(citation_source(source) not in keep_sources for source in entry.answer.sources)
+                ]
+            for key in stale:
+                self._remove(key)
+            if stale:
+                self._stats["invalidations"] += 1
+                self._stats["invalidated"] += len(stale)
+        self.corpus_version = version
+        return len(stale)
+
+    def clear(self):
+        """Remove todas as respostas do cache."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores do cache para monitoramento."""
+        lookups = self._stats["hits"] + self._stats["similar_hits"] + self._stats["misses"]
+        hit_rate = (self._stats["hits"] + self._stats["similar_hits"]) / lookups if lookups else 0.0
+
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": round(hit_rate, 3),
+            "semantic_tier": self.embed_fn is not None,
+            "corpus_version": self.corpus_version,
+        }
+
+    def _get_fresh(self, key: str) -> Optional[_CacheEntry]:
+        """Retorna a entrada se existir e não estiver expirada."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        return entry
+
+    async def _find_similar(self, question: str) -> Optional[_CacheEntry]:
+        """Busca a entrada mais parecida pelo cosseno dos embeddings."""
+        import numpy as np  # Só carregamos numpy quando o tier semântico está ativo
+
+        query = await self._embed(question)
+        if query is None:
+            return None
+
+        now = time.monotonic()
+        candidates = [
+            (key, entry) for key, entry in self._entries.items()
+            if entry.vector is not None and now - entry.created_at <= self.ttl_seconds
+        ]
+        if not candidates:
+            return None
+
+        scores = np.stack([entry.vector for _, entry in candidates]) @ query
+        best = int(np.argmax(scores))
+        if float(scores[best]) < self.similarity_threshold:
+            return None
+
+        key, entry = candidates[best]
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _embed(self, text: str):
+        """Gera o vetor normalizado do texto (ou None se falhar)."""
+        import numpy as np
+
+        try:
+            vector = np.asarray(await self.embed_fn(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning("⚠️ Falha ao gerar embedding para o cache: %s", e)
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    @staticmethod
+    def _estimate_size(key: str, answer: CachedAnswer, vector) -> int:
+        """Estimativa simples do espaço ocupado por uma entrada."""
+        size = _ENTRY_OVERHEAD_BYTES + len(key.encode("utf-8")) + len(answer.content.encode("utf-8"))
+        size += sum(len(source.encode("utf-8")) for source in answer.sources)
+        if vector is not None:
+            size += vector.nbytes
+        return size
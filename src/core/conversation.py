@@ -0,0 +1,251 @@
+"""
+Conversation Memory - Lembrar da conversa sem estourar a memória
+
+Sem memória, cada mensagem é uma pergunta nova: "e para veteranos?"
+chega sem saber do que se falava, e o estudante acaba reescrevendo a
+pergunta longa inteira (duas chamadas ao Gemini no lugar de uma).
+
+Este módulo guarda as últimas trocas de cada estudante:
+- Ring buffer por usuário (deque com maxlen): só as N últimas trocas
+- Trocas que saem do buffer viram um resumo curto (extrativo, sem LLM)
+- LRU global entre usuários, limitado por quantidade E por bytes
+- Conversas paradas expiram sozinhas (idle timeout)
+
+Com dezenas de milhares de estudantes diferentes, a memória fica no
+teto configurado: o usuário menos recente é esquecido primeiro.
+
+Conceitos que você vai aprender aqui:
+- Ring buffers (collections.deque com maxlen)
+- LRU com OrderedDict + limite de memória aproximada
+- Resumo extrativo (primeira frase) no lugar de chamar o LLM
+- Fingerprint (hash curto) para usar o histórico em chaves de cache
+"""
+
+import hashlib
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+
+# Custo fixo aproximado de uma conversa (objeto, deque, chave no dict)
+# e de cada troca (tupla); o texto é medido com sys.getsizeof
+_CONVERSATION_OVERHEAD_BYTES = 1000
+_TURN_OVERHEAD_BYTES = 64
+
+# Fim de frase: ponto, exclamação ou interrogação seguidos de espaço
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class Turn(NamedTuple):
+    """Uma troca: pergunta do estudante e resposta do bot."""
+    question: str
+    answer: str
+
+
+@dataclass(frozen=True)
+class ConversationHistory:
+    """
+    Cópia imutável do histórico de um estudante (vai junto com a pergunta).
+
+    Imutável porque a resposta é gerada depois: se o mesmo estudante
+    mandar outra mensagem no meio tempo, este histórico não muda.
+    """
+    turns: Tuple[Turn, ...]
+    summary: str
+    fingerprint: str
+
+
+def clip(text: str, max_chars: int) -> str:
+    """Corta o texto no limite, sem quebrar a última palavra."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    # "..." e não "…": um único caractere fora do latin-1 dobra o
+    # tamanho da string inteira na memória (PEP 393)
+    return cut.rstrip(" ,;:") + "..."
+
+
+def first_sentence(text: str, max_chars: int) -> str:
+    """Primeira frase do texto (cortada em `max_chars`)."""
+    text = " ".join(text.split())
+    return clip(_SENTENCE_END.split(text, maxsplit=1)[0], max_chars)
+
+
+def summarize_turn(turn: Turn, max_chars: int = 160) -> str:
+    """
+    Resumo extrativo de uma troca: primeira frase da pergunta e da resposta.
+
+    Por que não pedir um resumo ao Gemini?
+    - Custaria uma chamada extra por troca (justamente o que queremos evitar)
+    - Para entender "e para veteranos?", saber o assunto já basta
+    """
+    question = first_sentence(turn.question, max_chars // 2)
+    answer = first_sentence(turn.answer, max_chars - len(question))
+    return f"{question} -> {answer}"
+
+
+class _Conversation:
+    """Estado de um estudante (slots: milhares destes objetos na memória)."""
+
+    __slots__ = ("turns", "summary", "last_seen", "size", "fingerprint")
+
+    def __init__(self, max_turns: int, now: float):
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.summary = ""
+        self.last_seen = now
+        self.size = _CONVERSATION_OVERHEAD_BYTES
+        self.fingerprint: Optional[str] = None
+
+
+class ConversationMemory:
+    """
+    Histórico recente por usuário, com memória total limitada.
+
+    Uso:
+        history = memory.get(user_id)          # None = conversa nova
+        ...responde usando history...
+        memory.record(user_id, pergunta, resposta)
+    """
+
+    def __init__(self, max_turns: int = 4, idle_seconds: float = 900,
+                 max_users: int = 10000, max_bytes: int = 4 * 1024 * 1024,
+                 max_turn_chars: int = 600, summary_chars: int = 480):
+        """
+        Args:
+            max_turns: Trocas guardadas na íntegra por usuário (0 = desliga)
+            idle_seconds: Conversa parada por mais que isso é esquecida
+            max_users: Máximo de conversas guardadas
+            max_bytes: Memória aproximada máxima de todas as conversas
+            max_turn_chars: Tamanho máximo guardado de cada pergunta/resposta
+            summary_chars: Tamanho máximo do resumo das trocas antigas
+        """
+        self.max_turns = max(0, max_turns)
+        self.idle_seconds = idle_seconds
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.max_turn_chars = max_turn_chars
+        self.summary_chars = summary_chars
+
+        # Ordem = última troca registrada (o primeiro é o mais antigo)
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"recorded": 0, "follow_ups": 0, "expirations": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns > 0
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, user_id: Optional[str]) -> Optional[ConversationHistory]:
+        """Histórico do usuário, ou None se ele não tiver conversa recente."""
+        if user_id is None or not self._conversations:
+            return None
+        conversation = self._conversations.get(user_id)
+        if conversation is None:
+            return None
+        if time.monotonic() - conversation.last_seen > self.idle_seconds:
+            self._remove(user_id)
+            self._stats["expirations"] += 1
+            return None
+
+        if conversation.fingerprint is None:
+            conversation.fingerprint = self._fingerprint(conversation)
+        self._stats["follow_ups"] += 1
+        return ConversationHistory(tuple(conversation.turns), conversation.summary, conversation.fingerprint)
+
+    def record(self, user_id: Optional[str], question: str, answer: str):
+        """Guarda uma troca; a mais antiga do buffer vira resumo."""
+        if user_id is None or not self.enabled:
+            return
+
+        now = time.monotonic()
+        conversation = self._conversations.get(user_id)
+        if conversation is None or now - conversation.last_seen > self.idle_seconds:
+            self._remove(user_id)
+            conversation = self._conversations[user_id] = _Conversation(self.max_turns, now)
+            self._bytes += conversation.size
+        else:
+            self._conversations.move_to_end(user_id)
+
+        if len(conversation.turns) == self.max_turns:
+            self._fold_into_summary(conversation, conversation.turns[0])
+        conversation.turns.append(Turn(
+            clip(question, self.max_turn_chars),
+            clip(answer, self.max_turn_chars)
+        ))
+        conversation.last_seen = now
+        conversation.fingerprint = None
+        self._resize(conversation)
+        self._stats["recorded"] += 1
+
+        self._evict(now)
+
+    def forget(self, user_id: str):
+        """Apaga a conversa de um usuário (ex: comando de "nova conversa")."""
+        self._remove(user_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas das conversas para o get_status()."""
+        return {
+            **self._stats,
+            "users": len(self._conversations),
+            "turns": sum(len(conversation.turns) for conversation in self._conversations.values()),
+            "bytes": self._bytes,
+            "max_users": self.max_users,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _fold_into_summary(self, conversation: _Conversation, turn: Turn):
+        """Acrescenta a troca ao resumo, descartando as frases mais antigas."""
+        line = summarize_turn(turn)
+        summary = f"{conversation.summary} | {line}" if conversation.summary else line
+        while len(summary) > self.summary_chars and " | " in summary:
+            summary = summary.split(" | ", 1)[1]
+        conversation.summary = clip(summary, self.summary_chars)
+
+    def _resize(self, conversation: _Conversation):
+        """Recalcula o tamanho aproximado da conversa."""
+        size = _CONVERSATION_OVERHEAD_BYTES + sys.getsizeof(conversation.summary)
+        size += sum(_TURN_OVERHEAD_BYTES + sys.getsizeof(turn.question) + sys.getsizeof(turn.answer)
+                    for turn in conversation.turns)
+        self._bytes += size - conversation.size
+        conversation.size = size
+
+    def _evict(self, now: float):
+        """Remove conversas paradas e, se preciso, as menos recentes."""
+        # As mais antigas estão no começo: paramos na primeira ainda ativa
+        while self._conversations:
+            user_id, oldest = next(iter(self._conversations.items()))
+            if now - oldest.last_seen <= self.idle_seconds:
+                break
+            self._remove(user_id)
+            self._stats["expirations"] += 1
+
+        while len(self._conversations) > 1 and (
+            len(self._conversations) > self.max_users or self._bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._conversations)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, user_id: str):
+        conversation = self._conversations.pop(user_id, None)
+        if conversation is not None:
+            self._bytes -= conversation.size
+
+    @staticmethod
+    def _fingerprint(conversation: _Conversation) -> str:
+        """Hash curto do histórico: mesma conversa = mesma chave de cache."""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(conversation.summary.encode("utf-8"))
+        for turn in conversation.turns:
+            digest.update(b"\x1f" + turn.question.encode("utf-8"))
+            digest.update(b"\x1e" + turn.answer.encode("utf-8"))
+        return digest.hexdigest()
@@ -0,0 +1,280 @@
+"""
+Embedding Worker - Embeddings num processo separado, em micro-lotes
+
+Codificar uma pergunta com sentence-transformers é trabalho pesado de CPU.
+Rodando no mesmo processo do bot, ele disputa o GIL com o event loop do
+Discord; e codificar uma pergunta por vez desperdiça CPU (o modelo é muito
+mais eficiente em lotes).
+
+A solução tem duas partes:
+1. Um processo dedicado carrega o modelo UMA vez (e aquece na largada)
+2. O cliente junta perguntas que chegam quase juntas num micro-lote:
+   envia quando o lote enche (max_batch) ou quando o primeiro item
+   esperou max_wait_ms - o que vier primeiro
+
+Conceitos que você vai aprender aqui:
+- multiprocessing com contexto "spawn"
+- Micro-batching (trocar alguns ms de espera por throughput)
+- Ponte entre threads e asyncio (call_soon_threadsafe)
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.log import fields, get_logger
+
+logger = get_logger("embeddings")
+
+
+def _worker_main(model_name: str, requests, responses):
+    """
+    Loop do processo de embeddings.
+
+    Mensagens recebidas: (batch_id, [textos]) ou None para encerrar.
+    Mensagens enviadas: ("ready", dimensão) e (batch_id, vetores | Exception).
+    """
+    from src.core.embeddings import SentenceEmbedder
+
+    embedder = SentenceEmbedder(model_name=model_name)
+    # Aquecimento: carrega pesos e inicializa kernels antes do 1º estudante
+    embedder.encode(["aquecimento do modelo de embeddings"])
+    responses.put(("ready", embedder.dimension))
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        batch_id, texts = message
+        try:
+            responses.put((batch_id, embedder.encode(texts)))
+        except Exception as e:
+            responses.put((batch_id, RuntimeError(f"Falha no worker de embeddings: {e}")))
+
+
+class EmbeddingWorkerClient:
+    """
+    Cliente asyncio do processo de embeddings.
+
+    Uso:
+        client = EmbeddingWorkerClient(model_name)
+        await client.start()          # sobe o processo e espera o aquecimento
+        vetor = await client.embed("quando é a matrícula?")
+    """
+
+    def __init__(self, model_name: str, max_batch: int = 16, max_wait_ms: float = 5.0,
+                 startup_timeout: float = 120.0):
+        """
+        Args:
+            model_name: Modelo sentence-transformers (o mesmo do índice)
+            max_batch: Máximo de perguntas por lote
+            max_wait_ms: Espera máxima para completar um lote
+            startup_timeout: Tempo máximo para carregar e aquecer o modelo
+        """
+        self.model_name = model_name
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.startup_timeout = startup_timeout
+
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._requests = None
+        self._responses = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        self._pending: List[tuple] = []            # (texto, future) do lote atual
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Dict[int, List[asyncio.Future]] = {}
+        self._next_batch_id = 0
+
+        self._stats = {"batches": 0, "items": 0, "max_batch_seen": 0, "restarts": 0, "errors": 0}
+        self._startup_seconds: Optional[float] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    async def start(self):
+        """Sobe o processo (se necessário) e espera o modelo ficar pronto."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self.is_running and self._warmed_up():
+                return
+
+            if self._process is not None:
+                self._stats["restarts"] += 1
+                self._fail_all(RuntimeError("Worker de embeddings reiniciado"))
+                # O antigo pode estar vivo (ex: estourou o startup_timeout ainda
+                # carregando o modelo): encerra antes de subir outro. Fora do
+                # event loop, porque o join pode levar alguns segundos
+                process, requests = self._process, self._requests
+                self._process = None
+                await asyncio.to_thread(_shutdown, process, requests)
+
+            self._loop = asyncio.get_running_loop()
+            self._ready = self._loop.create_future()
+            self._requests = self._context.Queue()
+            self._responses = self._context.Queue()
+            self._process = self._context.Process(
+                target=_worker_main,
+                args=(self.model_name, self._requests, self._responses),
+                name="tessera-embeddings",
+                daemon=True,
+            )
+
+            started = time.perf_counter()
+            self._process.start()
+            self._reader = threading.Thread(
+                target=self._read_responses, args=(self._process, self._responses),
+                name="tessera-embeddings-reader", daemon=True
+            )
+            self._reader.start()
+
+            try:
+                await asyncio.wait_for(asyncio.shield(self._ready), self.startup_timeout)
+            except asyncio.TimeoutError:
+                self._ready.cancel()  # Ninguém mais espera por este aquecimento
+                raise
+            self._startup_seconds = time.perf_counter() - started
+            logger.info("🧮 Worker de embeddings pronto", extra=fields(
+                pid=self._process.pid, startup_seconds=round(self._startup_seconds, 1)
+            ))
+
+    def _warmed_up(self) -> bool:
+        """O processo atual avisou que o modelo está pronto?"""
+        ready = self._ready
+        return ready is not None and ready.done() and not ready.cancelled() and ready.exception() is None
+
+    async def embed(self, text: str):
+        """Codifica um texto; chamadas simultâneas são agrupadas em lotes."""
+        if not self.is_running:
+            await self.start()
+
+        future = self._loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Envia o lote atual para o processo de embeddings."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        batch_id = self._next_batch_id
+        self._next_batch_id += 1
+        self._in_flight[batch_id] = [future for _, future in batch]
+
+        self._stats["batches"] += 1
+        self._stats["items"] += len(batch)
+        self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(batch))
+        self._requests.put((batch_id, [text for text, _ in batch]))
+
+    def _read_responses(self, process, responses):
+        """Thread que lê as respostas do processo e acorda as futures."""
+        while True:
+            try:
+                message = responses.get(timeout=1.0)
+            except queue.Empty:
+                if not process.is_alive():
+                    self._call_in_loop(self._on_process_exit, process)
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            self._call_in_loop(self._resolve, *message)
+
+    def _call_in_loop(self, callback, *args):
+        """Agenda `callback` no event loop (ignora se o loop já foi fechado)."""
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass
+
+    def _on_process_exit(self, process):
+        """O processo morreu: falha as chamadas pendentes (se ainda for o atual)."""
+        if process is self._process:
+            self._fail_all(RuntimeError("Worker de embeddings terminou inesperadamente"))
+
+    def _resolve(self, batch_id, result):
+        """Entrega o resultado de um lote (roda no event loop)."""
+        if batch_id == "ready":
+            if self._ready is not None and not self._ready.done():
+                self._ready.set_result(result)
+            return
+
+        futures = self._in_flight.pop(batch_id, [])
+        for index, future in enumerate(futures):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result[index])
+        if isinstance(result, Exception):
+            self._stats["errors"] += 1
+
+    def _fail_all(self, error: Exception):
+        """Falha todas as chamadas pendentes (ex: processo morreu)."""
+        if self._ready is not None and not self._ready.done():
+            self._ready.set_exception(error)
+        for futures in self._in_flight.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+        self._in_flight.clear()
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de micro-batching para o get_status()."""
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "running": self.is_running,
+            "pid": self._process.pid if self._process is not None else None,
+            "avg_batch": round(self._stats["items"] / batches, 2) if batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "startup_seconds": round(self._startup_seconds, 2) if self._startup_seconds else None,
+        }
+
+    def stop(self):
+        """Encerra o processo de embeddings (e falha quem ainda esperava por ele)."""
+        if self._process is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._fail_all(RuntimeError("Worker de embeddings encerrado"))
+        process, self._process = self._process, None
+        _shutdown(process, self._requests)
+
+
+def _shutdown(process, requests, timeout: float = 5.0):
+    """Pede para o processo sair (sentinela); se não sair a tempo, termina à força."""
+    try:
+        requests.put(None)
+        process.join(timeout=timeout)
+    except (OSError, ValueError):
+        pass  # Fila já fechada: o processo não vai ler a sentinela
+    finally:
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout=timeout)
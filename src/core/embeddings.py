@@ -0,0 +1,81 @@
+"""
+Embeddings - Transformando Texto em Vetores
+
+Para buscar "por significado" nos documentos, cada trecho de texto vira
+um vetor de números (embedding). Textos parecidos geram vetores próximos.
+
+Usamos sentence-transformers com um modelo multilíngue (entende português)
+e pequeno o suficiente para rodar em CPU.
+
+Conceitos que você vai aprender aqui:
+- Embeddings e similaridade de cosseno
+- Lazy loading de modelos pesados
+- Processamento em lotes (batching)
+"""
+
+import os
+from typing import Optional, Sequence
+
+from src.core.log import get_logger
+
+logger = get_logger("embeddings")
+
+# Modelo padrão: multilíngue, 384 dimensões, ~120MB
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class SentenceEmbedder:
+    """
+    Gera embeddings normalizados (norma 1) com sentence-transformers.
+
+    Por que normalizar?
+    - Com vetores de norma 1, produto interno == similaridade de cosseno
+    - Permite usar índices de produto interno (mais simples e rápidos)
+    """
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: int = 32):
+        """
+        Args:
+            model_name: Nome do modelo sentence-transformers
+            batch_size: Quantos textos codificar por vez
+        """
+        self.model_name = model_name or os.getenv('EMBEDDING_MODEL', DEFAULT_EMBEDDING_MODEL)
+        self.batch_size = batch_size
+        self._model = None
+
+    @property
+    def model(self):
+        """Carrega o modelo só no primeiro uso (é pesado!)."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info("🧮 Carregando modelo de embeddings: %s", self.model_name)
+            self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        """Número de dimensões dos vetores gerados."""
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]):
+        """
+        Codifica uma lista de textos.
+
+        Returns:
+            numpy.ndarray float32 de formato (len(texts), dimension)
+        """
+        import numpy as np
+
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def encode_one(self, text: str):
+        """Atalho para codificar um único texto (retorna um vetor 1D)."""
+        return self.encode([text])[0]
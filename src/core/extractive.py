@@ -0,0 +1,160 @@
+"""
+Extractive Answers - Quando o PDF já tem a frase exata
+
+"Qual a data limite da rematrícula 2026.2?" costuma ter a resposta
+escrita, palavra por palavra, numa frase do calendário. Pagar uma
+geração inteira do Gemini para reescrever essa frase é desperdício de
+dinheiro e de segundos.
+
+Este módulo procura, nos trechos encontrados pela busca, a frase que
+melhor responde à pergunta e calcula uma confiança de verdade:
+- Cobertura: quanto dos termos da pergunta (pesados por IDF) a frase contém
+- Termos exatos: datas, códigos e números da pergunta precisam aparecer
+- Tipo de resposta: pergunta de data/prazo pede uma frase com data
+- Busca: posição do trecho no ranking e similaridade do embedding
+
+Com confiança alta, o engine responde direto com a frase e a fonte
+(documento e página), sem chamar o LLM. Com confiança baixa, a mesma
+nota vira a confiança da resposta gerada pelo Gemini.
+
+Conceitos que você vai aprender aqui:
+- Extractive QA (responder copiando, não gerando)
+- Heurísticas explicáveis de confiança
+- IDF para pesar termos raros
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.core.lexical_index import fold_accents, is_exact_token, tokenize
+from src.core.vector_store import SearchHit
+
+# Fim de frase (ou de linha) dentro de um trecho
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+# Perguntas que pedem uma data ou um prazo (texto já sem acentos)
+_DATE_QUESTION = re.compile(r"\b(quando|data|datas|prazo|prazos|dia|dias|periodo|ate quando|inicio|termino|limite)\b")
+
+# Perguntas que pedem explicação: uma frase solta raramente basta
+_HOW_QUESTION = re.compile(r"\b(como|por que|porque|explique|explica|diferenca)\b")
+
+# Palavras da pergunta que uma data responde ("data limite" -> "15/08")
+_DATE_WORDS = frozenset({"data", "dia", "dias", "prazo", "periodo", "inicio", "termino", "limite"})
+
+# Datas: 15/03, 15/03/2026, 15 de março
+_DATE = re.compile(
+    r"\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b|\b\d{1,2} de (?:janeiro|fevereiro|marco|abril|maio|junho|julho|"
+    r"agosto|setembro|outubro|novembro|dezembro)\b"
+)
+
+# Frases menores que isso ganham a frase seguinte como contexto
+_MIN_SENTENCE_CHARS = 40
+
+
+@dataclass
+class ExtractiveAnswer:
+    """A melhor frase encontrada e o quanto confiamos nela."""
+    text: str
+    confidence: float
+    hit: SearchHit
+
+    @property
+    def citation(self) -> str:
+        return self.hit.citation
+
+
+def split_sentences(text: str) -> List[str]:
+    """Quebra um trecho em frases (ignorando pedaços vazios)."""
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+class ExtractiveAnswerer:
+    """
+    Escolhe a frase dos documentos que melhor responde à pergunta.
+
+    Uso:
+        best = answerer.best(pergunta, trechos)
+        if best is not None and best.confidence >= answerer.min_confidence:
+            responder(best.text, fonte=best.citation)
+    """
+
+    def __init__(self, min_confidence: float = 0.75, max_hits: int = 3,
+                 idf_fn: Optional[Callable[[str], float]] = None):
+        """
+        Args:
+            min_confidence: Confiança mínima para responder sem o LLM
+            max_hits: Trechos do topo da busca examinados
+            idf_fn: Peso de cada termo (ex: IDF do índice BM25); sem ela, pesos iguais
+        """
+        self.min_confidence = min_confidence
+        self.max_hits = max_hits
+        self.idf_fn = idf_fn
+        self._stats = {"lookups": 0, "confident": 0}
+
+    def best(self, question: str, hits: List[SearchHit]) -> Optional[ExtractiveAnswer]:
+        """A frase com maior confiança entre os primeiros trechos (ou None)."""
+        terms = list(dict.fromkeys(tokenize(question)))
+        if not terms or not hits:
+            return None
+        self._stats["lookups"] += 1
+
+        weights = self._weights(terms)
+        total_weight = sum(weights.values())
+        exact_terms = [term for term in terms if is_exact_token(term)]
+        folded_question = fold_accents(question)
+        wants_date = bool(_DATE_QUESTION.search(folded_question))
+        wants_explanation = bool(_HOW_QUESTION.search(folded_question))
+        # Uma palavra só ("monitoria?") é pouca evidência de que a frase responde
+        term_factor = min(1.0, len(terms) / 2)
+
+        best: Optional[ExtractiveAnswer] = None
+        for rank, hit in enumerate(hits[:self.max_hits]):
+            retrieval = self._retrieval_strength(hit, rank)
+            sentences = split_sentences(hit.chunk["text"])
+            for position, sentence in enumerate(sentences):
+                if len(sentence) < _MIN_SENTENCE_CHARS and position + 1 < len(sentences):
+                    sentence = f"{sentence} {sentences[position + 1]}"
+                sentence_terms = set(tokenize(sentence))
+                has_date = bool(_DATE.search(fold_accents(sentence)))
+                if has_date:
+                    sentence_terms |= _DATE_WORDS
+
+                coverage = sum(weight for term, weight in weights.items() if term in sentence_terms) / total_weight
+                coverage *= term_factor
+                if exact_terms and not all(term in sentence_terms for term in exact_terms):
+                    coverage *= 0.5  # "2026.2" na pergunta e não na frase: provavelmente outra coisa
+
+                if wants_date:
+                    answer_type = 1.0 if has_date else 0.0
+                elif wants_explanation:
+                    answer_type = 0.2
+                else:
+                    answer_type = 0.5
+
+                confidence = 0.65 * coverage + 0.2 * retrieval + 0.15 * answer_type
+                if wants_date and not has_date:
+                    confidence = min(confidence, 0.5)
+
+                if best is None or confidence > best.confidence:
+                    best = ExtractiveAnswer(sentence, round(confidence, 3), hit)
+
+        if best is not None and best.confidence >= self.min_confidence:
+            self._stats["confident"] += 1
+        return best
+
+    def _weights(self, terms: List[str]) -> Dict[str, float]:
+        if self.idf_fn is None:
+            return {term: 1.0 for term in terms}
+        return {term: max(0.1, self.idf_fn(term)) for term in terms}
+
+    @staticmethod
+    def _retrieval_strength(hit: SearchHit, rank: int) -> float:
+        """Força do trecho na busca: posição no ranking e cosseno (se houver)."""
+        by_rank = 1.0 / (1 + rank)
+        if hit.dense_score is None:
+            return by_rank
+        return (by_rank + max(0.0, min(1.0, hit.dense_score))) / 2
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self._stats, "min_confidence": self.min_confidence}
@@ -0,0 +1,230 @@
+"""
+FAQ Index - Perguntas frequentes respondidas de antemão
+
+As dúvidas se repetem todo semestre. O job offline (src/build_faq.py)
+agrupa as perguntas registradas (src/core/question_log.py), gera uma
+resposta canônica para cada grupo frequente e grava um índice pequeno:
+
+    data/faq/faq.npz
+        vectors   # (N, D) float32: centro de cada grupo (norma 1)
+        entries   # JSON: pergunta canônica, resposta, fontes, frequência
+        meta      # JSON: modelo de embeddings e versão dos documentos
+
+O engine consulta esse índice ANTES da busca e do Gemini: uma pergunta
+parecida o bastante com um grupo recebe a resposta pronta.
+
+O arquivo pode ser trocado com o bot rodando: o FaqStore confere de
+tempos em tempos se ele mudou e troca o índice inteiro de uma vez
+(quem estava consultando o antigo termina com ele).
+
+Conceitos que você vai aprender aqui:
+- Respostas pré-computadas (trabalho caro fora do caminho da pergunta)
+- Vizinho mais próximo com produto interno
+- Hot swap: trocar uma referência em vez de modificar o objeto
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.log import fields, get_logger
+
+logger = get_logger("faq")
+
+FAQ_FILENAME = "faq.npz"
+FAQ_FORMAT_VERSION = 1
+
+
+@dataclass
+class FaqEntry:
+    """Um grupo de perguntas frequentes e sua resposta canônica."""
+    question: str
+    answer: str
+    confidence: float
+    sources: List[str] = field(default_factory=list)
+    count: int = 0  # Quantas vezes perguntaram algo deste grupo
+
+
+class FaqIndex:
+    """
+    Índice somente-leitura de perguntas frequentes.
+
+    Pequeno (centenas de grupos): fica inteiro na RAM e a busca é um
+    único produto matriz x vetor.
+    """
+
+    def __init__(self, entries: List[FaqEntry], vectors: np.ndarray, meta: Dict[str, Any]):
+        self.entries = entries
+        self.vectors = vectors
+        self.meta = meta
+
+    @classmethod
+    def open(cls, path: Path) -> "FaqIndex":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != FAQ_FORMAT_VERSION:
+                raise ValueError(f"Formato de FAQ não suportado: {meta.get('format')}")
+            entries = [FaqEntry(**entry) for entry in json.loads(str(data["entries"]))]
+            vectors = np.ascontiguousarray(data["vectors"], dtype=np.float32)
+        if len(entries) != len(vectors):
+            raise ValueError("FAQ corrompido: entradas e vetores não batem")
+        return cls(entries, vectors, meta)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self.meta.get("embedding_model")
+
+    @property
+    def corpus_version(self) -> Optional[str]:
+        return self.meta.get("corpus_version")
+
+    def search(self, query) -> Tuple[Optional[FaqEntry], float]:
+        """Grupo mais parecido com a pergunta e a similaridade (cosseno)."""
+        if not self.entries:
+            return None, 0.0
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        best = int(np.argmax(scores))
+        return self.entries[best], float(scores[best])
+
+
+def write_faq_index(path: Path, entries: List[FaqEntry], vectors: np.ndarray, meta: Dict[str, Any]):
+    """
+    Grava o índice de forma atômica (arquivo temporário + os.replace).
+
+    Um arquivo só: o bot nunca lê entradas novas com vetores velhos.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as handle:
+        np.savez(
+            handle,
+            vectors=np.asarray(vectors, dtype=np.float32),
+            entries=np.array(json.dumps([asdict(entry) for entry in entries], ensure_ascii=False)),
+            meta=np.array(json.dumps({**meta, "format": FAQ_FORMAT_VERSION}, ensure_ascii=False)),
+        )
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+class FaqStore:
+    """
+    Guarda o índice de FAQ atual e o troca quando o arquivo muda.
+
+    Uso:
+        await store.refresh()          # barato: só um stat() a cada N segundos
+        found = store.lookup(vetor, modelo, versao_do_corpus)
+        if found is not None:
+            entry, score = found
+    """
+
+    def __init__(self, path: Path, min_score: float = 0.9, check_interval: float = 30):
+        """
+        Args:
+            path: Arquivo gerado pelo job offline (pode ainda não existir)
+            min_score: Similaridade mínima para usar a resposta pronta
+            check_interval: Segundos entre verificações do arquivo
+        """
+        self.path = Path(path)
+        self.min_score = min_score
+        self.check_interval = check_interval
+        self.index: Optional[FaqIndex] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at: Optional[float] = None
+        self._loaded_at: Optional[float] = None
+        self._stale_warned = False
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "reloads": 0, "errors": 0}
+
+    @property
+    def loaded(self) -> bool:
+        return self.index is not None and len(self.index) > 0
+
+    async def refresh(self, force: bool = False) -> bool:
+        """
+        Recarrega o índice se o arquivo mudou (True = trocou).
+
+        A leitura roda numa thread; só a troca da referência acontece no
+        event loop, então nenhuma consulta vê um índice pela metade.
+        """
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+
+        started = time.perf_counter()
+        try:
+            index = await asyncio.to_thread(FaqIndex.open, self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._stats["errors"] += 1
+            self._signature = signature  # Não tenta de novo até o arquivo mudar
+            logger.warning("⚠️ Falha ao carregar FAQ %s: %s", self.path, e)
+            return False
+
+        self.index = index
+        self._signature = signature
+        self._loaded_at = time.time()
+        self._stale_warned = False
+        self._stats["reloads"] += 1
+        logger.info("📌 FAQ carregado", extra=fields(
+            entries=len(index),
+            load_ms=round((time.perf_counter() - started) * 1000, 1)
+        ))
+        return True
+
+    def lookup(self, query, embedding_model: str,
+               corpus_version: Optional[str]) -> Optional[Tuple[FaqEntry, float]]:
+        """
+        Resposta pronta para a pergunta (ou None).
+
+        O FAQ só vale para o mesmo modelo de embeddings (senão os vetores
+        não são comparáveis) e a mesma versão dos documentos (senão as
+        respostas podem estar desatualizadas - rode o job de novo).
+        """
+        index = self.index
+        if index is None:
+            return None
+        if index.embedding_model != embedding_model or index.corpus_version != corpus_version:
+            self._stats["stale"] += 1
+            if not self._stale_warned:
+                self._stale_warned = True
+                logger.warning("⚠️ FAQ gerado para outros documentos/modelo - ignorado até o próximo job")
+            return None
+
+        entry, score = index.search(query)
+        if entry is None or score < self.min_score:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return entry, score
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores do FAQ para o get_status()."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self.index) if self.index is not None else 0,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "loaded_at": (datetime.fromtimestamp(self._loaded_at).isoformat(timespec="seconds")
+                          if self._loaded_at is not None else None),
+            "path": str(self.path),
+        }
+
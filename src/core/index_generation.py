@@ -0,0 +1,116 @@
+"""
+Index Generations - Trocando o índice com o bot rodando
+
+Quando sai um edital novo, ele precisa aparecer na busca em minutos,
+e reiniciar o bot derruba a sessão do Discord. A ingestão grava cada
+build numa geração nova e aponta o arquivo CURRENT para ela (ver
+src/core/vector_store.py); o engine percebe e troca de geração.
+
+A troca não pode quebrar quem está no meio de uma busca:
+- Cada busca "pega" a geração atual (contagem de referências)
+- A troca só muda qual é a geração atual (uma atribuição)
+- A geração antiga é aposentada e só fecha os arquivos quando a
+  última busca que a usava termina
+
+Conceitos que você vai aprender aqui:
+- Reference counting para liberar recursos compartilhados
+- Troca de versão sem downtime (blue/green em miniatura)
+- Invalidação seletiva: quais documentos mudaram entre gerações
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from src.core.lexical_index import LexicalIndex
+from src.core.log import fields, get_logger
+from src.core.retriever import HybridRetriever
+from src.core.vector_store import VectorIndex
+
+logger = get_logger("index")
+
+
+class IndexGeneration:
+    """
+    Uma geração aberta do índice: vetorial + lexical + retriever.
+
+    Uso (sempre no event loop):
+        generation.acquire()
+        try:
+            hits = await generation.retriever.retrieve(pergunta)
+        finally:
+            generation.release()
+    """
+
+    def __init__(self, vector_index: VectorIndex, lexical_index: Optional[LexicalIndex],
+                 retriever: HybridRetriever, load_seconds: float):
+        self.vector_index = vector_index
+        self.lexical_index = lexical_index
+        self.retriever = retriever
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.refs = 0
+        self.retired = False
+        self.closed = False
+
+    @property
+    def name(self) -> Optional[str]:
+        """Nome da geração (None = índice no formato antigo, sem gerações)."""
+        return self.vector_index.meta.get("generation")
+
+    @property
+    def sources(self) -> Optional[Dict[str, str]]:
+        """Documento -> hash do conteúdo (None em índices antigos)."""
+        return self.vector_index.meta.get("sources")
+
+    def acquire(self):
+        self.refs += 1
+
+    def release(self):
+        self.refs -= 1
+        if self.retired and self.refs == 0:
+            self._close()
+
+    def retire(self):
+        """Marca como antiga; fecha agora ou quando a última busca terminar."""
+        self.retired = True
+        if self.refs == 0:
+            self._close()
+
+    def _close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.vector_index.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+        logger.debug("📕 Geração antiga fechada", extra=fields(generation=self.name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "generation": self.name,
+            "in_use": self.refs,
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(timespec="seconds"),
+        }
+
+
+def unchanged_sources(previous: Optional[IndexGeneration], current: IndexGeneration) -> Optional[Set[str]]:
+    """
+    Documentos que não mudaram entre as duas gerações.
+
+    None = não dá para aproveitar nada do cache:
+    - Não havia geração anterior, ou uma delas não tem os hashes
+    - O modelo de embeddings mudou (vetores do cache semântico inválidos)
+    - Entrou um documento novo: ele pode responder melhor qualquer pergunta
+    """
+    if previous is None or previous.sources is None or current.sources is None:
+        return None
+    if previous.vector_index.embedding_model != current.vector_index.embedding_model:
+        return None
+    if set(current.sources) - set(previous.sources):
+        return None
+    return {
+        source for source, sha256 in current.sources.items()
+        if previous.sources.get(source) == sha256
+    }
@@ -0,0 +1,168 @@
+"""
+Lexical Index - Busca por palavras exatas (BM25)
+
+Embeddings são ótimos para "significado", mas ruins para tokens muito
+específicos: códigos de disciplina (MAT101), números de edital (12/2026),
+datas (15/03). Para isso, nada bate um índice invertido clássico:
+para cada termo, a lista dos trechos onde ele aparece.
+
+O ranking usa BM25, a fórmula padrão de busca textual:
+- Termos raros (idf alto) valem mais que termos comuns
+- Repetir um termo ajuda, mas com retorno decrescente (k1)
+- Trechos longos são penalizados de leve (b)
+
+Arquivos (gerados pela ingestão, mapeados em memória):
+
+    lexical_vocab.json     # termo -> [início, df] + estatísticas
+    lexical_postings.npy   # linhas dos trechos, agrupadas por termo
+    lexical_tfs.npy        # frequência do termo em cada trecho
+    lexical_doclen.npy     # tamanho (em termos) de cada trecho
+
+Conceitos que você vai aprender aqui:
+- Índice invertido (inverted index)
+- BM25 e IDF
+- Tokenização com normalização de acentos
+"""
+
+import json
+import math
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.core.quantization import top_n
+
+VOCAB_FILENAME = "lexical_vocab.json"
+POSTINGS_FILENAME = "lexical_postings.npy"
+TFS_FILENAME = "lexical_tfs.npy"
+DOCLEN_FILENAME = "lexical_doclen.npy"
+
+# Palavras, códigos (mat101) e números com separadores (15/03, 2026.2, 12/2026)
+_TOKEN = re.compile(r"[a-z0-9]+(?:[./-][0-9]+)*")
+
+# Palavras muito comuns que não ajudam a distinguir trechos
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de do dos e ela ele em entre era essa esse esta
+este eu foi for ha isso ja la mais mas me meu minha na nas nao no nos o os ou
+para pela pelas pelo pelos por qual quais quando que quem se sem ser seu sua
+so sao tem ter um uma umas uns voce vai vou
+""".split())
+
+
+def fold_accents(text: str) -> str:
+    """Remove acentos e deixa minúsculo: 'Matrícula' -> 'matricula'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _light_stem(token: str) -> str:
+    """Stemming mínimo: plural simples ('matriculas' -> 'matricula')."""
+    if len(token) > 4 and token.endswith("s") and token.isalpha():
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Quebra um texto em termos normalizados.
+
+    Exemplo:
+        "Rematrícula 2026.2 até 15/03 (MAT101)" ->
+        ["rematricula", "2026.2", "15/03", "mat101"]
+    """
+    return [
+        _light_stem(token)
+        for token in _TOKEN.findall(fold_accents(text))
+        if token not in STOPWORDS
+    ]
+
+
+def is_exact_token(token: str) -> bool:
+    """Termos com dígitos (datas, códigos, números) pedem correspondência exata."""
+    return any(ch.isdigit() for ch in token)
+
+
+def lexical_index_exists(index_dir: Path) -> bool:
+    return (Path(index_dir) / VOCAB_FILENAME).exists()
+
+
+class LexicalIndex:
+    """Índice invertido BM25 somente-leitura, mapeado em memória."""
+
+    def __init__(self, vocab: Dict, postings, tfs, doclen):
+        self.terms: Dict[str, List[int]] = vocab["terms"]
+        self.k1 = vocab.get("k1", 1.2)
+        self.b = vocab.get("b", 0.75)
+        self.avgdl = vocab["avgdl"] or 1.0
+        self.count = vocab["count"]
+        self.postings = postings
+        self.tfs = tfs
+        self.doclen = doclen
+
+    @classmethod
+    def open(cls, index_dir: Path) -> "LexicalIndex":
+        index_dir = Path(index_dir)
+        vocab = json.loads((index_dir / VOCAB_FILENAME).read_text(encoding="utf-8"))
+        return cls(
+            vocab,
+            np.load(index_dir / POSTINGS_FILENAME, mmap_mode="r"),
+            np.load(index_dir / TFS_FILENAME, mmap_mode="r"),
+            np.load(index_dir / DOCLEN_FILENAME, mmap_mode="r"),
+        )
+
+    def close(self):
+        """Desfaz os mapeamentos (chamado quando a geração do índice é aposentada)."""
+        self.postings = None
+        self.tfs = None
+        self.doclen = None
+
+    def idf(self, df: int) -> float:
+        return math.log(1 + (self.count - df + 0.5) / (df + 0.5))
+
+    def term_idf(self, term: str) -> float:
+        """IDF de um termo (termo desconhecido = o mais raro possível)."""
+        entry = self.terms.get(term)
+        return self.idf(entry[1] if entry is not None else 0)
+
+    def rows_with(self, term: str) -> np.ndarray:
+        """Linhas dos trechos que contêm o termo."""
+        entry = self.terms.get(term)
+        if entry is None:
+            return np.empty(0, dtype=np.int32)
+        start, df = entry
+        return self.postings[start:start + df]
+
+    def search(self, query_terms: List[str], k: int = 8) -> List[Tuple[int, float]]:
+        """
+        Ranqueia os trechos por BM25.
+
+        Args:
+            query_terms: Termos já tokenizados (ver `tokenize`)
+
+        Returns:
+            Lista de (linha, score) em ordem decrescente
+        """
+        # Só os trechos que têm algum termo recebem score: custo proporcional
+        # às postings da pergunta, não ao tamanho do corpus
+        all_rows, contributions = [], []
+        for term in set(query_terms):
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            start, df = entry
+            rows = self.postings[start:start + df]
+            tf = self.tfs[start:start + df].astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self.doclen[rows] / self.avgdl)
+            all_rows.append(rows)
+            contributions.append(self.idf(df) * tf * (self.k1 + 1) / (tf + norm))
+
+        if not all_rows:
+            return []
+        candidates, position = np.unique(np.concatenate(all_rows), return_inverse=True)
+        scores = np.bincount(position, weights=np.concatenate(contributions)).astype(np.float32)
+        top, values = top_n(scores, k)
+        rows = candidates[top]
+        return [(int(row), float(value)) for row, value in zip(rows, values) if value > 0]
@@ -0,0 +1,397 @@
+"""
+LLM Client - Chamadas ao Gemini que aguentam instabilidade
+
+Uma chamada só, sem prazo, transforma qualquer soluço da API em
+"Desculpe, tive um problema técnico" - e o estudante reenvia a pergunta,
+multiplicando a carga justamente quando a API está sofrendo.
+
+Este módulo embrulha o modelo com quatro proteções:
+1. Timeout: nenhuma tentativa espera para sempre
+2. Retries com backoff exponencial + jitter: erros transitórios (503,
+   429, timeout) tentam de novo, sem sincronizar todo mundo
+3. Hedging: se uma tentativa passar do p95 de latência e houver vaga
+   livre, uma segunda é disparada; vale a que responder primeiro
+4. Circuit breaker: depois de várias falhas seguidas, paramos de chamar
+   a API por um tempo e o engine responde com o que já tem (cache,
+   trechos dos documentos) em vez de fazer o estudante esperar
+
+Conceitos que você vai aprender aqui:
+- Exponential backoff com "full jitter"
+- Hedged requests (cortar a cauda da latência)
+- Circuit breaker (fechado -> aberto -> meio-aberto)
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.core.log import fields, get_logger
+from src.core.metrics import percentile
+from src.core.scheduler import LLMScheduler
+
+logger = get_logger("llm")
+
+try:
+    from google.api_core import exceptions as _api_errors
+
+    _TRANSIENT_API_ERRORS = (
+        _api_errors.ServiceUnavailable,
+        _api_errors.InternalServerError,
+        _api_errors.TooManyRequests,
+        _api_errors.BadGateway,
+        _api_errors.GatewayTimeout,
+    )
+except ImportError:  # SDK ausente (ex: só o modelo falso dos benchmarks)
+    _TRANSIENT_API_ERRORS = ()
+
+# Códigos HTTP que valem nova tentativa (as exceções da API começam com eles)
+_TRANSIENT_STATUS = ("429", "500", "502", "503", "504")
+
+# Estados do circuit breaker
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """A API está falhando e o circuito está aberto: nem tentamos chamar."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuito do LLM aberto (nova tentativa em {retry_after:.0f} s)")
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Erro que pode sumir numa nova tentativa (timeout, sobrecarga, 5xx)?"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if _TRANSIENT_API_ERRORS and isinstance(error, _TRANSIENT_API_ERRORS):
+        return True
+    return str(error).startswith(_TRANSIENT_STATUS)
+
+
+class CircuitBreaker:
+    """
+    Corta as chamadas depois de `failure_threshold` falhas seguidas.
+
+    - Fechado: tudo passa
+    - Aberto: nada passa durante `reset_timeout` segundos
+    - Meio-aberto: uma chamada de teste passa; sucesso fecha, falha reabre
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Esta chamada pode ir para a API?"""
+        if self.state == BREAKER_CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == BREAKER_OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = BREAKER_HALF_OPEN
+            self._probe_started = None
+        # Meio-aberto: só uma chamada de teste por vez (se ela sumir sem
+        # resultado, ex: cancelada, outra pode testar depois de reset_timeout)
+        if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+            return False
+        self._probe_started = now
+        return True
+
+    def retry_after(self) -> float:
+        """Segundos até o circuito deixar uma chamada de teste passar."""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_inconclusive(self):
+        """Chamada terminou sem dizer nada sobre a saúde da API: libera o teste, mantém o estado."""
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_started = None
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+                logger.warning("🔌 Circuito do LLM aberto", extra=fields(
+                    failures=self.failures, reset_s=self.reset_timeout
+                ))
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "retry_after_s": round(self.retry_after(), 1),
+        }
+
+
+class _Attempt:
+    """Uma tentativa em andamento (a original ou o hedge)."""
+
+    __slots__ = ("started", "stop", "task")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Avisa a thread do streaming para parar de ler pedaços
+        self.stop = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class LLMClient:
+    """
+    Camada entre o engine e o modelo: timeout, retries, hedging e breaker.
+
+    Uso:
+        texto = await client.generate(prompt, user_id="123")
+        texto = await client.generate(prompt, on_delta=mostrar_pedaco)  # streaming
+    """
+
+    def __init__(self, model, scheduler: LLMScheduler, timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 hedge: bool = True, hedge_min_samples: int = 20, hedge_min_delay: float = 0.5,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            model: Modelo com `generate_content()` (Gemini ou o falso dos benchmarks)
+            scheduler: Fila das chamadas bloqueantes
+            timeout: Prazo de cada tentativa, em segundos
+            max_retries: Novas tentativas depois da primeira falha transitória
+            backoff_base: Espera máxima antes da primeira nova tentativa
+            backoff_max: Teto da espera entre tentativas
+            hedge: Dispara uma segunda tentativa quando a primeira passa do p95
+            hedge_min_samples: Latências observadas antes de confiar no p95
+            hedge_min_delay: Espera mínima antes de um hedge
+            breaker: Circuit breaker (padrão: 5 falhas seguidas, 30 s aberto)
+        """
+        self.model = model
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker()
+
+        # Latências de sucesso por modo: resposta inteira / primeiro pedaço
+        self._latencies: Dict[bool, Deque[float]] = {False: deque(maxlen=256), True: deque(maxlen=256)}
+        self._stats = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "short_circuited": 0,
+        }
+
+    async def generate(self, prompt: str, user_id: Optional[str] = None,
+                       on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Gera a resposta, tentando de novo em erros transitórios.
+
+        Com `on_delta`, a resposta vem em streaming. Depois que algum
+        texto já foi mostrado ao estudante, uma falha não é repetida
+        (o texto sairia duplicado).
+
+        Raises:
+            CircuitOpenError: a API está falhando e o circuito está aberto
+            Exception: o último erro, se todas as tentativas falharem
+        """
+        self._stats["calls"] += 1
+        emitted = [False]
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow():
+                self._stats["short_circuited"] += 1
+                raise CircuitOpenError(self.breaker.retry_after())
+
+            try:
+                text = await self._hedged(prompt, user_id, on_delta, emitted)
+            except Exception as e:
+                self._stats["failures"] += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    self._stats["timeouts"] += 1
+                if not is_transient(e):
+                    # Prompt bloqueado, requisição inválida: não é falta de saúde
+                    # da API, mas também não prova que ela voltou
+                    self.breaker.record_inconclusive()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or emitted[0]:
+                    raise
+
+                # Full jitter: espera aleatória entre 0 e o teto exponencial
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                attempt += 1
+                self._stats["retries"] += 1
+                logger.warning("🔁 Falha transitória no LLM, tentando de novo", extra=fields(
+                    user_id=user_id, attempt=attempt, delay_ms=round(delay * 1000), error=str(e)[:120]
+                ))
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return text
+
+    async def _hedged(self, prompt: str, user_id: Optional[str],
+                      on_delta: Optional[Callable[[str], None]], emitted: List[bool]) -> str:
+        """
+        Uma tentativa com prazo; se passar do p95, dispara um hedge.
+
+        No streaming, a tentativa que mandar o primeiro pedaço vira a
+        "dona" da resposta: os pedaços da outra são descartados e a
+        thread dela para de ler.
+        """
+        streaming = on_delta is not None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        attempts: List[_Attempt] = []
+        owner: List[Optional[_Attempt]] = [None]
+
+        def start() -> _Attempt:
+            attempt = _Attempt()
+            gate = None
+            if streaming:
+                def gate(text: str, attempt=attempt):
+                    if owner[0] is None:
+                        owner[0] = attempt
+                        emitted[0] = True
+                        self._latencies[True].append(time.perf_counter() - attempt.started)
+                        for other in attempts:
+                            if other is not attempt:
+                                other.stop.set()
+                    if owner[0] is attempt:
+                        on_delta(text)
+            attempt.task = asyncio.ensure_future(self._run(prompt, user_id, gate, attempt.stop, loop))
+            attempts.append(attempt)
+            self._stats["attempts"] += 1
+            return attempt
+
+        first = start()
+        try:
+            hedge_delay = self._hedge_delay(streaming)
+            if hedge_delay is not None and hedge_delay < self.timeout:
+                done, _ = await asyncio.wait({first.task}, timeout=hedge_delay)
+                # Só vale a pena se ainda não chegou nada e há vaga livre no scheduler
+                if not done and owner[0] is None and self._has_spare_capacity():
+                    start()
+                    self._stats["hedged"] += 1
+
+            winner, text = await self._first_success(attempts, owner, deadline)
+            if winner is not first:
+                self._stats["hedge_wins"] += 1
+            if not streaming:
+                self._latencies[False].append(time.perf_counter() - winner.started)
+            return text
+        finally:
+            for attempt in attempts:
+                attempt.stop.set()
+                if not attempt.task.done():
+                    attempt.task.cancel()
+
+    async def _first_success(self, attempts: List[_Attempt], owner: List[Optional[_Attempt]],
+                             deadline: float):
+        """Espera a primeira tentativa bem-sucedida (no streaming, a dona dos pedaços)."""
+        loop = asyncio.get_running_loop()
+        pending = {attempt.task for attempt in attempts}
+        error: Optional[BaseException] = None
+
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                attempt = next(attempt for attempt in attempts if attempt.task is task)
+                if task.exception() is not None:
+                    error = task.exception()
+                    if owner[0] is attempt:
+                        raise error  # a dona falhou no meio da resposta
+                    continue
+                if owner[0] is None or owner[0] is attempt:
+                    return attempt, task.result()
+
+        if error is not None and not pending:
+            raise error
+        raise asyncio.TimeoutError(f"LLM não respondeu em {self.timeout:.0f} s")
+
+    def _hedge_delay(self, streaming: bool) -> Optional[float]:
+        """p95 das latências recentes (None = hedge desligado ou poucos dados)."""
+        if not self.hedge:
+            return None
+        recent = self._latencies[streaming]
+        if len(recent) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, percentile(recent, 0.95))
+
+    def _has_spare_capacity(self) -> bool:
+        """Um hedge só entra se não for tirar a vaga de outra pergunta."""
+        return self.scheduler.in_flight < self.scheduler.max_in_flight and not self.scheduler.queue_depth
+
+    async def _run(self, prompt: str, user_id: Optional[str], on_delta: Optional[Callable[[str], None]],
+                   stop: threading.Event, loop: asyncio.AbstractEventLoop) -> str:
+        if on_delta is not None:
+            return await self.scheduler.run(
+                self._generate_streaming, prompt, loop, on_delta, stop, user_id=user_id
+            )
+        return await self.scheduler.run(self._generate, prompt, user_id=user_id)
+
+    def _generate(self, prompt: str) -> str:
+        """Resposta inteira (roda numa thread do scheduler)."""
+        return self.model.generate_content(prompt).text
+
+    def _generate_streaming(self, prompt: str, loop: asyncio.AbstractEventLoop,
+                            on_delta: Callable[[str], None], stop: threading.Event) -> str:
+        """
+        Gera a resposta em streaming (roda numa thread do scheduler).
+
+        Cada pedaço é entregue ao event loop com call_soon_threadsafe;
+        a vaga no scheduler fica ocupada até o último pedaço chegar
+        (ou até `stop` ser sinalizado: timeout ou hedge perdedor).
+        """
+        parts = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            if stop.is_set():
+                break
+            # O último pedaço pode vir sem texto (só o motivo de parada)
+            text = chunk.text if chunk.parts else ""
+            if not text:
+                continue
+            parts.append(text)
+            try:
+                loop.call_soon_threadsafe(on_delta, text)
+            except RuntimeError:
+                pass  # event loop já encerrado
+        return "".join(parts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tentativas, retries, hedges e estado do breaker para o get_status()."""
+        p95 = percentile(self._latencies[False], 0.95)
+        return {
+            **self._stats,
+            "p95_latency_ms": round(p95 * 1000, 1),
+            "hedge_delay_ms": round((self._hedge_delay(False) or 0.0) * 1000, 1),
+            "breaker": self.breaker.get_stats(),
+        }
@@ -0,0 +1,160 @@
+"""
+Logging - Logs estruturados sem travar o event loop
+
+Um print() é uma escrita síncrona no stdout. No caminho de cada mensagem
+do Discord, dezenas deles por segundo competem com o event loop (e se o
+terminal ou o pipe estiver lento, o bot inteiro espera).
+
+Este módulo troca os prints por `logging` com três ideias:
+1. Níveis: em produção (INFO) os logs de debug custam só uma comparação
+2. Fila: o código só enfileira o registro; uma thread separada formata
+   e escreve (QueueHandler + QueueListener)
+3. Amostragem: eventos de debug muito frequentes podem ser registrados
+   só em uma fração das vezes
+
+Campos estruturados (user_id, guild, latência...) vão no `extra`:
+
+    logger.info("💬 Pergunta respondida", extra=fields(user_id="42", latency_ms=830))
+    logger.debug("Mensagem ignorada", extra=sampled(channel="geral"))
+
+Conceitos que você vai aprender aqui:
+- logging com níveis e hierarquia de loggers
+- QueueHandler/QueueListener (I/O fora da thread principal)
+- Logs estruturados (texto key=value ou JSON)
+- Amostragem (sampling) de eventos de alto volume
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Logger "pai" de todo o bot: tessera.engine, tessera.discord, ...
+LOGGER_NAME = "tessera"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger filho do logger do bot (ex: get_logger("engine") -> tessera.engine)."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def fields(**values: Any) -> Dict[str, Any]:
+    """Campos estruturados para o `extra` de uma chamada de log."""
+    return {"fields": values}
+
+
+def sampled(**values: Any) -> Dict[str, Any]:
+    """Como `fields`, mas o registro está sujeito à amostragem de debug."""
+    return {"fields": values, "sampled": True}
+
+
+class DebugSampler(logging.Filter):
+    """
+    Deixa passar só uma fração dos registros marcados com `sampled`.
+
+    Registros normais (e qualquer coisa acima de DEBUG) sempre passam.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = min(1.0, max(0.0, rate))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not getattr(record, "sampled", False):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formata registros como texto legível ou JSON (uma linha por evento).
+
+    Texto: 2026-03-01 10:00:00 INFO tessera.engine: mensagem user_id=42 cached=True
+    JSON:  {"ts": "...", "level": "INFO", "logger": "...", "msg": "...", "user_id": "42"}
+    """
+
+    def __init__(self, json_output: bool = False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        extra = getattr(record, "fields", None) or {}
+        timestamp = datetime.fromtimestamp(record.created)
+
+        if self.json_output:
+            event = {
+                "ts": timestamp.isoformat(timespec="milliseconds"),
+                "level": record.levelname,
+                "logger": record.name,
+                "msg": message,
+                **extra,
+            }
+            return json.dumps(event, ensure_ascii=False, default=str)
+
+        line = f"{timestamp:%Y-%m-%d %H:%M:%S} {record.levelname} {record.name}: {message}"
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+def setup_logging(level: Optional[str] = None, json_output: Optional[bool] = None,
+                  debug_sample_rate: Optional[float] = None) -> logging.Logger:
+    """
+    Configura os logs do bot (pode ser chamada mais de uma vez).
+
+    Args:
+        level: Nível mínimo (padrão: LOG_LEVEL ou INFO)
+        json_output: Uma linha JSON por evento (padrão: LOG_FORMAT=json)
+        debug_sample_rate: Fração dos eventos de debug amostrados que é
+            registrada (padrão: LOG_DEBUG_SAMPLE_RATE ou 1.0)
+
+    Returns:
+        O logger raiz do bot
+    """
+    global _listener
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    if json_output is None:
+        json_output = os.getenv("LOG_FORMAT", "text").lower() == "json"
+    if debug_sample_rate is None:
+        debug_sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+    shutdown_logging()
+
+    # Quem chama o log só enfileira; a formatação e o I/O ficam na thread do listener
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(DebugSampler(debug_sample_rate))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(StructuredFormatter(json_output))
+
+    root = logging.getLogger(LOGGER_NAME)
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+def shutdown_logging():
+    """Escreve o que ainda está na fila e para a thread de logs."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,267 @@
+"""
+Metrics - Para onde vai o tempo de cada resposta?
+
+Quando uma resposta demora, a pergunta é sempre a mesma: foi a fila do
+Gemini? A busca nos documentos? O próprio LLM? O envio ao Discord?
+Este módulo mede cada etapa ("span") e guarda as durações em
+histogramas, que podem ser:
+
+- Resumidos no !status (p50/p95/p99 por etapa)
+- Exportados no formato texto do Prometheus por um endpoint HTTP local
+  (METRICS_PORT), para gráficos e alertas
+
+Uso:
+    with metrics.span("retrieval"):
+        documentos = await buscar(pergunta)
+
+    with metrics.trace() as etapas:      # agrupa os spans de uma pergunta
+        ...
+    # etapas == {"cache_lookup": 0.0002, "retrieval": 0.031, ...}
+
+Custo por span: dois perf_counter() e uma busca binária - dá para deixar
+ligado em produção. Tudo roda no event loop (uma thread só), então não
+há locks.
+
+Conceitos que você vai aprender aqui:
+- Histogramas com buckets fixos (memória constante, percentis aproximados)
+- contextvars (o "trace" da pergunta atual atravessa os awaits)
+- Formato de exposição do Prometheus
+"""
+
+import asyncio
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Limites dos buckets em segundos: de 1 ms até 1 min
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+STAGE_METRIC = "tessera_stage_seconds"
+
+# Etapas da pergunta atual (None = fora de um trace)
+_current_trace: ContextVar[Optional[Dict[str, float]]] = ContextVar("tessera_trace", default=None)
+
+
+def percentile(values, fraction: float) -> float:
+    """Percentil simples (valores em qualquer ordem; 0.0 se não houver nenhum)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Histogram:
+    """Contagem de observações por faixa de valor (buckets)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # último = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Percentil aproximado (interpolação linear dentro do bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= target:
+                if index == len(self.bounds):
+                    return self.max
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = min(self.bounds[index], self.max)
+                return lower + max(0.0, upper - lower) * (target - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class Counter:
+    """Contador monotônico com labels (ex: outcome="cached")."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class _Span:
+    """Cronômetro de uma etapa (context manager leve, sem gerador)."""
+
+    __slots__ = ("registry", "stage", "started")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class _Trace:
+    """Coleta as etapas de uma pergunta (ver MetricsRegistry.trace)."""
+
+    __slots__ = ("stages", "token")
+
+    def __enter__(self) -> Dict[str, float]:
+        self.stages: Dict[str, float] = {}
+        self.token = _current_trace.set(self.stages)
+        return self.stages
+
+    def __exit__(self, *exc_info):
+        _current_trace.reset(self.token)
+        return False
+
+
+class MetricsRegistry:
+    """Histogramas por etapa, contadores e gauges do bot."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def span(self, stage: str) -> _Span:
+        """Mede a duração do bloco `with` como uma etapa."""
+        return _Span(self, stage)
+
+    def trace(self) -> _Trace:
+        """Agrupa os spans de uma pergunta (o dict fica com a soma por etapa)."""
+        return _Trace()
+
+    def observe(self, stage: str, seconds: float):
+        """Registra a duração de uma etapa (também no trace atual, se houver)."""
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+        stages = _current_trace.get()
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Cria (ou devolve) um contador."""
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help_text)
+        return self.counters[name]
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        """Registra um valor lido na hora da exportação (ex: tamanho da fila)."""
+        self.gauges[name] = (help_text, read)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Resumo por etapa para o get_status()."""
+        return {
+            stage: {
+                "count": histogram.count,
+                "avg_ms": round(histogram.sum / histogram.count * 1000, 1) if histogram.count else 0.0,
+                "p50_ms": round(histogram.quantile(0.50) * 1000, 1),
+                "p95_ms": round(histogram.quantile(0.95) * 1000, 1),
+                "p99_ms": round(histogram.quantile(0.99) * 1000, 1),
+            }
+            for stage, histogram in sorted(self.stages.items())
+        }
+
+    def render_prometheus(self) -> str:
+        """Exporta tudo no formato texto do Prometheus (versão 0.0.4)."""
+        lines: List[str] = []
+
+        if self.stages:
+            lines.append(f"# HELP {STAGE_METRIC} Duração de cada etapa do atendimento")
+            lines.append(f"# TYPE {STAGE_METRIC} histogram")
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{STAGE_METRIC}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{STAGE_METRIC}_count{{stage="{stage}"}} {histogram.count}')
+
+        for counter in self.counters.values():
+            lines.append(f"# HELP {counter.name} {counter.help}")
+            lines.append(f"# TYPE {counter.name} counter")
+            for labels, value in sorted(counter.values.items()):
+                lines.append(f"{counter.name}{_format_labels(labels)} {value:g}")
+
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Iterator[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+async def start_metrics_server(registry: "MetricsRegistry", host: str = "127.0.0.1",
+                               port: int = 9108) -> asyncio.AbstractServer:
+    """
+    Sobe um endpoint HTTP mínimo: GET /metrics -> texto do Prometheus.
+
+    Escuta só em localhost por padrão (as métricas não são públicas).
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Descarta os cabeçalhos da requisição
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", registry.render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# Registro global (mesmo padrão do bot_engine): engine e adapters
+# gravam no mesmo lugar
+metrics = MetricsRegistry()
@@ -0,0 +1,270 @@
+"""
+Persistent Cache - Respostas que sobrevivem a um restart
+
+O ResponseCache vive na memória do processo: cada deploy (ou crash)
+recomeça do zero, e os primeiros minutos viram uma onda de chamadas ao
+Gemini para perguntas que já tinham resposta. Com vários processos
+(shards, adapters), cada um ainda aquece o próprio cache sozinho.
+
+Este módulo guarda respostas e resultados de busca num arquivo SQLite:
+- WAL: vários processos do mesmo host leem e escrevem o mesmo arquivo
+- TTL por tipo de entrada e teto de entradas/bytes
+- Compactação em segundo plano (expiradas + menos usadas + checkpoint)
+- Warm-load: no startup, as entradas mais acessadas voltam para a memória
+
+Ele é a segunda camada (L2): a memória (L1) é consultada primeiro, e o
+disco só quando ela não tem a resposta.
+
+Todas as chamadas ao SQLite rodam numa única thread dedicada: o event
+loop nunca espera disco, e a conexão nunca é usada por duas threads.
+
+Conceitos que você vai aprender aqui:
+- SQLite em modo WAL (leitores não bloqueiam o escritor)
+- Cache em camadas (L1 memória, L2 disco)
+- Escrita "fire-and-forget" numa thread dedicada
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.log import fields, get_logger
+
+logger = get_logger("cache")
+
+# Tipos de entrada
+ANSWERS = "answer"
+RETRIEVALS = "retrieval"
+
+# Entradas removidas por comando na compactação (não segura o arquivo por muito tempo)
+_COMPACT_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    corpus_version TEXT,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_hit REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_last_hit ON entries (last_hit);
+"""
+
+
+class PersistentCache:
+    """
+    Cache em disco (SQLite/WAL) compartilhado entre processos.
+
+    Uso:
+        found = await cache.get(ANSWERS, chave, versao_do_corpus)
+        if found is None:
+            ...
+            cache.put(ANSWERS, chave, versao_do_corpus, {"content": ...})
+    """
+
+    def __init__(self, path: Path, answer_ttl_seconds: float = 6 * 3600,
+                 retrieval_ttl_seconds: float = 24 * 3600, max_entries: int = 50000,
+                 max_bytes: int = 64 * 1024 * 1024, compact_interval: float = 300):
+        """
+        Args:
+            path: Arquivo do banco (criado se não existir)
+            answer_ttl_seconds: Validade de uma resposta
+            retrieval_ttl_seconds: Validade de um resultado de busca
+            max_entries: Máximo de entradas no arquivo
+            max_bytes: Tamanho máximo aproximado dos dados guardados
+            compact_interval: Segundos entre compactações
+        """
+        self.path = Path(path)
+        self.ttl = {ANSWERS: answer_ttl_seconds, RETRIEVALS: retrieval_ttl_seconds}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compact_interval = compact_interval
+
+        # Uma thread só: as operações ficam em ordem e a conexão é dela
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tessera-cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._compactor: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "errors": 0,
+            "warm_loaded": 0,
+            "compactions": 0,
+            "removed": 0,
+        }
+
+    async def get(self, kind: str, key: str, corpus_version: Optional[str]) -> Optional[Tuple[Any, float]]:
+        """
+        Procura uma entrada válida (mesma versão dos documentos, dentro do TTL).
+
+        Returns:
+            (payload, idade em segundos) ou None
+        """
+        found = await self._run(self._get_sync, kind, key, corpus_version)
+        self._stats["hits" if found is not None else "misses"] += 1
+        return found
+
+    def put(self, kind: str, key: str, corpus_version: Optional[str], payload: Any):
+        """Guarda uma entrada sem esperar o disco (a escrita vai para a fila da thread)."""
+        if self._closed:
+            return
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        self._executor.submit(self._guarded, self._put_sync, kind, key, corpus_version, data)
+
+    async def warm(self, kind: str, corpus_version: Optional[str], limit: int) -> List[Tuple[str, Any, float]]:
+        """
+        Entradas mais acessadas (e ainda válidas) para recarregar na memória.
+
+        Returns:
+            Lista de (chave, payload, idade em segundos), das mais usadas para as menos
+        """
+        rows = await self._run(self._warm_sync, kind, corpus_version, limit) or []
+        self._stats["warm_loaded"] += len(rows)
+        return rows
+
+    def start_compaction(self):
+        """Inicia a compactação periódica (precisa de um event loop rodando)."""
+        if self._compactor is None and not self._closed:
+            self._compactor = asyncio.ensure_future(self._compact_forever())
+
+    async def compact(self):
+        """Remove expiradas e, se passar dos tetos, as menos acessadas."""
+        removed = await self._run(self._compact_sync)
+        if removed is not None:
+            self._stats["compactions"] += 1
+            self._stats["removed"] += removed
+
+    def close(self):
+        """Para a compactação, espera as escritas pendentes e fecha o arquivo."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._compactor is not None:
+            self._compactor.cancel()
+        self._executor.submit(self._close_sync)
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores do cache em disco para o get_status()."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "path": str(self.path),
+        }
+
+    async def _compact_forever(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            await self.compact()
+
+    async def _run(self, func, *args):
+        """Executa `func` na thread do cache; erros viram None (cache nunca derruba o bot)."""
+        if self._closed:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._guarded, func, *args)
+
+    def _guarded(self, func, *args):
+        try:
+            return func(*args)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self._stats["errors"] += 1
+            logger.warning("⚠️ Falha no cache em disco: %s", e)
+            return None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Abre o arquivo na primeira operação (já dentro da thread do cache)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None, check_same_thread=False)
+            # auto_vacuum só vale se for definido antes de criar as tabelas
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL + WAL: perder as últimas escritas num crash do SO é aceitável para um cache
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info("💾 Cache em disco aberto: %s", self.path)
+        return self._conn
+
+    def _get_sync(self, kind: str, key: str, corpus_version: Optional[str]) -> Optional[Tuple[Any, float]]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT payload, created_at FROM entries "
+            "WHERE kind = ? AND key = ? AND corpus_version IS ? AND created_at >= ?",
+            (kind, key, corpus_version, now - self.ttl[kind])
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE entries SET hits = hits + 1, last_hit = ? WHERE kind = ? AND key = ?",
+            (now, kind, key)
+        )
+        return json.loads(row[0]), now - row[1]
+
+    def _put_sync(self, kind: str, key: str, corpus_version: Optional[str], data: str):
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO entries (kind, key, corpus_version, payload, size, created_at, last_hit) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (kind, key) DO UPDATE SET corpus_version = excluded.corpus_version, "
+            "payload = excluded.payload, size = excluded.size, created_at = excluded.created_at, "
+            "last_hit = excluded.last_hit",
+            (kind, key, corpus_version, data, len(key) + len(data), now, now)
+        )
+        self._stats["writes"] += 1
+
+    def _warm_sync(self, kind: str, corpus_version: Optional[str], limit: int) -> List[Tuple[str, Any, float]]:
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT key, payload, created_at FROM entries "
+            "WHERE kind = ? AND corpus_version IS ? AND created_at >= ? "
+            "ORDER BY hits DESC, last_hit DESC LIMIT ?",
+            (kind, corpus_version, now - self.ttl[kind], limit)
+        ).fetchall()
+        return [(key, json.loads(payload), now - created_at) for key, payload, created_at in rows]
+
+    def _compact_sync(self) -> int:
+        conn = self._connection()
+        now = time.time()
+        removed = 0
+
+        for kind, ttl in self.ttl.items():
+            removed += conn.execute(
+                "DELETE FROM entries WHERE kind = ? AND created_at < ?", (kind, now - ttl)
+            ).rowcount
+
+        # Acima dos tetos: remove as menos acessadas, em lotes pequenos
+        while True:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            batch = min(_COMPACT_BATCH, count - self.max_entries) if count > self.max_entries else _COMPACT_BATCH
+            removed += conn.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY last_hit LIMIT ?)", (batch,)
+            ).rowcount
+
+        # Devolve páginas livres ao disco e esvazia o WAL sem bloquear leitores
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        if removed:
+            logger.info("🧹 Cache em disco compactado", extra=fields(removed=removed))
+        return removed
+
+    def _close_sync(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,222 @@
+"""
+Prompt Assembler - Histórico + documentos dentro de um orçamento de tokens
+
+O prompt tem três partes que disputam espaço:
+1. Fixa: instruções do bot + pergunta do estudante
+2. Trechos dos documentos oficiais (a fonte principal da resposta)
+3. Histórico da conversa (para entender perguntas de seguimento)
+
+Sem limite, uma conversa longa com trechos grandes gera prompts enormes:
+mais caros, mais lentos e às vezes maiores que o modelo aceita. Aqui
+tudo é encaixado num orçamento fixo:
+- A pergunta tem uma fatia máxima (uma mensagem gigante é cortada)
+- O histórico tem uma fatia máxima; as trocas mais recentes entram na
+  íntegra e as mais antigas viram resumo de uma linha
+- Os documentos ficam com o resto, em ordem de relevância
+
+As instruções fixas são compiladas uma vez (PromptTemplate): texto e
+contagem de tokens ficam prontos. Se o modelo aceita system_instruction,
+elas vão na criação do modelo e cada chamada leva só a parte variável;
+senão, entram como prefixo (sempre o mesmo) do prompt.
+
+Cada prompt montado diz quantos tokens usa (Prompt.input_tokens) e o
+assembler soma tudo para o get_status: custo e latência ficam visíveis.
+
+Conceitos que você vai aprender aqui:
+- Orçamento de tokens (estimativa barata: ~4 caracteres por token)
+- Degradação graciosa: íntegra -> resumo -> nada
+- Pré-compilar a parte fixa, montar só a parte variável
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.conversation import ConversationHistory, clip, summarize_turn
+from src.core.vector_store import SearchHit
+
+# Estimativa de caracteres por token (português fica perto disso no Gemini)
+CHARS_PER_TOKEN = 4
+
+HISTORY_HEADER = "\nCONVERSA ANTERIOR COM O ESTUDANTE (use só para entender perguntas de seguimento):\n"
+DOCUMENTS_HEADER = "\nTRECHOS DE DOCUMENTOS OFICIAIS (use como fonte principal e cite o documento):\n"
+QUESTION_HEADER = "\nPERGUNTA DO ESTUDANTE:\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens sem chamar a API (arredonda para cima)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def format_excerpt(hit: SearchHit) -> str:
+    """Trecho de documento como aparece no prompt."""
+    return f"[{hit.citation}]\n{hit.chunk['text']}"
+
+
+class PromptTemplate:
+    """
+    Instruções fixas do bot, compiladas uma vez.
+
+    Uso:
+        template = PromptTemplate(UNIVERSITY_CONTEXT)
+        template.system_tokens        # custo fixo de toda chamada
+        template.render(pergunta, trechos, histórico, with_system=False)
+    """
+
+    def __init__(self, system: str):
+        self.system = system
+        self.system_tokens = estimate_tokens(system)
+        self.question_header_tokens = estimate_tokens(QUESTION_HEADER)
+
+    def render(self, question: str, excerpts: str = "", history_context: str = "",
+               with_system: bool = True) -> str:
+        """
+        Prompt final. `excerpts` já formatados (ver format_excerpt);
+        com with_system=False as instruções ficam de fora (o modelo já
+        as recebeu como system_instruction).
+        """
+        documents_context = f"{DOCUMENTS_HEADER}{excerpts}\n" if excerpts else ""
+        system = self.system if with_system else ""
+        return f"{system}{documents_context}{history_context}{QUESTION_HEADER}{question}"
+
+
+@dataclass
+class Prompt:
+    """Um prompt montado e o que ele custa."""
+    text: str
+    documents: List[SearchHit] = field(default_factory=list)
+    input_tokens: int = 0  # Instruções incluídas, mesmo se foram como system_instruction
+    question_clipped: bool = False
+    trimmed_documents: int = 0
+
+
+class PromptAssembler:
+    """
+    Decide o que do histórico e dos documentos cabe no prompt.
+
+    Uso:
+        prompt = assembler.build(pergunta, documents, history)
+        prompt.text, prompt.documents, prompt.input_tokens
+    """
+
+    def __init__(self, template: PromptTemplate, max_tokens: int = 3000, history_share: float = 0.3,
+                 question_share: float = 0.25, verbatim_turns: int = 2, verbatim_answer_chars: int = 400):
+        """
+        Args:
+            template: Instruções fixas já compiladas
+            max_tokens: Orçamento total do prompt (instruções incluídas)
+            history_share: Fração máxima do espaço livre para o histórico
+            question_share: Fração máxima do orçamento para a pergunta
+            verbatim_turns: Trocas mais recentes que entram na íntegra
+            verbatim_answer_chars: Corte das respostas que entram na íntegra
+        """
+        self.template = template
+        self.max_tokens = max_tokens
+        self.history_share = history_share
+        self.question_share = question_share
+        self.verbatim_turns = verbatim_turns
+        self.verbatim_answer_chars = verbatim_answer_chars
+        self._stats = {"prompts": 0, "input_tokens": 0, "clipped_questions": 0, "trimmed_documents": 0}
+
+    def build(self, question: str, documents: List[SearchHit],
+              history: Optional[ConversationHistory] = None, with_system: bool = True) -> Prompt:
+        """
+        Monta o prompt dentro do orçamento.
+
+        Args:
+            question: Pergunta do estudante (cortada se passar da fatia dela)
+            documents: Trechos encontrados, do mais para o menos relevante
+            history: Histórico do estudante (None = conversa nova)
+            with_system: False quando as instruções vão como system_instruction
+        """
+        clipped = False
+        max_question_tokens = int(self.max_tokens * self.question_share)
+        if estimate_tokens(question) > max_question_tokens:
+            question = clip(question, max_question_tokens * CHARS_PER_TOKEN)
+            clipped = True
+
+        fixed_tokens = self.template.system_tokens + self.template.question_header_tokens + estimate_tokens(question)
+        kept, history_context = self._fit(fixed_tokens, documents, history)
+        excerpts = "\n\n".join(format_excerpt(hit) for hit in kept)
+        text = self.template.render(question, excerpts, history_context, with_system=with_system)
+
+        input_tokens = estimate_tokens(text) + (0 if with_system else self.template.system_tokens)
+        trimmed = len(documents or []) - len(kept)
+        self._stats["prompts"] += 1
+        self._stats["input_tokens"] += input_tokens
+        self._stats["clipped_questions"] += clipped
+        self._stats["trimmed_documents"] += trimmed
+        return Prompt(text, kept, input_tokens, question_clipped=clipped, trimmed_documents=trimmed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        prompts = self._stats["prompts"]
+        return {
+            **self._stats,
+            "max_tokens": self.max_tokens,
+            "system_tokens": self.template.system_tokens,
+            "avg_input_tokens": round(self._stats["input_tokens"] / prompts, 1) if prompts else 0.0,
+        }
+
+    def _fit(self, fixed_tokens: int, documents: List[SearchHit],
+             history: Optional[ConversationHistory] = None) -> Tuple[List[SearchHit], str]:
+        """
+        Encaixa histórico e documentos no que sobra depois da parte fixa.
+
+        Returns:
+            (documentos que couberam, bloco de histórico pronto ou "")
+        """
+        available = max(0, self.max_tokens - fixed_tokens)
+
+        history_context = ""
+        if history is not None:
+            history_context = self._history_block(history, int(available * self.history_share))
+        available -= estimate_tokens(history_context)
+
+        # Documentos em ordem de relevância; um trecho grande que não cabe
+        # não impede que um menor (e ainda relevante) entre
+        kept: List[SearchHit] = []
+        if documents:
+            available -= estimate_tokens(DOCUMENTS_HEADER)
+            for hit in documents:
+                cost = estimate_tokens(format_excerpt(hit)) + 1
+                if cost <= available:
+                    kept.append(hit)
+                    available -= cost
+        return kept, history_context
+
+    def _history_block(self, history: ConversationHistory, budget: int) -> str:
+        """
+        Monta o bloco de histórico dentro de `budget` tokens.
+
+        Da troca mais recente para a mais antiga: as `verbatim_turns`
+        últimas na íntegra, as outras resumidas; o resumo das trocas que
+        já saíram do buffer entra por último, se ainda couber.
+        """
+        budget -= estimate_tokens(HISTORY_HEADER)
+        if budget <= 0:
+            return ""
+
+        lines: List[str] = []
+        turns = history.turns
+        for position, turn in enumerate(reversed(turns)):
+            if position < self.verbatim_turns:
+                line = (f"Estudante: {turn.question}\n"
+                        f"TesseraBot: {clip(turn.answer, self.verbatim_answer_chars)}")
+                if estimate_tokens(line) + 1 > budget:
+                    line = f"- {summarize_turn(turn)}"
+            else:
+                line = f"- {summarize_turn(turn)}"
+
+            cost = estimate_tokens(line) + 1
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        else:
+            if history.summary:
+                line = f"Resumo do início da conversa: {history.summary}"
+                if estimate_tokens(line) + 1 <= budget:
+                    lines.append(line)
+
+        if not lines:
+            return ""
+        return HISTORY_HEADER + "\n".join(reversed(lines)) + "\n"
@@ -0,0 +1,165 @@
+"""
+Quantization - Buscando em vetores comprimidos
+
+Um vetor float32 de 384 dimensões ocupa 1536 bytes. Com milhares de
+editais e regulamentos acumulando semestre após semestre, isso cresce
+rápido. Para economizar memória, a busca pode rodar sobre versões
+comprimidas dos vetores:
+
+- "none":  float32 original (exato, 4 bytes por dimensão)
+- "int8":  quantização escalar (1 byte por dimensão, ~4x menor)
+- "ivfpq": FAISS IVF-PQ (alguns bytes por vetor, ~30x menor)
+
+A busca comprimida é aproximada, então ela só escolhe CANDIDATOS.
+Depois, o `VectorIndex` recalcula a similaridade exata desses poucos
+candidatos usando os vetores float32 do disco (re-rank). Resultado:
+quase a mesma qualidade, com muito menos memória.
+
+Conceitos que você vai aprender aqui:
+- Scalar quantization e Product Quantization (PQ)
+- Índices invertidos (IVF) e nprobe
+- Busca em duas fases: candidatos aproximados + re-rank exato
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+INT8_CODES_FILENAME = "vectors.int8.npy"
+INT8_SCALES_FILENAME = "vectors.int8_scale.npy"
+IVFPQ_FILENAME = "vectors.ivfpq.faiss"
+
+QUANTIZATION_MODES = ("none", "int8", "ivfpq")
+
+# Linhas processadas por vez na busca int8 (limita a memória temporária)
+_SCAN_BLOCK_ROWS = 65536
+
+
+def top_n(scores, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Índices e valores dos n maiores scores, em ordem decrescente."""
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[np.argsort(-scores[top])]
+    return top, scores[top]
+
+
+class ExactSearcher:
+    """Busca exata sobre a matriz float32 (mapeada em memória)."""
+
+    mode = "none"
+    needs_rerank = False
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def candidates(self, query, n: int):
+        return top_n(self.vectors @ query, n)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+
+class Int8Searcher:
+    """
+    Quantização escalar: cada vetor vira int8 com uma escala própria.
+
+        vetor ≈ codes * scale    (scale = max|vetor| / 127)
+
+    O score aproximado é (codes @ query) * scale, calculado em blocos
+    para nunca converter a matriz inteira de volta para float32.
+    """
+
+    mode = "int8"
+    needs_rerank = True
+
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def open(cls, index_dir: Path) -> "Int8Searcher":
+        return cls(
+            np.load(index_dir / INT8_CODES_FILENAME, mmap_mode="r"),
+            np.load(index_dir / INT8_SCALES_FILENAME, mmap_mode="r"),
+        )
+
+    def candidates(self, query, n: int):
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+
+        for start in range(0, len(self.codes), _SCAN_BLOCK_ROWS):
+            block = self.codes[start:start + _SCAN_BLOCK_ROWS].astype(np.float32)
+            scores = (block @ query) * self.scales[start:start + _SCAN_BLOCK_ROWS]
+            rows, values = top_n(scores, n)
+
+            # Junta com os melhores dos blocos anteriores
+            merged_rows = np.concatenate([best_rows, rows + start])
+            merged_scores = np.concatenate([best_scores, values])
+            keep, best_scores = top_n(merged_scores, n)
+            best_rows = merged_rows[keep]
+
+        return best_rows, best_scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.scales.nbytes)
+
+
+class IVFPQSearcher:
+    """
+    FAISS IVF-PQ: vetores agrupados em listas (IVF) e comprimidos em
+    poucos bytes cada (PQ). Só `nprobe` listas são visitadas por busca.
+    """
+
+    mode = "ivfpq"
+    needs_rerank = True
+
+    def __init__(self, index, nprobe: int = 8):
+        import faiss
+
+        self.index = index
+        faiss.extract_index_ivf(index).nprobe = nprobe
+
+    @classmethod
+    def open(cls, index_dir: Path, nprobe: int = 8) -> "IVFPQSearcher":
+        import faiss
+
+        path = str(index_dir / IVFPQ_FILENAME)
+        try:
+            # Listas invertidas mapeadas em memória (compartilhadas entre processos)
+            index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            index = faiss.read_index(path)
+        return cls(index, nprobe)
+
+    def set_nprobe(self, nprobe: int):
+        import faiss
+
+        faiss.extract_index_ivf(self.index).nprobe = nprobe
+
+    def candidates(self, query, n: int):
+        scores, rows = self.index.search(np.asarray(query, dtype=np.float32).reshape(1, -1), n)
+        valid = rows[0] >= 0
+        return rows[0][valid].astype(np.int64), scores[0][valid]
+
+    @property
+    def nbytes(self) -> int:
+        import faiss
+
+        ivf = faiss.extract_index_ivf(self.index)
+        code_bytes = self.index.ntotal * (ivf.code_size + 8)  # código + id
+        return int(code_bytes + ivf.nlist * ivf.d * 4)
+
+
+def open_searcher(index_dir: Path, meta: Dict[str, Any], vectors, nprobe: int = 8):
+    """Abre o buscador de acordo com a quantização registrada no índice."""
+    mode = meta.get("quantization", {}).get("mode", "none")
+    if mode == "int8":
+        return Int8Searcher.open(index_dir)
+    if mode == "ivfpq":
+        return IVFPQSearcher.open(index_dir, nprobe)
+    return ExactSearcher(vectors)
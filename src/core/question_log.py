@@ -0,0 +1,114 @@
+"""
+Question Log - As perguntas de verdade, para aprender com elas
+
+Todo semestre chegam as mesmas dúvidas ("quando é a rematrícula?"),
+mas o bot não aprende nada com o tráfego. Este módulo anota cada
+pergunta respondida num arquivo JSONL por dia:
+
+    data/questions/questions-20260315.jsonl
+    {"ts": 1773580000.0, "question": "quando é a rematrícula?", "confidence": 0.8, "kind": "answer"}
+
+O job offline (src/build_faq.py) lê só as linhas novas desses arquivos,
+agrupa as perguntas parecidas e gera o índice de perguntas frequentes.
+
+Só o texto da pergunta é guardado (sem usuário nem servidor), e a
+escrita roda numa thread dedicada: o event loop nunca espera o disco.
+
+Conceitos que você vai aprender aqui:
+- Logs append-only (JSON Lines) como fonte para jobs offline
+- Rotação de arquivo por dia
+- Escrita "fire-and-forget" numa thread dedicada
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, TextIO
+
+from src.core.conversation import clip
+from src.core.log import get_logger
+
+logger = get_logger("questions")
+
+# Prefixo dos arquivos (um por dia: questions-AAAAMMDD.jsonl)
+LOG_PREFIX = "questions-"
+LOG_SUFFIX = ".jsonl"
+
+# Perguntas maiores que isso são cortadas (ninguém pergunta um edital inteiro)
+MAX_QUESTION_CHARS = 500
+
+
+def log_filename(timestamp: float) -> str:
+    """Nome do arquivo do dia de `timestamp` (horário local)."""
+    return f"{LOG_PREFIX}{time.strftime('%Y%m%d', time.localtime(timestamp))}{LOG_SUFFIX}"
+
+
+class QuestionLog:
+    """
+    Registro append-only das perguntas respondidas.
+
+    Uso:
+        log.record("quando é a rematrícula?", confidence=0.8, kind="answer")
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: Pasta dos arquivos diários (criada se não existir)
+        """
+        self.directory = Path(directory)
+        # Uma thread só: as linhas ficam em ordem e o arquivo aberto é dela
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tessera-questions")
+        self._file: Optional[TextIO] = None
+        self._filename: Optional[str] = None
+        self._closed = False
+        self._stats = {"recorded": 0, "errors": 0}
+
+    def record(self, question: str, confidence: float, kind: str):
+        """Anota uma pergunta sem esperar o disco."""
+        if self._closed:
+            return
+        now = time.time()
+        line = json.dumps({
+            "ts": round(now, 3),
+            "question": clip(question, MAX_QUESTION_CHARS),
+            "confidence": confidence,
+            "kind": kind,
+        }, ensure_ascii=False)
+        self._executor.submit(self._write, log_filename(now), line)
+
+    def close(self):
+        """Espera as escritas pendentes e fecha o arquivo."""
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.submit(self._close_file)
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def _write(self, filename: str, line: str):
+        try:
+            if filename != self._filename:
+                # Virou o dia: fecha o arquivo de ontem e abre o de hoje
+                self._close_file()
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.directory / filename, "a", encoding="utf-8")
+                self._filename = filename
+            # Linha inteira de uma vez: o job offline ignora linha sem "\n" no fim.
+            # Com vários processos (SHARD_WORKERS) no mesmo arquivo, o modo "a"
+            # (O_APPEND) e um write por linha mantêm as linhas sem mistura
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._stats["recorded"] += 1
+        except OSError as e:
+            self._stats["errors"] += 1
+            logger.warning("⚠️ Falha ao registrar pergunta: %s", e)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._filename = None
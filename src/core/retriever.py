@@ -0,0 +1,147 @@
+"""
+Hybrid Retriever - Palavras exatas + significado
+
+Combina as duas buscas do TesseraBot:
+1. Lexical (BM25): barata, ótima para "MAT101", "15/03", "edital 12/2026"
+2. Vetorial (embeddings): entende paráfrases ("quando começa a rematrícula")
+
+Fluxo de uma pergunta:
+- A busca lexical roda PRIMEIRO (não precisa do modelo de embeddings)
+- Se a pergunta tem tokens exatos (datas, códigos) e o melhor trecho
+  lexical contém todos eles, respondemos só com a lexical: o modelo de
+  embeddings nem é chamado
+- Senão, juntamos as duas listas com Reciprocal Rank Fusion (RRF)
+
+Conceitos que você vai aprender aqui:
+- Busca híbrida (hybrid search)
+- Reciprocal Rank Fusion: combinar rankings sem calibrar scores
+- Caminho rápido (fast path) para o caso comum
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.lexical_index import LexicalIndex, is_exact_token, tokenize
+from src.core.log import get_logger
+from src.core.vector_store import SearchHit, VectorIndex
+
+logger = get_logger("retriever")
+
+# Constante clássica do RRF: suaviza a diferença entre as primeiras posições
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> Dict[int, float]:
+    """
+    Combina vários rankings: score(linha) = soma de 1 / (k + posição).
+
+    Por que RRF?
+    - BM25 e cosseno estão em escalas diferentes; posições não
+    - Um trecho bem colocado nas duas listas sobe para o topo
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for position, row in enumerate(ranking):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (k + position + 1)
+    return fused
+
+
+class HybridRetriever:
+    """Busca híbrida sobre o índice vetorial e o índice lexical."""
+
+    def __init__(
+        self,
+        vector_index: VectorIndex,
+        lexical_index: Optional[LexicalIndex],
+        embed_fn: Callable[[str], Awaitable[Any]],
+        top_k: int = 4,
+        min_dense_score: float = 0.3,
+    ):
+        """
+        Args:
+            vector_index: Índice vetorial (fornece também o texto dos trechos)
+            lexical_index: Índice BM25 (None = só busca vetorial)
+            embed_fn: Função async pergunta -> vetor
+            top_k: Trechos retornados
+            min_dense_score: Cosseno mínimo para um trecho da busca vetorial
+        """
+        self.vector_index = vector_index
+        self.lexical_index = lexical_index
+        self.embed_fn = embed_fn
+        self.top_k = top_k
+        self.min_dense_score = min_dense_score
+        self._stats = {"lexical_only": 0, "hybrid": 0, "dense_only": 0, "empty": 0, "lexical_fallback": 0}
+
+    async def retrieve(self, question: str) -> List[SearchHit]:
+        """Retorna os trechos mais relevantes para a pergunta."""
+        candidates = self.top_k * 2
+        terms = tokenize(question)
+
+        lexical: List[tuple] = []
+        if self.lexical_index is not None and terms:
+            lexical = self.lexical_index.search(terms, candidates)
+
+        # Caminho rápido: tokens exatos encontrados -> sem embeddings
+        exact_terms = [term for term in terms if is_exact_token(term)]
+        if lexical and exact_terms and self._contains_all(lexical[0][0], exact_terms):
+            self._stats["lexical_only"] += 1
+            return self._lexical_hits(lexical)
+
+        try:
+            query = await self.embed_fn(question)
+        except Exception as e:
+            if not lexical:
+                raise
+            # Sem embeddings, a busca lexical ainda responde
+            logger.warning("⚠️ Embeddings indisponíveis, usando só BM25: %s", e)
+            self._stats["lexical_fallback"] += 1
+            return self._lexical_hits(lexical)
+
+        dense = await asyncio.to_thread(self.vector_index.search, query, candidates)
+        dense = [hit for hit in dense if hit.score >= self.min_dense_score]
+
+        if not lexical:
+            self._stats["dense_only" if dense else "empty"] += 1
+            return dense[:self.top_k]
+
+        self._stats["hybrid"] += 1
+        return self._fuse(lexical, dense)
+
+    def _lexical_hits(self, lexical: List[tuple]) -> List[SearchHit]:
+        """Converte os resultados BM25 em SearchHit."""
+        return [
+            SearchHit(row, score, self.vector_index.get_chunk(row), lexical_score=score)
+            for row, score in lexical[:self.top_k]
+        ]
+
+    def _fuse(self, lexical: List[tuple], dense: List[SearchHit]) -> List[SearchHit]:
+        """Junta as duas listas com RRF, preservando os scores originais."""
+        fused = reciprocal_rank_fusion([[row for row, _ in lexical], [hit.row for hit in dense]])
+        lexical_scores = dict(lexical)
+        dense_hits = {hit.row: hit for hit in dense}
+
+        hits = []
+        for row in sorted(fused, key=fused.get, reverse=True)[:self.top_k]:
+            dense_hit = dense_hits.get(row)
+            hits.append(SearchHit(
+                row=row,
+                score=fused[row],
+                chunk=dense_hit.chunk if dense_hit else self.vector_index.get_chunk(row),
+                dense_score=dense_hit.dense_score if dense_hit else None,
+                lexical_score=lexical_scores.get(row),
+            ))
+        return hits
+
+    def _contains_all(self, row: int, terms: List[str]) -> bool:
+        """True se o trecho contém todos os termos (postings são ordenadas)."""
+        for term in terms:
+            rows = self.lexical_index.rows_with(term)
+            position = int(np.searchsorted(rows, row))
+            if position >= len(rows) or rows[position] != row:
+                return False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "lexical_index": self.lexical_index is not None}
@@ -0,0 +1,196 @@
+"""
+Question Router - Cada pergunta no modelo (e no orçamento) que ela precisa
+
+"oi", "quando é a rematrícula?" e "como funciona a transferência
+interna e o que muda no aproveitamento de disciplinas?" iam todas para a
+mesma configuração do Gemini, com o mesmo limite de 1000 tokens de saída.
+
+O roteador separa as mensagens em três faixas:
+- greeting: saudação/agradecimento/despedida -> resposta pronta local,
+  sem busca nem Gemini
+- lookup: pergunta curta e factual -> modelo com orçamento de saída
+  pequeno e fila própria
+- complex: pergunta longa, com várias partes ou que pede explicação ->
+  orçamento completo
+
+Cada faixa de modelo tem o próprio LLMClient e o próprio LLMScheduler:
+uma fila de perguntas complexas não atrasa as consultas rápidas.
+
+A classificação é por regras simples e explicáveis (cada decisão tem um
+motivo, contado no get_status), para ajustar os limites com números reais.
+
+Conceitos que você vai aprender aqui:
+- Roteamento por complexidade (model cascading em miniatura)
+- Isolamento de filas por classe de trabalho (bulkheads)
+- Heurísticas com motivo registrado, para calibrar depois
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.core.lexical_index import fold_accents
+from src.core.llm_client import LLMClient
+
+TIER_GREETING = "greeting"
+TIER_LOOKUP = "lookup"
+TIER_COMPLEX = "complex"
+
+# Expressões de conversa fiada (sem acento) -> tipo de resposta pronta.
+# Frases inteiras, não palavras soltas: "como?", "e mais?" e "tudo?" são
+# perguntas de seguimento, não saudações
+_SMALL_TALK = {
+    **dict.fromkeys(("oi", "oie", "ola", "opa", "eai", "e ai", "hey", "hello", "salve", "bom dia",
+                     "boa tarde", "boa noite", "tudo bem", "tudo bom", "td bem", "beleza", "blz",
+                     "como vai", "como vai voce"), "hello"),
+    **dict.fromkeys(("obrigado", "obrigada", "muito obrigado", "muito obrigada", "obg", "brigado",
+                     "valeu", "vlw", "agradeco", "thanks"), "thanks"),
+    **dict.fromkeys(("tchau", "ate mais", "ate logo", "ate breve", "flw", "falou", "fui"), "bye"),
+}
+_LONGEST_PHRASE = max(len(phrase.split()) for phrase in _SMALL_TALK)
+# Podem acompanhar uma saudação ("oi pessoal"), mas sozinhas não são uma
+_FILLER = frozenset(("pessoal", "gente", "galera", "todos", "tessera", "tesserabot", "bot"))
+# Prioridade quando a mensagem mistura tipos ("valeu, tchau!")
+_KIND_PRIORITY = ("thanks", "bye", "hello")
+
+GREETING_TEMPLATES = {
+    "hello": "👋 Olá! Sou o {bot_name}. Pode perguntar sobre matrícula, calendário, "
+             "editais ou regulamentos da universidade.",
+    "thanks": "😊 Por nada! Se surgir outra dúvida, é só perguntar.",
+    "bye": "👋 Até mais! Boa sorte no semestre.",
+}
+
+# Pistas de pergunta que pede explicação (sem acento, já em minúsculas)
+_COMPLEX_CUES = re.compile(
+    r"\b(por que|porque|como funciona|explique|explica|diferenca|compar\w*|passo a passo"
+    r"|detalh\w*|vantage\w*|desvantage\w*|o que acontece|e se)\b"
+)
+# Palavras interrogativas: duas diferentes = pergunta com várias partes
+_INTERROGATIVES = re.compile(r"\b(quando|como|onde|qual|quais|quanto|quantos|quantas|quem|o que)\b")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class Route:
+    """Decisão do roteador para uma mensagem."""
+    tier: str
+    reason: str
+    greeting_kind: Optional[str] = None
+
+
+@dataclass
+class ModelTier:
+    """Uma faixa de modelo: cliente resiliente (com fila própria) e orçamento de saída."""
+    name: str
+    llm: LLMClient
+    max_output_tokens: int
+
+    @property
+    def scheduler(self):
+        return self.llm.scheduler
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm.model, "model_name", "?")
+
+    def get_stats(self) -> Dict[str, Any]:
+        llm = self.llm.get_stats()
+        scheduler = self.scheduler.get_stats()
+        return {
+            "model": self.model_name,
+            "max_output_tokens": self.max_output_tokens,
+            "max_in_flight": scheduler["max_in_flight"],
+            "in_flight": scheduler["in_flight"],
+            "queue_depth": scheduler["queue_depth"],
+            "avg_wait_ms": scheduler["avg_wait_ms"],
+            "calls": llm["calls"],
+            "failures": llm["failures"],
+            "p95_latency_ms": llm["p95_latency_ms"],
+        }
+
+
+class QuestionRouter:
+    """
+    Classifica mensagens em greeting / lookup / complex.
+
+    Uso:
+        route = router.classify("quando é a rematrícula?")
+        route.tier     # "lookup"
+        route.reason   # "short"
+    """
+
+    def __init__(self, complex_min_words: int = 25, bot_name: str = "TesseraBot"):
+        """
+        Args:
+            complex_min_words: A partir de quantas palavras a pergunta é complexa
+            bot_name: Nome usado na resposta de saudação
+        """
+        self.complex_min_words = complex_min_words
+        self.bot_name = bot_name
+        self._tiers: Counter = Counter()
+        self._reasons: Counter = Counter()
+
+    def classify(self, message: str, allow_greeting: bool = True) -> Route:
+        """
+        Args:
+            message: Mensagem do estudante
+            allow_greeting: False no meio de uma conversa (tudo é pergunta)
+        """
+        route = self._classify(message, allow_greeting)
+        self._tiers[route.tier] += 1
+        self._reasons[f"{route.tier}:{route.reason}"] += 1
+        return route
+
+    def _classify(self, message: str, allow_greeting: bool) -> Route:
+        text = fold_accents(message.lower())
+        words = _WORD.findall(text)
+
+        kind = self._greeting_kind(words) if allow_greeting else None
+        if kind is not None:
+            return Route(TIER_GREETING, "small_talk", greeting_kind=kind)
+
+        if len(words) >= self.complex_min_words:
+            return Route(TIER_COMPLEX, "long")
+        if message.count("?") >= 2 or len(set(_INTERROGATIVES.findall(text))) >= 2:
+            return Route(TIER_COMPLEX, "multi_part")
+        cue = _COMPLEX_CUES.search(text)
+        if cue:
+            return Route(TIER_COMPLEX, "explain")
+        return Route(TIER_LOOKUP, "short")
+
+    @staticmethod
+    def _greeting_kind(words) -> Optional[str]:
+        """
+        Tipo da saudação, se a mensagem for SÓ expressões de conversa fiada
+        (até 6 palavras). Casa a expressão mais longa em cada posição.
+        """
+        words = [word for word in words if word not in _FILLER]
+        if not words or len(words) > 6:
+            return None
+        kinds = set()
+        position = 0
+        while position < len(words):
+            for size in range(min(_LONGEST_PHRASE, len(words) - position), 0, -1):
+                kind = _SMALL_TALK.get(" ".join(words[position:position + size]))
+                if kind is not None:
+                    kinds.add(kind)
+                    position += size
+                    break
+            else:
+                return None
+        for kind in _KIND_PRIORITY:
+            if kind in kinds:
+                return kind
+        return None
+
+    def greeting_response(self, route: Route) -> str:
+        return GREETING_TEMPLATES[route.greeting_kind].format(bot_name=self.bot_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Decisões por faixa e por motivo (para calibrar os limites)."""
+        return {
+            "complex_min_words": self.complex_min_words,
+            "decisions": dict(self._tiers),
+            "reasons": dict(self._reasons),
+        }
@@ -0,0 +1,185 @@
+"""
+LLM Scheduler - Controle de Concorrência das Chamadas de IA
+
+O SDK do Gemini é síncrono: `model.generate_content()` bloqueia a thread
+até a resposta chegar. Se chamarmos isso direto dentro de uma coroutine,
+o event loop inteiro do Discord congela (heartbeats, outros usuários, !status).
+
+Este módulo resolve isso com duas peças:
+1. Um pool de threads limitado, onde as chamadas bloqueantes rodam
+2. Uma fila justa (FIFO por usuário, round-robin entre usuários) que
+   limita quantas chamadas ficam "em voo" ao mesmo tempo
+
+Conceitos que você vai aprender aqui:
+- Thread pools com asyncio (run_in_executor)
+- Backpressure (limitar trabalho simultâneo)
+- Fair queuing (um usuário não monopoliza a fila)
+"""
+
+import asyncio
+import functools
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.core.metrics import metrics, percentile
+
+# Chave usada quando a chamada não tem usuário associado
+ANONYMOUS_USER = "anonymous"
+
+
+@dataclass
+class _Waiter:
+    """Uma chamada esperando sua vez na fila."""
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class LLMScheduler:
+    """
+    Agenda chamadas bloqueantes ao LLM sem travar o event loop.
+
+    Como funciona a fila justa?
+    - Cada usuário tem sua própria fila FIFO
+    - Quando uma vaga libera, atendemos o próximo usuário da "roda"
+    - Assim, quem mandou 10 perguntas não passa na frente de quem mandou 1
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_in_flight: Máximo de chamadas simultâneas ao LLM
+            max_workers: Threads do pool (padrão: 2x max_in_flight)
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        # Threads de sobra: uma chamada abandonada (timeout, hedge perdedor)
+        # libera a vaga na fila, mas a thread só volta quando o Gemini responder
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.max_in_flight * 2,
+            thread_name_prefix="tessera-llm"
+        )
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._in_flight = 0
+
+        # Estatísticas para o get_status()
+        self._total_scheduled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=256)
+
+    @property
+    def queue_depth(self) -> int:
+        """Quantidade de chamadas esperando uma vaga."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        """Quantidade de chamadas executando agora."""
+        return self._in_flight
+
+    async def run(self, func: Callable[..., Any], *args, user_id: Optional[str] = None, **kwargs) -> Any:
+        """
+        Executa `func(*args, **kwargs)` no pool, respeitando a fila.
+
+        Args:
+            func: Função bloqueante (ex: model.generate_content)
+            user_id: Dono da chamada, usado para a fila justa
+
+        Returns:
+            O retorno de `func`
+        """
+        with metrics.span("llm_queue_wait"):
+            await self._acquire(user_id or ANONYMOUS_USER)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+        finally:
+            self._release()
+
+    async def _acquire(self, user_id: str):
+        """Espera até existir uma vaga livre para este usuário."""
+        enqueued_at = time.perf_counter()
+
+        # Caminho rápido: tem vaga e ninguém esperando
+        if self._in_flight < self.max_in_flight and not self._queues:
+            self._in_flight += 1
+            self._record_wait(enqueued_at)
+            return
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), enqueued_at)
+        self._queues.setdefault(user_id, deque()).append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # A vaga já tinha sido concedida: devolvemos para o próximo
+                self._release()
+            else:
+                self._discard(user_id, waiter)
+            raise
+
+    def _discard(self, user_id: str, waiter: _Waiter):
+        """Remove da fila uma chamada cancelada antes de ser atendida."""
+        queue = self._queues.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[user_id]
+
+    def _release(self):
+        """Libera uma vaga e acorda os próximos da fila."""
+        self._in_flight -= 1
+        self._wake_next()
+
+    def _wake_next(self):
+        """Concede vagas livres em round-robin entre os usuários."""
+        while self._in_flight < self.max_in_flight and self._queues:
+            user_id, queue = self._queues.popitem(last=False)
+            waiter = queue.popleft()
+            if queue:
+                # Usuário volta para o fim da roda
+                self._queues[user_id] = queue
+
+            if waiter.future.done():
+                continue
+
+            self._in_flight += 1
+            self._record_wait(waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _record_wait(self, enqueued_at: float):
+        """Registra quanto tempo a chamada esperou na fila."""
+        wait = time.perf_counter() - enqueued_at
+        self._total_scheduled += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self._recent_waits.append(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas da fila para monitoramento."""
+        p95 = percentile(self._recent_waits, 0.95)
+        avg = self._total_wait / self._total_scheduled if self._total_scheduled else 0.0
+
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "waiting_users": len(self._queues),
+            "total_scheduled": self._total_scheduled,
+            "avg_wait_ms": round(avg * 1000, 1),
+            "p95_wait_ms": round(p95 * 1000, 1),
+            "max_wait_ms": round(self._max_wait * 1000, 1),
+        }
+
+    def shutdown(self):
+        """Encerra o pool de threads (chamadas em andamento terminam)."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,68 @@
+"""
+Single Flight - Uma chamada para muitas perguntas iguais
+
+Quando sai um comunicado, dezenas de estudantes perguntam a MESMA coisa
+em poucos segundos. Sem coordenação, cada pergunta dispara sua própria
+chamada ao Gemini - todas pagando o mesmo custo para gerar a mesma resposta.
+
+Com "single flight", a primeira pergunta vira a "líder" e as outras
+iguais que chegam enquanto ela está em andamento simplesmente esperam
+o mesmo resultado.
+
+Conceitos que você vai aprender aqui:
+- Request coalescing / deduplicação de chamadas em andamento
+- asyncio.shield (um chamador cancelado não cancela o trabalho dos outros)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Deduplica chamadas assíncronas em andamento pela mesma chave.
+
+    Diferente do cache: aqui nada é guardado depois que a chamada termina.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Executa `func()` uma única vez por chave em andamento.
+
+        Returns:
+            (resultado, compartilhado) - compartilhado=True se este chamador
+            reaproveitou a chamada de outro
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if shared:
+            self._stats["coalesced"] += 1
+        else:
+            # O trabalho roda numa Task própria: se o chamador líder for
+            # cancelado, quem está esperando continua recebendo o resultado
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            self._stats["leaders"] += 1
+
+        return await asyncio.shield(task), shared
+
+    def __len__(self) -> int:
+        """Quantidade de chamadas distintas em andamento."""
+        return len(self._calls)
+
+    def __contains__(self, key: str) -> bool:
+        """Já existe uma chamada em andamento para esta chave?"""
+        return key in self._calls
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._calls)}
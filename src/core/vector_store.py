@@ -0,0 +1,240 @@
+"""
+Vector Store - Índice de Documentos Mapeado em Memória
+
+O índice de documentos fica no disco em formatos que podem ser
+"mapeados em memória" (mmap) em vez de lidos para a RAM:
+
+    index_meta.json       # metadados (quantidade, dimensão, versão)
+    vectors.npy           # matriz float32 (N, D), um vetor por trecho
+    chunks.jsonl          # um trecho por linha (texto, fonte, página)
+    chunks.offsets.npy    # onde cada linha começa no chunks.jsonl
+    vectors.int8.npy ...  # (opcional) versão comprimida, ver quantization.py
+
+Cada build grava uma "geração" completa numa pasta própria, e um
+arquivo CURRENT aponta para a geração ativa:
+
+    data/index/CURRENT                       # "20260315-101500-3fa2c1d0"
+    data/index/generations/20260315-101500-3fa2c1d0/index_meta.json ...
+
+Trocar de geração é reescrever CURRENT (atômico): o bot em execução
+percebe e passa a buscar na nova sem restart (ver bot_engine.py), e
+quem ainda estava buscando na antiga termina nela.
+
+Por que mmap?
+- Abrir o índice é instantâneo: nada é lido até ser usado
+- O sistema operacional carrega só as páginas acessadas
+- Vários processos do bot no mesmo servidor compartilham o mesmo
+  cache de páginas (a memória não é duplicada por processo)
+
+Conceitos que você vai aprender aqui:
+- Memory-mapped files (np.load com mmap_mode)
+- Busca por similaridade (produto interno / top-k)
+- Formatos de arquivo pensados para leitura rápida
+- Gerações imutáveis + ponteiro atômico (troca sem downtime)
+"""
+
+import json
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.core.quantization import (
+    INT8_CODES_FILENAME,
+    INT8_SCALES_FILENAME,
+    IVFPQ_FILENAME,
+    open_searcher,
+    top_n,
+)
+
+META_FILENAME = "index_meta.json"
+VECTORS_FILENAME = "vectors.npy"
+CHUNKS_FILENAME = "chunks.jsonl"
+OFFSETS_FILENAME = "chunks.offsets.npy"
+
+# Gerações do índice: pasta de cada build + ponteiro para a ativa
+GENERATIONS_DIRNAME = "generations"
+CURRENT_FILENAME = "CURRENT"
+
+INDEX_FORMAT_VERSION = 1
+
+
+@dataclass
+class SearchHit:
+    """Um trecho encontrado pela busca."""
+    row: int
+    score: float
+    chunk: Dict[str, Any]
+    dense_score: Optional[float] = None    # cosseno (busca vetorial)
+    lexical_score: Optional[float] = None  # BM25 (busca por palavras)
+
+    @property
+    def citation(self) -> str:
+        """Fonte legível, ex: 'edital.pdf (p. 3)'."""
+        return f"{self.chunk['source']} (p. {self.chunk['page']})"
+
+
+def process_rss_bytes() -> int:
+    """Memória residente do processo (Linux: /proc; outros: pico via resource)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rank_rows(searcher, vectors, query, k: int, rerank_factor: int = 4):
+    """
+    Busca em duas fases: candidatos pelo `searcher` + re-rank exato.
+
+    Returns:
+        (linhas, scores) dos k melhores, em ordem decrescente
+    """
+    if not searcher.needs_rerank:
+        return searcher.candidates(query, k)
+
+    candidates, _ = searcher.candidates(query, k * rerank_factor)
+    if len(candidates) == 0:
+        return candidates, np.empty(0, dtype=np.float32)
+
+    # Ordenar as linhas deixa a leitura do disco sequencial
+    candidates = np.sort(candidates)
+    best, scores = top_n(vectors[candidates] @ query, k)
+    return candidates[best], scores
+
+
+def current_generation(index_dir: Path) -> Optional[str]:
+    """Nome da geração ativa (None = sem gerações, formato antigo direto na pasta)."""
+    try:
+        name = (Path(index_dir) / CURRENT_FILENAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def active_index_dir(index_dir: Path) -> Path:
+    """Pasta com os arquivos do índice ativo."""
+    index_dir = Path(index_dir)
+    generation = current_generation(index_dir)
+    if generation is None:
+        return index_dir
+    return index_dir / GENERATIONS_DIRNAME / generation
+
+
+def index_exists(index_dir: Path) -> bool:
+    """True se a pasta contém um índice construído."""
+    return (active_index_dir(index_dir) / META_FILENAME).exists()
+
+
+class VectorIndex:
+    """
+    Índice de vetores somente-leitura, aberto via mmap.
+
+    Use `VectorIndex.open(pasta)`; nada é copiado para a RAM na abertura.
+    """
+
+    def __init__(self, index_dir: Path, meta: Dict[str, Any], vectors, offsets, chunks_file, chunks_map,
+                 searcher=None, rerank_factor: int = 4):
+        self.index_dir = index_dir
+        self.meta = meta
+        self.vectors = vectors
+        self.searcher = searcher
+        self.rerank_factor = max(1, rerank_factor)
+        self._offsets = offsets
+        self._chunks_file = chunks_file
+        self._chunks_map = chunks_map
+
+    @classmethod
+    def open(cls, index_dir: Path, nprobe: int = 8, rerank_factor: int = 4) -> "VectorIndex":
+        """
+        Abre o índice mapeando os arquivos em memória.
+
+        Args:
+            nprobe: Listas visitadas por busca (só para IVF-PQ)
+            rerank_factor: Candidatos aproximados por resultado final
+        """
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / META_FILENAME).read_text(encoding="utf-8"))
+        if meta.get("format") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Formato de índice não suportado: {meta.get('format')}")
+
+        vectors = np.load(index_dir / VECTORS_FILENAME, mmap_mode="r")
+        offsets = np.load(index_dir / OFFSETS_FILENAME, mmap_mode="r")
+
+        chunks_file = open(index_dir / CHUNKS_FILENAME, "rb")
+        chunks_map = None
+        if os.fstat(chunks_file.fileno()).st_size > 0:
+            chunks_map = mmap.mmap(chunks_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        searcher = open_searcher(index_dir, meta, vectors, nprobe)
+        return cls(index_dir, meta, vectors, offsets, chunks_file, chunks_map, searcher, rerank_factor)
+
+    def __len__(self) -> int:
+        return int(self.meta["count"])
+
+    @property
+    def dimension(self) -> int:
+        return int(self.meta["dimension"])
+
+    @property
+    def corpus_version(self) -> str:
+        return self.meta["corpus_version"]
+
+    @property
+    def embedding_model(self) -> str:
+        return self.meta["embedding_model"]
+
+    @property
+    def quantization(self) -> str:
+        return self.searcher.mode
+
+    def get_chunk(self, row: int) -> Dict[str, Any]:
+        """Lê os metadados de um trecho direto do arquivo mapeado."""
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(self._chunks_map[start:end])
+
+    def search(self, query, k: int = 4) -> List[SearchHit]:
+        """
+        Busca os k trechos mais parecidos com o vetor da pergunta.
+
+        Como os vetores são normalizados, produto interno == cosseno.
+        Com quantização, a busca comprimida escolhe candidatos e o score
+        final é recalculado com os vetores float32 exatos (re-rank).
+        """
+        if len(self) == 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        rows, scores = rank_rows(self.searcher, self.vectors, query, k, self.rerank_factor)
+        return [
+            SearchHit(int(row), float(score), self.get_chunk(int(row)), dense_score=float(score))
+            for row, score in zip(rows, scores)
+        ]
+
+    def mapped_bytes(self) -> int:
+        """Tamanho total dos arquivos mapeados (limite superior da RAM usada)."""
+        names = (VECTORS_FILENAME, OFFSETS_FILENAME, CHUNKS_FILENAME,
+                 INT8_CODES_FILENAME, INT8_SCALES_FILENAME, IVFPQ_FILENAME)
+        return sum(
+            (self.index_dir / name).stat().st_size
+            for name in names if (self.index_dir / name).exists()
+        )
+
+    def search_bytes(self) -> int:
+        """Memória percorrida por busca (vetores comprimidos, se houver)."""
+        return self.searcher.nbytes
+
+    def close(self):
+        """Desfaz os mapeamentos (chamado quando o índice é trocado)."""
+        if self._chunks_map is not None:
+            self._chunks_map.close()
+        self._chunks_file.close()
+        self.vectors = None
+        self.searcher = None
+        self._offsets = None
+
@@ -0,0 +1,158 @@
+"""
+TesseraBot - Ingestão de Documentos
+
+Ponto de entrada para transformar a pasta de PDFs da universidade
+em um índice pesquisável pelo Core Engine.
+
+Uso:
+    python src/ingest.py data/pdfs
+    python src/ingest.py data/pdfs --index-dir data/index --batch-size 64
+    python src/ingest.py data/pdfs --quantization int8
+    python src/ingest.py --report   # recall x memória x latência do índice atual
+
+Rodar de novo é barato: só PDFs novos ou alterados são reprocessados.
+Cada build publica uma geração nova do índice, e o bot em execução passa
+a usá-la sozinho (sem restart).
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Adiciona o diretório raiz ao Python path para imports funcionarem
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+
+from src.core.embeddings import SentenceEmbedder
+from src.core.log import setup_logging
+from src.core.quantization import QUANTIZATION_MODES
+from src.core.vector_store import META_FILENAME, active_index_dir, index_exists
+from src.ingestion.index_builder import DEFAULT_KEEP_GENERATIONS, build_index
+from src.ingestion.ingestor import DocumentIngestor
+from src.ingestion.quantize import format_report, quantization_report
+
+load_dotenv()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestão incremental de PDFs do TesseraBot")
+    parser.add_argument(
+        "pdf_dir", nargs="?", default=os.getenv('PDF_DIR', str(project_root / 'data' / 'pdfs')),
+        help="Pasta com os PDFs (padrão: $PDF_DIR ou data/pdfs)"
+    )
+    parser.add_argument(
+        "--index-dir", default=os.getenv('INDEX_DIR', str(project_root / 'data' / 'index')),
+        help="Pasta do índice (padrão: $INDEX_DIR ou data/index)"
+    )
+    parser.add_argument("--chunk-words", type=int, default=180, help="Palavras por trecho")
+    parser.add_argument("--overlap-words", type=int, default=40, help="Palavras repetidas entre trechos")
+    parser.add_argument("--batch-size", type=int, default=32, help="Trechos por lote de embeddings")
+    parser.add_argument(
+        "--quantization", choices=QUANTIZATION_MODES, default=os.getenv('INDEX_QUANTIZATION', 'none'),
+        help="Compressão dos vetores para a busca (padrão: $INDEX_QUANTIZATION ou none)"
+    )
+    parser.add_argument(
+        "--keep-generations", type=int, default=DEFAULT_KEEP_GENERATIONS,
+        help="Gerações do índice mantidas no disco (a ativa + anteriores, para rollback)"
+    )
+    parser.add_argument(
+        "--report", action="store_true",
+        help="Só mede recall@k x memória x latência das quantizações no índice atual"
+    )
+    parser.add_argument("--report-queries", type=int, default=200, help="Perguntas simuladas no relatório")
+    parser.add_argument("--k", type=int, default=5, help="k do recall@k no relatório")
+    return parser.parse_args(argv)
+
+
+def published_meta(index_dir: Path) -> Optional[Dict[str, Any]]:
+    """Metadados da geração ativa (ou None se não houver índice)."""
+    if not index_exists(index_dir):
+        return None
+    return json.loads((active_index_dir(index_dir) / META_FILENAME).read_text(encoding="utf-8"))
+
+
+def needs_rebuild(index_dir: Path, manifest, quantization: str) -> bool:
+    """
+    O índice publicado está atrás do manifesto?
+
+    Compara o que está no ar com o manifesto, não com o que esta execução
+    mudou: uma execução interrompida depois de gravar o manifesto (e antes
+    de publicar o índice) é refeita na próxima, mesmo sem arquivo novo.
+    """
+    meta = published_meta(index_dir)
+    if meta is None:
+        return True
+    requested = meta.get("quantization", {})
+    published_settings = meta.get("settings")
+    return (
+        meta.get("corpus_version") != manifest.corpus_version()
+        or requested.get("requested", requested.get("mode", "none")) != quantization
+        or meta.get("embedding_model") != manifest.settings.get("embedding_model")
+        # Índices antigos não gravavam as configurações: o modelo basta
+        or (published_settings is not None and published_settings != manifest.settings)
+    )
+
+
+def run_report(index_dir: Path, k: int, num_queries: int) -> int:
+    """Imprime o relatório de quantização do índice atual."""
+    if not index_exists(index_dir):
+        print(f"❌ Nenhum índice em {index_dir}. Rode a ingestão primeiro.")
+        return 1
+
+    print(f"📏 Medindo quantizações em {index_dir} ({num_queries} perguntas simuladas)...")
+    rows = quantization_report(active_index_dir(index_dir), k=k, num_queries=num_queries)
+    print("\n" + format_report(rows, k))
+    print("\n💡 Escolha o menor 'busca MB' com recall aceitável e use --quantization")
+    return 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    setup_logging()
+    pdf_dir = Path(args.pdf_dir)
+    index_dir = Path(args.index_dir)
+
+    if args.report:
+        return run_report(index_dir, args.k, args.report_queries)
+
+    if not pdf_dir.is_dir():
+        print(f"❌ Pasta de PDFs não encontrada: {pdf_dir}")
+        return 1
+
+    print(f"📚 Ingerindo PDFs de {pdf_dir} -> {args.index_dir}")
+
+    ingestor = DocumentIngestor(
+        index_dir=index_dir,
+        embedder=SentenceEmbedder(batch_size=args.batch_size),
+        chunk_words=args.chunk_words,
+        overlap_words=args.overlap_words,
+        batch_size=args.batch_size,
+    )
+    summary = ingestor.run(pdf_dir)
+
+    if needs_rebuild(index_dir, ingestor.manifest, args.quantization):
+        print(f"🧱 Montando índice mapeável em memória (quantização: {args.quantization})...")
+        build_index(index_dir, ingestor.manifest, ingestor.shards_dir, quantization=args.quantization,
+                    keep_generations=args.keep_generations)
+
+    print("\n" + "="*50)
+    print(f"✅ Ingestão concluída em {summary['seconds']}s")
+    print(f"   • Novos: {summary['new']}  • Alterados: {summary['changed']}")
+    print(f"   • Sem mudança: {summary['unchanged']}  • Removidos: {summary['removed']}")
+    print(f"   • Páginas processadas: {summary['pages']}  • Trechos: {summary['chunks']}")
+    print(f"   • Versão do corpus: {summary['corpus_version']}")
+    print("="*50)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrompido - rode de novo para continuar de onde parou")
+        sys.exit(130)
@@ -0,0 +1 @@
+# Ingestão de Documentos - PDFs -> trechos -> embeddings
\ No newline at end of file
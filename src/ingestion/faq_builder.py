@@ -0,0 +1,273 @@
+"""
+FAQ Builder - Agrupando as perguntas que sempre se repetem
+
+Lê o registro de perguntas (src/core/question_log.py), agrupa as
+parecidas e publica o índice de FAQ que o engine consulta antes da
+busca e do Gemini (src/core/faq.py).
+
+Tudo é incremental, como a ingestão de PDFs:
+- Um estado guarda até onde cada arquivo de log já foi lido
+- Só as linhas novas são codificadas e entram nos grupos existentes
+- Só grupos sem resposta (ou com resposta de documentos antigos)
+  precisam de uma nova resposta canônica
+
+Agrupamento "leader" (online): cada pergunta nova entra no grupo cujo
+centro é parecido o bastante; se nenhum for, vira um grupo novo. O
+centro é a média dos vetores do grupo, atualizada a cada pergunta.
+
+    data/faq/faq_state.json   # offsets dos logs + grupos (variantes, resposta)
+    data/faq/faq_sums.npy     # soma dos vetores de cada grupo (centro = soma normalizada)
+    data/faq/faq.npz          # índice publicado (só grupos frequentes e respondidos)
+
+Conceitos que você vai aprender aqui:
+- Processamento incremental de logs (offsets por arquivo)
+- Clustering online (leader clustering) com centros por média
+- Separar o estado de trabalho do artefato publicado
+"""
+
+import json
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.cache import normalize_question
+from src.core.faq import FAQ_FILENAME, FaqEntry, write_faq_index
+from src.core.log import fields, get_logger
+from src.core.question_log import LOG_PREFIX, LOG_SUFFIX
+from src.ingestion.manifest import atomic_write_text
+
+logger = get_logger("faq")
+
+STATE_FILENAME = "faq_state.json"
+SUMS_FILENAME = "faq_sums.npy"
+STATE_VERSION = 1
+
+
+def read_new_questions(log_dir: Path, offsets: Dict[str, int]) -> Tuple[Dict[str, Counter], int]:
+    """
+    Lê as linhas novas dos logs a partir dos offsets (que são atualizados).
+
+    Uma linha sem "\\n" no fim ainda está sendo escrita pelo bot: fica
+    para a próxima execução.
+
+    Returns:
+        ({pergunta normalizada: Counter(texto original -> vezes)}, linhas lidas)
+    """
+    questions: Dict[str, Counter] = {}
+    lines = 0
+    for path in sorted(Path(log_dir).glob(f"{LOG_PREFIX}*{LOG_SUFFIX}")):
+        offset = offsets.get(path.name, 0)
+        if path.stat().st_size < offset:
+            offset = 0  # Arquivo recriado: lê de novo do começo
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            for raw in handle:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                try:
+                    question = json.loads(raw)["question"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                key = normalize_question(question)
+                if key:
+                    questions.setdefault(key, Counter())[question.strip()] += 1
+                    lines += 1
+        offsets[path.name] = offset
+    return questions, lines
+
+
+class FaqBuilder:
+    """
+    Estado incremental dos grupos de perguntas.
+
+    Uso:
+        builder = FaqBuilder(pasta_faq, pasta_logs, embedder, modelo)
+        builder.ingest_logs()
+        for cluster in builder.pending_answers(versao):
+            builder.set_answer(cluster, resposta, versao)
+        builder.save()
+        builder.publish(versao)
+    """
+
+    def __init__(self, faq_dir: Path, log_dir: Path, embedder, embedding_model: str,
+                 similarity: float = 0.85, min_count: int = 3, max_variants: int = 8):
+        """
+        Args:
+            faq_dir: Pasta do estado e do índice publicado
+            log_dir: Pasta dos logs de perguntas
+            embedder: Objeto com encode(textos) -> vetores normalizados
+            embedding_model: Modelo dos vetores (o mesmo do índice de documentos)
+            similarity: Cosseno mínimo para uma pergunta entrar num grupo
+            min_count: Perguntas mínimas para um grupo virar FAQ
+            max_variants: Formas diferentes da pergunta guardadas por grupo
+        """
+        self.faq_dir = Path(faq_dir)
+        self.log_dir = Path(log_dir)
+        self.embedder = embedder
+        self.embedding_model = embedding_model
+        self.similarity = similarity
+        self.min_count = min_count
+        self.max_variants = max_variants
+
+        self.offsets: Dict[str, int] = {}
+        self.clusters: List[Dict[str, Any]] = []
+        self._sums: Optional[np.ndarray] = None
+        self._load()
+
+    @property
+    def state_path(self) -> Path:
+        return self.faq_dir / STATE_FILENAME
+
+    @property
+    def faq_path(self) -> Path:
+        return self.faq_dir / FAQ_FILENAME
+
+    def _load(self):
+        if not self.state_path.exists():
+            return
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if state.get("version") != STATE_VERSION or state.get("embedding_model") != self.embedding_model:
+            # Vetores de outro modelo não são comparáveis: recomeça lendo tudo
+            logger.warning("⚠️ Estado do FAQ de outro modelo/formato - os logs serão reprocessados", extra=fields(
+                state_version=state.get("version"), state_model=state.get("embedding_model"),
+                embedding_model=self.embedding_model
+            ))
+            return
+        self.offsets = state.get("offsets", {})
+        self.clusters = state.get("clusters", [])
+        if self.clusters:
+            self._sums = np.load(self.faq_dir / SUMS_FILENAME).astype(np.float32)
+
+    def save(self):
+        """Grava o estado (vetores primeiro, JSON por último)."""
+        self.faq_dir.mkdir(parents=True, exist_ok=True)
+        if self._sums is not None:
+            tmp_path = self.faq_dir / (SUMS_FILENAME + ".tmp")
+            with open(tmp_path, "wb") as handle:
+                np.save(handle, self._sums[:len(self.clusters)])
+            tmp_path.replace(self.faq_dir / SUMS_FILENAME)
+        state = {
+            "version": STATE_VERSION,
+            "embedding_model": self.embedding_model,
+            "offsets": self.offsets,
+            "clusters": self.clusters,
+        }
+        atomic_write_text(self.state_path, json.dumps(state, ensure_ascii=False, indent=1))
+
+    def ingest_logs(self, batch_size: int = 256) -> Dict[str, int]:
+        """Lê as perguntas novas e distribui cada uma num grupo."""
+        questions, lines = read_new_questions(self.log_dir, self.offsets)
+        before = len(self.clusters)
+
+        keys = list(questions)
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            # Codifica a forma mais comum de cada pergunta normalizada
+            texts = [questions[key].most_common(1)[0][0] for key in batch]
+            vectors = self.embedder.encode(texts)
+            for key, vector in zip(batch, vectors):
+                self._assign(np.asarray(vector, dtype=np.float32), questions[key])
+
+        return {
+            "lines": lines,
+            "distinct": len(questions),
+            "new_clusters": len(self.clusters) - before,
+            "clusters": len(self.clusters),
+        }
+
+    def _assign(self, vector: np.ndarray, variants: Counter):
+        """Coloca a pergunta no grupo mais parecido (ou cria um novo)."""
+        count = sum(variants.values())
+        best = None
+        if self.clusters:
+            sums = self._sums[:len(self.clusters)]
+            centers = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+            scores = centers @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity:
+                best = None
+
+        if best is None:
+            best = len(self.clusters)
+            self.clusters.append({"count": 0, "variants": {}, "answer": None})
+            self._grow(vector.shape[0])
+
+        cluster = self.clusters[best]
+        self._sums[best] += vector * count
+        cluster["count"] += count
+        merged = Counter(cluster["variants"])
+        merged.update(variants)
+        cluster["variants"] = dict(merged.most_common(self.max_variants))
+
+    def _grow(self, dimension: int):
+        """Garante espaço para mais um grupo (capacidade dobra, como uma lista)."""
+        needed = len(self.clusters)
+        if self._sums is None:
+            self._sums = np.zeros((max(16, needed), dimension), dtype=np.float32)
+        elif self._sums.shape[0] < needed:
+            grown = np.zeros((max(needed, self._sums.shape[0] * 2), dimension), dtype=np.float32)
+            grown[:self._sums.shape[0]] = self._sums
+            self._sums = grown
+
+    @staticmethod
+    def canonical_question(cluster: Dict[str, Any]) -> str:
+        """A forma mais perguntada do grupo."""
+        return max(cluster["variants"].items(), key=lambda item: item[1])[0]
+
+    def pending_answers(self, corpus_version: str) -> List[Dict[str, Any]]:
+        """Grupos frequentes sem resposta para os documentos atuais (mais perguntados primeiro)."""
+        pending = [
+            cluster for cluster in self.clusters
+            if cluster["count"] >= self.min_count
+            and (cluster["answer"] is None or cluster["answer"]["corpus_version"] != corpus_version)
+        ]
+        return sorted(pending, key=lambda cluster: cluster["count"], reverse=True)
+
+    def set_answer(self, cluster: Dict[str, Any], content: str, confidence: float,
+                   sources: List[str], corpus_version: str):
+        cluster["answer"] = {
+            "content": content,
+            "confidence": confidence,
+            "sources": list(sources),
+            "corpus_version": corpus_version,
+            "answered_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def publish(self, corpus_version: str) -> int:
+        """
+        Grava o índice de FAQ com os grupos frequentes já respondidos.
+
+        Returns:
+            Quantidade de perguntas publicadas
+        """
+        entries: List[FaqEntry] = []
+        rows: List[int] = []
+        for row, cluster in enumerate(self.clusters):
+            answer = cluster["answer"]
+            if cluster["count"] < self.min_count or answer is None or answer["corpus_version"] != corpus_version:
+                continue
+            entries.append(FaqEntry(
+                question=self.canonical_question(cluster),
+                answer=answer["content"],
+                confidence=answer["confidence"],
+                sources=answer["sources"],
+                count=cluster["count"],
+            ))
+            rows.append(row)
+
+        if rows:
+            sums = self._sums[rows]
+            vectors = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        else:
+            vectors = np.zeros((0, self._sums.shape[1] if self._sums is not None else 0), dtype=np.float32)
+
+        write_faq_index(self.faq_path, entries, vectors, {
+            "embedding_model": self.embedding_model,
+            "corpus_version": corpus_version,
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        return len(entries)
@@ -0,0 +1,183 @@
+"""
+Index Builder - Junta os shards num índice mapeável em memória
+
+A ingestão grava um shard por PDF. Para buscar, o Core Engine quer um
+único índice contínuo no formato do `src/core/vector_store.py`.
+
+Esta etapa só COPIA bytes (não recalcula embeddings), então é rápida
+mesmo com milhares de páginas, e usa memória constante: os vetores são
+escritos direto num arquivo mapeado, shard por shard.
+
+Cada build vira uma geração nova (generations/<nome>/), que ninguém lê
+até o arquivo CURRENT apontar para ela. O bot em execução troca de
+geração sozinho; as gerações antigas mais recentes ficam no disco para
+um rollback rápido (basta reescrever CURRENT).
+
+Conceitos que você vai aprender aqui:
+- np.lib.format.open_memmap (criar um .npy grande sem tê-lo na RAM)
+- Publicação atômica (ponteiro CURRENT reescrito por último)
+"""
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.core.quantization import INT8_CODES_FILENAME, INT8_SCALES_FILENAME, IVFPQ_FILENAME
+from src.core.vector_store import (
+    CHUNKS_FILENAME,
+    CURRENT_FILENAME,
+    GENERATIONS_DIRNAME,
+    INDEX_FORMAT_VERSION,
+    META_FILENAME,
+    OFFSETS_FILENAME,
+    VECTORS_FILENAME,
+    current_generation,
+)
+from src.ingestion.lexical_builder import LEXICAL_FILENAMES, build_lexical_index
+from src.ingestion.manifest import IngestionManifest, atomic_write_text
+from src.ingestion.quantize import write_quantized
+
+QUANTIZED_FILENAMES = (INT8_CODES_FILENAME, INT8_SCALES_FILENAME, IVFPQ_FILENAME)
+
+# Gerações guardadas no disco (a ativa + as anteriores, para rollback)
+DEFAULT_KEEP_GENERATIONS = 3
+
+
+def new_generation_dir(index_dir: Path, corpus_version: str) -> Path:
+    """Cria a pasta de uma geração nova: data e hora do build + versão dos documentos."""
+    base = f"{datetime.now():%Y%m%d-%H%M%S}-{corpus_version[:8]}"
+    generations = index_dir / GENERATIONS_DIRNAME
+    generations.mkdir(parents=True, exist_ok=True)
+    name, attempt = base, 1
+    while (generations / name).exists():
+        attempt += 1
+        name = f"{base}-{attempt}"
+    path = generations / name
+    path.mkdir()
+    return path
+
+
+def publish_generation(index_dir: Path, name: str):
+    """Aponta CURRENT para a geração (troca atômica: o bot nunca vê meio índice)."""
+    atomic_write_text(index_dir / CURRENT_FILENAME, name + "\n")
+
+
+def prune_generations(index_dir: Path, keep: int = DEFAULT_KEEP_GENERATIONS):
+    """
+    Apaga as gerações mais antigas, mantendo as `keep` mais recentes (e a ativa).
+
+    Um bot que ainda busca numa geração apagada não quebra: no Linux os
+    arquivos mapeados continuam válidos até serem desmapeados.
+    """
+    generations = index_dir / GENERATIONS_DIRNAME
+    if not generations.is_dir():
+        return
+    active = current_generation(index_dir)
+    names = sorted(path.name for path in generations.iterdir() if path.is_dir())
+    for name in names[:-max(1, keep)]:
+        if name != active:
+            shutil.rmtree(generations / name, ignore_errors=True)
+
+
+def remove_flat_index(index_dir: Path):
+    """Remove o índice no formato antigo (arquivos soltos na pasta, sem gerações)."""
+    (index_dir / META_FILENAME).unlink(missing_ok=True)
+    for name in (VECTORS_FILENAME, CHUNKS_FILENAME, OFFSETS_FILENAME, *QUANTIZED_FILENAMES, *LEXICAL_FILENAMES):
+        (index_dir / name).unlink(missing_ok=True)
+
+
+def build_index(index_dir: Path, manifest: IngestionManifest, shards_dir: Path,
+                quantization: str = "none",
+                keep_generations: int = DEFAULT_KEEP_GENERATIONS) -> Optional[Dict[str, Any]]:
+    """
+    Constrói uma geração nova do índice a partir dos shards do manifesto
+    e a publica como ativa.
+
+    Args:
+        quantization: "none", "int8" ou "ivfpq" (ver src/core/quantization.py)
+        keep_generations: Gerações mantidas no disco depois da publicação
+
+    Returns:
+        Os metadados gravados, ou None se não houver nenhum trecho
+    """
+    index_dir = Path(index_dir)
+    sources = sorted(manifest.files)
+    count = sum(manifest.files[source]["chunks"] for source in sources)
+    if count == 0 or manifest.dimension is None:
+        print("⚠️ Nenhum trecho para indexar")
+        return None
+
+    dimension = manifest.dimension
+    corpus_version = manifest.corpus_version()
+    generation_dir = new_generation_dir(index_dir, corpus_version)
+
+    # A geração só é lida depois de publicada: dá para escrever direto nela
+    def output(name: str) -> Path:
+        return generation_dir / name
+
+    # 1. Vetores: copiados shard a shard para um .npy mapeado
+    vectors = np.lib.format.open_memmap(
+        output(VECTORS_FILENAME), mode="w+", dtype=np.float32, shape=(count, dimension)
+    )
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    row = 0
+    position = 0
+
+    with open(output(CHUNKS_FILENAME), "wb") as chunks_out:
+        for source in sources:
+            shard = manifest.files[source]["shard"]
+            shard_vectors = np.fromfile(shards_dir / f"{shard}.f32", dtype=np.float32).reshape(-1, dimension)
+            vectors[row:row + len(shard_vectors)] = shard_vectors
+
+            # 2. Metadados: concatenados, guardando onde cada linha começa
+            with open(shards_dir / f"{shard}.jsonl", "rb") as shard_chunks:
+                for line in shard_chunks:
+                    offsets[row] = position
+                    chunks_out.write(line)
+                    position += len(line)
+                    row += 1
+            del shard_vectors
+
+        offsets[row] = position
+
+    if row != count:
+        raise ValueError(f"Shards inconsistentes: esperados {count} trechos, encontrados {row}")
+
+    vectors.flush()
+
+    # 3. Versão comprimida para a busca (opcional)
+    quantization_meta = write_quantized(quantization, vectors, output)
+    quantization_meta["requested"] = quantization
+    del vectors
+    with open(output(OFFSETS_FILENAME), "wb") as offsets_out:
+        np.save(offsets_out, offsets)
+
+    # 4. Índice invertido BM25 (mesmas linhas do índice vetorial)
+    build_lexical_index(output(CHUNKS_FILENAME), output)
+
+    # 5. Metadados: o hash de cada documento diz ao bot quais respostas
+    # em cache dependem de documentos que mudaram
+    meta = {
+        "format": INDEX_FORMAT_VERSION,
+        "count": count,
+        "dimension": dimension,
+        "embedding_model": manifest.settings.get("embedding_model"),
+        "settings": manifest.settings,
+        "corpus_version": corpus_version,
+        "generation": generation_dir.name,
+        "sources": {source: manifest.files[source]["sha256"] for source in sources},
+        "quantization": quantization_meta,
+        "lexical": True,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    atomic_write_text(output(META_FILENAME), json.dumps(meta, ensure_ascii=False, indent=2))
+
+    # 6. Publicação: CURRENT por último, depois a limpeza
+    publish_generation(index_dir, generation_dir.name)
+    remove_flat_index(index_dir)
+    prune_generations(index_dir, keep_generations)
+    return meta
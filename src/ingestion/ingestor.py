@@ -0,0 +1,174 @@
+"""
+Document Ingestor - Orquestra a ingestão incremental de PDFs
+
+Para cada PDF da pasta:
+1. Calcula o hash do conteúdo
+2. Se não mudou desde a última execução, pula (sem gastar embeddings!)
+3. Se é novo ou mudou, passa pelo pipeline em streaming e grava um
+   "shard" no disco: vetores (.f32) + metadados dos trechos (.jsonl)
+
+O manifesto é salvo depois de CADA arquivo. Se a ingestão for
+interrompida, a próxima execução continua de onde parou.
+
+Conceitos que você vai aprender aqui:
+- Processamento incremental
+- Shards (dividir um índice grande em pedaços independentes)
+- Idempotência (rodar duas vezes dá o mesmo resultado)
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from src.ingestion.manifest import IngestionManifest, file_sha256
+from src.ingestion.pipeline import chunk_pages, clean_pages, embed_chunks, extract_pages, iter_pdf_files
+
+SHARDS_DIRNAME = "shards"
+MANIFEST_FILENAME = "manifest.json"
+
+
+class DocumentIngestor:
+    """
+    Ingestão incremental e retomável de uma pasta de PDFs.
+
+    Estrutura gerada em `index_dir`:
+        manifest.json
+        shards/<sha256>.f32    # vetores float32, um após o outro
+        shards/<sha256>.jsonl  # um trecho por linha, na mesma ordem
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        embedder,
+        chunk_words: int = 180,
+        overlap_words: int = 40,
+        batch_size: int = 32,
+    ):
+        """
+        Args:
+            index_dir: Pasta onde shards e manifesto são gravados
+            embedder: Objeto com `.encode(textos)` e `.model_name`
+            chunk_words: Tamanho de cada trecho em palavras
+            overlap_words: Palavras repetidas entre trechos vizinhos
+            batch_size: Trechos por lote de embeddings
+        """
+        self.index_dir = Path(index_dir)
+        self.shards_dir = self.index_dir / SHARDS_DIRNAME
+        self.embedder = embedder
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.batch_size = batch_size
+        self.manifest = IngestionManifest(self.index_dir / MANIFEST_FILENAME)
+
+    def run(self, pdf_dir: Path) -> Dict[str, Any]:
+        """
+        Processa a pasta de PDFs.
+
+        Returns:
+            Resumo com quantos arquivos foram novos, alterados, mantidos e removidos
+        """
+        pdf_dir = Path(pdf_dir)
+        self.shards_dir.mkdir(parents=True, exist_ok=True)
+
+        settings = {
+            "embedding_model": self.embedder.model_name,
+            "chunk_words": self.chunk_words,
+            "overlap_words": self.overlap_words,
+        }
+        if self.manifest.reset_if_settings_changed(settings):
+            print("♻️ Modelo ou chunking mudou: todos os arquivos serão reprocessados")
+
+        summary = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "chunks": 0, "pages": 0}
+        started = time.perf_counter()
+        seen = set()
+
+        for path in iter_pdf_files(pdf_dir):
+            source = path.relative_to(pdf_dir).as_posix()
+            seen.add(source)
+
+            sha256 = file_sha256(path)
+            if self.manifest.is_current(source, sha256) and self._shard_exists(sha256):
+                summary["unchanged"] += 1
+                continue
+
+            previous = self.manifest.files.get(source)
+            print(f"📄 Processando {source}...")
+            chunks, pages = self._ingest_file(path, source, sha256)
+            self.manifest.record(source, sha256, shard=sha256, chunks=chunks, pages=pages)
+            if previous is not None and previous["shard"] != sha256:
+                self._delete_shard_if_unused(previous["shard"])
+
+            summary["changed" if previous else "new"] += 1
+            summary["chunks"] += chunks
+            summary["pages"] += pages
+            print(f"   ✅ {pages} páginas, {chunks} trechos")
+
+        # PDFs que sumiram da pasta saem do índice
+        for source in sorted(set(self.manifest.files) - seen):
+            entry = self.manifest.forget(source)
+            self._delete_shard_if_unused(entry["shard"])
+            summary["removed"] += 1
+            print(f"🗑️ Removido do índice: {source}")
+
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        summary["corpus_version"] = self.manifest.corpus_version()
+        return summary
+
+    def _ingest_file(self, path: Path, source: str, sha256: str):
+        """Roda o pipeline de um PDF e grava o shard (de forma atômica)."""
+        vectors_path, metadata_path = self._shard_paths(sha256)
+        tmp_vectors = vectors_path.with_name(vectors_path.name + ".tmp")
+        tmp_metadata = metadata_path.with_name(metadata_path.name + ".tmp")
+
+        pages_seen = set()
+
+        def counted_pages():
+            for page in extract_pages(path, source):
+                pages_seen.add(page.page_number)
+                yield page
+
+        chunks = chunk_pages(
+            clean_pages(counted_pages()),
+            chunk_prefix=sha256[:12],
+            chunk_words=self.chunk_words,
+            overlap_words=self.overlap_words,
+        )
+
+        total = 0
+        with open(tmp_vectors, "wb") as vectors_file, open(tmp_metadata, "w", encoding="utf-8") as metadata_file:
+            for batch, vectors in embed_chunks(chunks, self.embedder, self.batch_size):
+                vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+                self._check_dimension(vectors.shape[1])
+                vectors.tofile(vectors_file)
+                for chunk in batch:
+                    metadata_file.write(json.dumps(chunk.to_metadata(), ensure_ascii=False) + "\n")
+                total += len(batch)
+
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(tmp_metadata, metadata_path)
+        return total, len(pages_seen)
+
+    def _check_dimension(self, dimension: int):
+        if self.manifest.dimension is None:
+            self.manifest.dimension = dimension
+        elif self.manifest.dimension != dimension:
+            raise ValueError(
+                f"Dimensão dos embeddings mudou ({self.manifest.dimension} -> {dimension})"
+            )
+
+    def _shard_paths(self, shard: str):
+        return self.shards_dir / f"{shard}.f32", self.shards_dir / f"{shard}.jsonl"
+
+    def _shard_exists(self, shard: str) -> bool:
+        return all(path.exists() for path in self._shard_paths(shard))
+
+    def _delete_shard_if_unused(self, shard: str):
+        if self.manifest.shard_in_use(shard):
+            return
+        for path in self._shard_paths(shard):
+            path.unlink(missing_ok=True)
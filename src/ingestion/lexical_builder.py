@@ -0,0 +1,89 @@
+"""
+Lexical Builder - Monta o índice invertido BM25
+
+Lê o chunks.jsonl do índice (um trecho por linha) e gera os arquivos
+do `src/core/lexical_index.py`, com as mesmas linhas do índice vetorial.
+
+Por que não um dict de listas?
+- Com dezenas de milhares de trechos, listas Python de postings ocupam
+  centenas de MB. Guardamos triplas (termo, linha, tf) em arrays
+  compactos e ordenamos tudo de uma vez com numpy.
+
+Conceitos que você vai aprender aqui:
+- Construção de índice invertido por ordenação (sort-based inversion)
+- array.array: listas compactas de números
+"""
+
+import json
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.core.lexical_index import (
+    DOCLEN_FILENAME,
+    POSTINGS_FILENAME,
+    TFS_FILENAME,
+    VOCAB_FILENAME,
+    tokenize,
+)
+
+LEXICAL_FILENAMES = (VOCAB_FILENAME, POSTINGS_FILENAME, TFS_FILENAME, DOCLEN_FILENAME)
+
+
+def build_lexical_index(chunks_path: Path, output_path: Callable[[str], Path],
+                        k1: float = 1.2, b: float = 0.75) -> List[str]:
+    """
+    Gera o índice BM25 a partir do chunks.jsonl.
+
+    Args:
+        chunks_path: Arquivo com um trecho JSON por linha
+        output_path: Função nome_final -> caminho onde gravar
+
+    Returns:
+        Nomes dos arquivos gerados
+    """
+    term_ids: Dict[str, int] = {}
+    term_column, row_column, tf_column = array("I"), array("I"), array("H")
+    doclen = array("I")
+
+    with open(chunks_path, "rb") as chunks:
+        for row, line in enumerate(chunks):
+            counts = Counter(tokenize(json.loads(line)["text"]))
+            doclen.append(sum(counts.values()))
+            for term, tf in counts.items():
+                term_column.append(term_ids.setdefault(term, len(term_ids)))
+                row_column.append(row)
+                tf_column.append(min(tf, 65535))
+
+    # Ordena por (termo, linha): cada termo vira um bloco contíguo de postings
+    terms = np.frombuffer(term_column, dtype=np.uint32)
+    rows = np.frombuffer(row_column, dtype=np.uint32)
+    order = np.lexsort((rows, terms))
+    sorted_terms = terms[order]
+
+    starts = np.searchsorted(sorted_terms, np.arange(len(term_ids)), side="left")
+    ends = np.searchsorted(sorted_terms, np.arange(len(term_ids)), side="right")
+
+    with open(output_path(POSTINGS_FILENAME), "wb") as out:
+        np.save(out, rows[order].astype(np.int32))
+    with open(output_path(TFS_FILENAME), "wb") as out:
+        np.save(out, np.frombuffer(tf_column, dtype=np.uint16)[order])
+    with open(output_path(DOCLEN_FILENAME), "wb") as out:
+        np.save(out, np.frombuffer(doclen, dtype=np.uint32))
+
+    count = len(doclen)
+    vocab = {
+        "terms": {
+            term: [int(starts[term_id]), int(ends[term_id] - starts[term_id])]
+            for term, term_id in term_ids.items()
+        },
+        "count": count,
+        "avgdl": float(sum(doclen)) / count if count else 0.0,
+        "k1": k1,
+        "b": b,
+    }
+    output_path(VOCAB_FILENAME).write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    return list(LEXICAL_FILENAMES)
@@ -0,0 +1,136 @@
+"""
+Manifesto de Ingestão - Lembrando o que já foi processado
+
+Gerar embeddings é a parte cara da ingestão. O manifesto guarda, para
+cada PDF, o hash (SHA-256) do conteúdo: se o arquivo não mudou desde a
+última execução, não precisamos processá-lo de novo.
+
+Conceitos que você vai aprender aqui:
+- Hash de conteúdo (detectar mudanças sem comparar arquivos inteiros)
+- Escrita atômica (arquivo temporário + os.replace)
+- Processamento incremental e retomável
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, block_size: int = 1024 * 1024) -> str:
+    """Calcula o SHA-256 lendo o arquivo em blocos (não carrega tudo na RAM)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write_text(path: Path, text: str):
+    """
+    Escreve um arquivo de forma atômica.
+
+    Por que?
+    - Se o processo morrer no meio da escrita, o arquivo antigo continua
+      intacto - nunca ficamos com um manifesto pela metade
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+class IngestionManifest:
+    """
+    Registro dos arquivos já ingeridos.
+
+    Formato (manifest.json):
+        {
+          "version": 1,
+          "settings": {"embedding_model": ..., "chunk_words": ..., ...},
+          "dimension": 384,
+          "files": {"edital.pdf": {"sha256": ..., "shard": ..., "chunks": 12}}
+        }
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.settings: Dict[str, Any] = {}
+        self.dimension: Optional[int] = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("version") != MANIFEST_VERSION:
+            print("⚠️ Manifesto em formato antigo - tudo será reprocessado")
+            return
+        self.settings = data.get("settings", {})
+        self.dimension = data.get("dimension")
+        self.files = data.get("files", {})
+
+    def reset_if_settings_changed(self, settings: Dict[str, Any]) -> bool:
+        """
+        Descarta o histórico se o modelo ou o chunking mudaram.
+
+        Vetores de modelos diferentes não são comparáveis, então
+        nesse caso todos os arquivos precisam ser reprocessados.
+        """
+        changed = bool(self.files) and self.settings != settings
+        if changed:
+            self.files = {}
+            self.dimension = None
+        self.settings = dict(settings)
+        return changed
+
+    def is_current(self, source: str, sha256: str) -> bool:
+        """True se o arquivo já foi ingerido com exatamente este conteúdo."""
+        entry = self.files.get(source)
+        return entry is not None and entry.get("sha256") == sha256
+
+    def record(self, source: str, sha256: str, shard: str, chunks: int, pages: int):
+        """Marca um arquivo como ingerido (e salva imediatamente)."""
+        self.files[source] = {
+            "sha256": sha256,
+            "shard": shard,
+            "chunks": chunks,
+            "pages": pages,
+            "ingested_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+
+    def forget(self, source: str) -> Optional[Dict[str, Any]]:
+        """Remove um arquivo do manifesto (ex: PDF apagado da pasta)."""
+        entry = self.files.pop(source, None)
+        if entry is not None:
+            self.save()
+        return entry
+
+    def shard_in_use(self, shard: str) -> bool:
+        """True se algum arquivo ainda aponta para este shard."""
+        return any(entry.get("shard") == shard for entry in self.files.values())
+
+    def corpus_version(self) -> str:
+        """Identificador curto do conjunto atual de documentos."""
+        digest = hashlib.sha256()
+        for source in sorted(self.files):
+            digest.update(f"{source}\0{self.files[source]['sha256']}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "dimension": self.dimension,
+            "files": self.files,
+        }
+        atomic_write_text(self.path, json.dumps(data, ensure_ascii=False, indent=2))
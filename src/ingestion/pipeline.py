@@ -0,0 +1,153 @@
+"""
+Pipeline de Ingestão - PDFs viram trechos pesquisáveis
+
+Cada etapa é um gerador (generator) que consome a etapa anterior:
+
+    extract_pages -> clean_pages -> chunk_pages -> embed_chunks
+
+Por que geradores?
+- Só uma página (ou um lote de trechos) fica na memória por vez
+- Uma pasta com milhares de páginas roda numa máquina com pouca RAM
+- Cada etapa é pequena e fácil de entender/testar isoladamente
+
+Conceitos que você vai aprender aqui:
+- Generators e lazy evaluation (yield)
+- Pipelines de processamento em streaming
+- Chunking com sobreposição (overlap)
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+# Palavra quebrada no fim da linha: "matrí-\ncula" -> "matrícula"
+_HYPHENATION = re.compile(r"(\w)-\s*\n\s*(\w)")
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class Page:
+    """Texto de uma página de um PDF."""
+    source: str       # Caminho relativo do PDF
+    page_number: int  # Começa em 1 (como o leitor de PDF mostra)
+    text: str
+
+
+@dataclass
+class Chunk:
+    """Trecho de texto que será indexado."""
+    chunk_id: str
+    source: str
+    page_number: int
+    text: str
+
+    def to_metadata(self) -> dict:
+        """Formato gravado no disco (uma linha JSON por trecho)."""
+        return {
+            "id": self.chunk_id,
+            "source": self.source,
+            "page": self.page_number,
+            "text": self.text,
+        }
+
+
+def iter_pdf_files(directory: Path) -> Iterator[Path]:
+    """Lista os PDFs da pasta (recursivamente), em ordem estável."""
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and path.suffix.lower() == ".pdf":
+            yield path
+
+
+def extract_pages(path: Path, source: str) -> Iterator[Page]:
+    """
+    Extrai o texto de cada página, uma por vez.
+
+    O PdfReader só decodifica uma página quando acessamos `reader.pages[i]`,
+    então nunca temos o documento inteiro em memória como texto.
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(str(path), strict=False)
+    for index in range(len(reader.pages)):
+        try:
+            text = reader.pages[index].extract_text() or ""
+        except Exception as e:
+            print(f"⚠️ Falha ao ler página {index + 1} de {source}: {e}")
+            continue
+        yield Page(source=source, page_number=index + 1, text=text)
+
+
+def clean_pages(pages: Iterable[Page]) -> Iterator[Page]:
+    """Remove hifenização, caracteres de controle e espaços repetidos."""
+    for page in pages:
+        text = _HYPHENATION.sub(r"\1\2", page.text)
+        text = _CONTROL_CHARS.sub(" ", text)
+        text = _WHITESPACE.sub(" ", text).strip()
+        if text:
+            yield Page(page.source, page.page_number, text)
+
+
+def chunk_pages(
+    pages: Iterable[Page],
+    chunk_prefix: str,
+    chunk_words: int = 180,
+    overlap_words: int = 40,
+    min_chars: int = 40,
+) -> Iterator[Chunk]:
+    """
+    Divide cada página em trechos de ~chunk_words palavras.
+
+    Por que sobreposição (overlap)?
+    - Uma frase importante pode cair bem na divisa entre dois trechos
+    - Repetindo algumas palavras, ela aparece inteira em pelo menos um
+
+    Os trechos não atravessam páginas: assim cada resposta pode citar
+    exatamente a página de onde veio.
+    """
+    step = max(1, chunk_words - overlap_words)
+    for page in pages:
+        words = page.text.split(" ")
+        start, number = 0, 0
+        while start < len(words):
+            end = start + chunk_words
+            if len(words) - end < step // 2:
+                # Sobrou pouco texto: junta ao trecho atual em vez de criar um trecho minúsculo
+                end = len(words)
+
+            text = " ".join(words[start:end])
+            if len(text) >= min_chars:
+                yield Chunk(
+                    chunk_id=f"{chunk_prefix}:{page.page_number}:{number}",
+                    source=page.source,
+                    page_number=page.page_number,
+                    text=text,
+                )
+            if end >= len(words):
+                break
+            start += step
+            number += 1
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Agrupa um iterável em listas de até `size` itens."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def embed_chunks(chunks: Iterable[Chunk], embedder, batch_size: int = 32) -> Iterator[Tuple[List[Chunk], object]]:
+    """
+    Gera embeddings em lotes.
+
+    Yields:
+        (lista de trechos, matriz numpy com um vetor por trecho)
+    """
+    for batch in batched(chunks, batch_size):
+        yield batch, embedder.encode([chunk.text for chunk in batch])
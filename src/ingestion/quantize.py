@@ -0,0 +1,197 @@
+"""
+Quantize - Gera as versões comprimidas do índice (e mede o custo)
+
+Complementa o `src/core/quantization.py`: lá ficam os buscadores,
+aqui ficam os construtores e o relatório de recall x memória x latência
+usado para escolher a configuração de cada corpus.
+
+Conceitos que você vai aprender aqui:
+- Treinamento de quantizadores (k-means do FAISS)
+- Recall@k: quantos dos k resultados exatos a busca aproximada encontrou
+- Trade-offs de engenharia medidos, não "chutados"
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from src.core.quantization import (
+    INT8_CODES_FILENAME,
+    INT8_SCALES_FILENAME,
+    IVFPQ_FILENAME,
+    ExactSearcher,
+    Int8Searcher,
+    IVFPQSearcher,
+)
+from src.core.vector_store import VECTORS_FILENAME, rank_rows
+
+# IVF-PQ precisa de dados suficientes para treinar 256 centróides por subespaço
+MIN_IVFPQ_VECTORS = 10000
+_BLOCK_ROWS = 65536
+
+
+def build_int8(vectors, codes_path: Path, scales_path: Path):
+    """Quantização escalar int8 com uma escala por vetor."""
+    codes = np.lib.format.open_memmap(codes_path, mode="w+", dtype=np.int8, shape=vectors.shape)
+    scales = np.empty(len(vectors), dtype=np.float32)
+
+    for start in range(0, len(vectors), _BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + _BLOCK_ROWS], dtype=np.float32)
+        block_scales = np.abs(block).max(axis=1) / 127.0
+        block_scales[block_scales == 0] = 1.0
+        codes[start:start + len(block)] = np.round(block / block_scales[:, None]).astype(np.int8)
+        scales[start:start + len(block)] = block_scales
+
+    codes.flush()
+    del codes
+    with open(scales_path, "wb") as scales_out:
+        np.save(scales_out, scales)
+
+
+def default_ivfpq_params(count: int, dimension: int) -> Dict[str, int]:
+    """
+    Escolhe parâmetros razoáveis de IVF-PQ para o tamanho do corpus.
+
+    - nlist ~ 4 * sqrt(N) listas, com pelo menos 39 vetores de treino por lista
+    - m subquantizadores de 8 dimensões cada (1 byte por subquantizador)
+    """
+    nlist = max(1, min(int(4 * np.sqrt(count)), count // 39))
+    m = next(
+        (dimension // sub for sub in (8, 4, 2, 1) if dimension % sub == 0 and dimension // sub <= 64),
+        dimension,
+    )
+    return {"nlist": nlist, "m": m}
+
+
+def build_ivfpq(vectors, path: Path, nlist: int, m: int, train_size: int = 50000, seed: int = 0):
+    """Treina e grava um índice FAISS IVF-PQ (produto interno)."""
+    import faiss
+
+    dimension = vectors.shape[1]
+    index = faiss.index_factory(dimension, f"IVF{nlist},PQ{m}x8", faiss.METRIC_INNER_PRODUCT)
+
+    # Treina com uma amostra (não precisamos de todos os vetores)
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(len(vectors), size=min(train_size, len(vectors)), replace=False))
+    index.train(np.ascontiguousarray(vectors[sample_rows], dtype=np.float32))
+
+    for start in range(0, len(vectors), _BLOCK_ROWS):
+        index.add(np.ascontiguousarray(vectors[start:start + _BLOCK_ROWS], dtype=np.float32))
+
+    faiss.write_index(index, str(path))
+
+
+def write_quantized(mode: str, vectors, output_path: Callable[[str], Path]) -> Dict[str, Any]:
+    """
+    Gera os arquivos da quantização escolhida.
+
+    Args:
+        mode: "none", "int8" ou "ivfpq"
+        vectors: Matriz float32 (pode ser um memmap)
+        output_path: Função nome_final -> caminho onde gravar
+
+    Returns:
+        Metadados da quantização (vão para o index_meta.json)
+    """
+    if mode == "ivfpq" and len(vectors) < MIN_IVFPQ_VECTORS:
+        print(f"⚠️ Só {len(vectors)} trechos: poucos para treinar IVF-PQ, usando int8")
+        mode = "int8"
+
+    if mode == "int8":
+        build_int8(vectors, output_path(INT8_CODES_FILENAME), output_path(INT8_SCALES_FILENAME))
+        return {"mode": "int8", "files": [INT8_CODES_FILENAME, INT8_SCALES_FILENAME]}
+
+    if mode == "ivfpq":
+        params = default_ivfpq_params(*vectors.shape)
+        build_ivfpq(vectors, output_path(IVFPQ_FILENAME), **params)
+        return {"mode": "ivfpq", "files": [IVFPQ_FILENAME], **params}
+
+    return {"mode": "none", "files": []}
+
+
+def _sample_queries(vectors, count: int, seed: int):
+    """
+    Simula perguntas: trechos sorteados com ruído (uma pergunta nunca é
+    idêntica ao trecho que a responde).
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(vectors), size=min(count, len(vectors)), replace=False))
+    queries = np.asarray(vectors[rows], dtype=np.float32)
+    queries += rng.normal(0, 1.0 / np.sqrt(vectors.shape[1]), size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def _measure(searcher, vectors, queries, truth: List[set], k: int, rerank_factor: int) -> Dict[str, float]:
+    found = 0
+    started = time.perf_counter()
+    for query, expected in zip(queries, truth):
+        rows, _ = rank_rows(searcher, vectors, query, k, rerank_factor)
+        found += len(expected.intersection(int(row) for row in rows))
+    elapsed = time.perf_counter() - started
+    return {
+        "recall": found / (len(queries) * k),
+        "search_mb": searcher.nbytes / 1024 / 1024,
+        "ms_per_query": elapsed * 1000 / len(queries),
+    }
+
+
+def quantization_report(
+    index_dir: Path,
+    k: int = 5,
+    num_queries: int = 200,
+    rerank_factor: int = 4,
+    nprobes=(4, 8, 16, 32),
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Compara as quantizações no corpus atual: recall@k x memória x latência.
+
+    Os índices comprimidos são construídos numa pasta temporária;
+    o índice em produção não é alterado.
+    """
+    vectors = np.load(Path(index_dir) / VECTORS_FILENAME, mmap_mode="r")
+    queries = _sample_queries(vectors, num_queries, seed)
+
+    exact = ExactSearcher(vectors)
+    truth = [set(int(row) for row in exact.candidates(query, k)[0]) for query in queries]
+
+    results = [{"mode": "none", "nprobe": None, **_measure(exact, vectors, queries, truth, k, rerank_factor)}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+
+        build_int8(vectors, tmp_dir / INT8_CODES_FILENAME, tmp_dir / INT8_SCALES_FILENAME)
+        int8 = Int8Searcher.open(tmp_dir)
+        results.append({"mode": "int8", "nprobe": None, **_measure(int8, vectors, queries, truth, k, rerank_factor)})
+
+        if len(vectors) >= MIN_IVFPQ_VECTORS:
+            params = default_ivfpq_params(*vectors.shape)
+            build_ivfpq(vectors, tmp_dir / IVFPQ_FILENAME, **params)
+            ivfpq = IVFPQSearcher.open(tmp_dir)
+            for nprobe in nprobes:
+                ivfpq.set_nprobe(nprobe)
+                results.append({"mode": "ivfpq", "nprobe": nprobe,
+                                **_measure(ivfpq, vectors, queries, truth, k, rerank_factor)})
+            del ivfpq
+        else:
+            print(f"ℹ️ IVF-PQ omitido: precisa de pelo menos {MIN_IVFPQ_VECTORS} trechos")
+
+        # Libera os memmaps antes de apagar a pasta temporária
+        del int8
+
+    return results
+
+
+def format_report(rows: List[Dict[str, Any]], k: int) -> str:
+    """Tabela legível do relatório."""
+    lines = [f"{'modo':<8} {'nprobe':>6} {f'recall@{k}':>10} {'busca MB':>10} {'ms/consulta':>12}"]
+    for row in rows:
+        nprobe = "-" if row["nprobe"] is None else str(row["nprobe"])
+        lines.append(
+            f"{row['mode']:<8} {nprobe:>6} {row['recall']:>10.3f} "
+            f"{row['search_mb']:>10.2f} {row['ms_per_query']:>12.2f}"
+        )
+    return "\n".join(lines)
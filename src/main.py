@@ -3,26 +3,74 @@ TesseraBot - Ponto de Entrada Principal
 
 Este arquivo é o "main" do projeto - onde tudo começa.
 
+Uso:
+    python src/main.py
+    python src/main.py --profile-startup   # mede cada etapa da inicialização e sai
+
 Conceitos que você vai aprender:
 - Entry point (ponto de entrada)
 - Async/await patterns
 - Error handling at application level
 - Configuration management
+- Ciclo de vida explícito: cada etapa pesada acontece num ponto conhecido
 """
 
+import argparse
 import asyncio
 import sys
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 # Adiciona o diretório raiz ao Python path para imports funcionarem
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.adapters.discord_adapter import run_discord_bot
-from src.core.bot_engine import bot_engine
+# Imports pesados (engine, Discord, SDK do Gemini) ficam dentro de main():
+# assim cada um aparece como uma etapa no --profile-startup
+
+class StartupProfile:
+    """
+    Cronômetro das etapas de inicialização.
+    
+    Por que medir?
+    - Num incidente, restart precisa levar segundos, não minutos
+    - Sem números, ninguém sabe se o tempo vai em imports, no Gemini
+      ou no índice
+    """
+    
+    def __init__(self):
+        self.steps = []
+    
+    @contextmanager
+    def step(self, name: str):
+        """Mede uma etapa (tempo e quantos módulos ela importou)."""
+        modules = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - started, len(sys.modules) - modules))
+    
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds, _ in self.steps)
+    
+    def report(self):
+        """Imprime a tabela de etapas (da mais lenta para a mais rápida)."""
+        total = self.total
+        print("\n" + "="*50)
+        print("⏱️ Inicialização por etapa")
+        print("="*50)
+        for name, seconds, modules in sorted(self.steps, key=lambda step: step[1], reverse=True):
+            share = seconds / total * 100 if total else 0.0
+            print(f"   {name:<28} {seconds * 1000:8.1f} ms  {share:5.1f}%  (+{modules} módulos)")
+        print(f"   {'Total':<28} {total * 1000:8.1f} ms")
+        print("="*50)
+        print("💡 Detalhe por módulo: python -X importtime src/main.py --profile-startup 2> imports.txt")
 
-def check_environment():
+def check_environment(required_vars=('DISCORD_BOT_TOKEN', 'GOOGLE_API_KEY')):
     """
     Verifica se o ambiente está configurado corretamente.
     
@@ -42,7 +90,6 @@ def check_environment():
         return False
     
     # Verifica variáveis essenciais
-    required_vars = ['DISCORD_BOT_TOKEN', 'GOOGLE_API_KEY']
     missing_vars = []
     
     for var in required_vars:
@@ -73,7 +120,7 @@ def show_startup_info():
     print("   • Preparado para Telegram/Web futuramente")
     print("="*50)
 
-async def main():
+async def main(profile_startup: bool = False):
     """
     Função principal do TesseraBot.
     
@@ -81,46 +128,169 @@ async def main():
     - O bot precisa lidar com múltiplas conexões simultâneas
     - APIs modernas são assíncronas
     - Melhor performance e responsividade
+    
+    Args:
+        profile_startup: Mede cada etapa, imprime a tabela e sai sem
+            conectar ao Discord
     """
     
+    profile = StartupProfile()
+    
+    # Logs configurados antes de importar o engine (ele já loga ao ser criado)
+    with profile.step("Logs"):
+        from src.core.log import fields, get_logger, setup_logging
+        setup_logging()
+    
+    # O .env é lido uma vez só, aqui, antes de qualquer os.getenv
+    with profile.step(".env"):
+        from dotenv import load_dotenv
+        load_dotenv(project_root / '.env')
+    
     show_startup_info()
     
-    # 1. Verificar configuração
-    if not check_environment():
+    # Plataforma: discord (padrão) ou engine (só o serviço do engine, que os
+    # adapters de outros processos usam via ENGINE_SERVICE)
+    platform = os.getenv('PLATFORM', 'discord').lower()
+    engine_service = os.getenv('ENGINE_SERVICE')
+    
+    # 1. Verificar configuração (o serviço não usa o Discord; um adapter que
+    # usa o serviço não chama o Gemini)
+    if platform == 'engine':
+        required_vars = ('GOOGLE_API_KEY',)
+    elif engine_service:
+        required_vars = ('DISCORD_BOT_TOKEN',)
+    else:
+        required_vars = ('DISCORD_BOT_TOKEN', 'GOOGLE_API_KEY')
+    if not check_environment(required_vars) and not profile_startup:
         print("\n❌ Configuração inválida. Corrija os problemas acima.")
         return 1
     
-    # 2. Verificar Core Engine
+    # Modo multi-processo: este processo só supervisiona; cada worker cria
+    # o próprio engine e roda uma parte dos shards do Discord
+    shard_workers = int(os.getenv('SHARD_WORKERS', '1'))
+    if shard_workers > 1 and platform == 'discord' and not profile_startup:
+        from src.adapters.sharding import ShardSupervisor
+        supervisor = ShardSupervisor(
+            workers=shard_workers,
+            shard_count=int(os.getenv('SHARD_COUNT', '0')) or shard_workers,
+            status_dir=Path(os.getenv('SHARD_STATUS_DIR', str(project_root / 'data' / 'shards'))),
+            # Nos workers o aquecimento é sempre depois de conectar
+            prewarm=os.getenv('ENGINE_PREWARM', 'ready').lower() != 'off'
+        )
+        print(f"\n🧩 Modo multi-processo: {supervisor.workers} workers, {supervisor.shard_count} shards")
+        return await supervisor.run()
+    
+    # 2. Criar e verificar o Core Engine
     print(f"\n🧠 Verificando Core Engine...")
-    engine_status = bot_engine.get_status()
+    with profile.step("Import do engine"):
+        from src.core.bot_engine import get_engine
+        from src.service.client import open_engine
+    if platform == 'engine' or not engine_service:
+        with profile.step("Engine (Gemini)"):
+            bot_engine = get_engine()
+    else:
+        with profile.step("Conexão com o serviço"):
+            try:
+                bot_engine = await open_engine()
+            except ConnectionError as e:
+                print(f"❌ {e}")
+                print("💡 Suba o serviço antes: PLATFORM=engine python src/main.py")
+                return 1
+    engine_status = await bot_engine.fetch_status()
     
     if not engine_status['initialized']:
         print("❌ Core Engine não inicializou corretamente")
         print("💡 Verifique sua GOOGLE_API_KEY no arquivo .env")
-        return 1
+        if not profile_startup:
+            return 1
+    
+    if platform != 'engine':
+        with profile.step("Import do Discord"):
+            from src.adapters.discord_adapter import run_discord_bot
+    
+    # Aquecimento (índice, cache em disco, modelo de embeddings):
+    # - ready: em segundo plano, depois de conectar ao Discord (padrão)
+    # - startup: antes de conectar (o bot só fica online já aquecido)
+    # - off: nada; cada peça carrega na primeira pergunta que precisar
+    prewarm = os.getenv('ENGINE_PREWARM', 'ready').lower()
+    if profile_startup or prewarm == 'startup':
+        with profile.step("Aquecimento do engine"):
+            await bot_engine.warmup()
     
     print("✅ Core Engine pronto!")
     
-    # 3. Escolher plataforma (futuro: poderá escolher Discord, Telegram, etc.)
-    platform = os.getenv('PLATFORM', 'discord').lower()
+    if profile_startup:
+        profile.report()
+        bot_engine.close()
+        return 0
+    
+    # Endpoint de métricas (Prometheus) - só se METRICS_PORT estiver definido
+    metrics_port = int(os.getenv('METRICS_PORT', '0'))
+    if metrics_port:
+        from src.core.metrics import metrics, start_metrics_server
+        metrics_host = os.getenv('METRICS_HOST', '127.0.0.1')
+        await start_metrics_server(metrics, metrics_host, metrics_port)
+        print(f"📈 Métricas em http://{metrics_host}:{metrics_port}/metrics")
     
+    get_logger("main").info("🚀 Inicialização concluída", extra=fields(
+        startup_ms=round(profile.total * 1000, 1), prewarm=prewarm
+    ))
+    
+    # 3. Iniciar a plataforma (futuro: Telegram, Web...)
     print(f"\n🚀 Iniciando adapter: {platform}")
     
-    if platform == 'discord':
+    if platform == 'engine':
+        from src.service.protocol import DEFAULT_ADDRESS
+        from src.service.server import EngineServer
+        server = EngineServer(bot_engine, engine_service or DEFAULT_ADDRESS)
+        warmup_task = None
+        try:
+            await server.start()
+            print(f"🔌 Engine atendendo adapters em {server.address}")
+            if prewarm == 'ready':
+                # Já aceita conexões; quem chegar antes do fim só espera o índice
+                warmup_task = asyncio.create_task(bot_engine.warmup())
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            print("\n👋 Serviço do engine encerrado")
+        finally:
+            if warmup_task is not None:
+                # Encerrado no meio do aquecimento: para antes de fechar o engine
+                warmup_task.cancel()
+                try:
+                    await warmup_task
+                except asyncio.CancelledError:
+                    pass
+                except Exception:
+                    get_logger("main").exception("❌ Falha ao aquecer o engine")
+            await server.close()
+            bot_engine.close()
+    elif platform == 'discord':
         try:
-            await run_discord_bot()
+            await run_discord_bot(bot_engine, prewarm=(prewarm == 'ready'))
         except KeyboardInterrupt:
             print("\n👋 TesseraBot encerrado pelo usuário")
         except Exception as e:
             print(f"\n❌ Erro crítico: {e}")
             return 1
+        finally:
+            bot_engine.close()
     else:
         print(f"❌ Plataforma '{platform}' não suportada ainda")
-        print("💡 Plataformas disponíveis: discord")
+        print("💡 Plataformas disponíveis: discord, engine")
+        bot_engine.close()
         return 1
     
     return 0
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TesseraBot - Assistente Universitário")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Mede o tempo de cada etapa da inicialização e sai (sem conectar ao Discord)"
+    )
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
     """
     Entry point do programa.
@@ -133,7 +303,8 @@ if __name__ == "__main__":
     
     try:
         # Executa a função principal
-        exit_code = asyncio.run(main())
+        args = parse_args()
+        exit_code = asyncio.run(main(profile_startup=args.profile_startup))
         sys.exit(exit_code)
         
     except KeyboardInterrupt:
@@ -0,0 +1 @@
+# Engine Service - o Core Engine como serviço local para vários adapters
\ No newline at end of file
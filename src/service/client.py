@@ -0,0 +1,306 @@
+"""
+Engine Client - O engine de outro processo com a cara do engine local
+
+Os adapters só usam process_message, stream_message, fetch_status e
+warmup. O EngineClient tem esses mesmos métodos, mas manda cada chamada
+para o serviço do engine (ver server.py): o adapter não sabe se o
+engine está no mesmo processo ou não.
+
+Como as chamadas viajam:
+- Um pool pequeno de conexões, abertas uma vez e reaproveitadas
+- Cada conexão leva muitas requisições ao mesmo tempo (ids)
+- Frames enviados no mesmo ciclo do event loop saem num único write
+  (várias perguntas simultâneas = uma syscall, não uma por pergunta)
+- Conexão caiu? As requisições dela falham na hora e a próxima
+  chamada reconecta
+
+Conceitos que você vai aprender aqui:
+- Connection pooling (escolhendo a conexão menos ocupada)
+- Multiplexação: respostas fora de ordem casadas pelo id
+- Coalescência de escritas com loop.call_soon
+"""
+
+import asyncio
+import itertools
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.core.bot_engine import BotResponse, StreamEvent, get_engine
+from src.core.log import fields, get_logger
+from src.service.protocol import (
+    DEFAULT_CODEC,
+    OP_CANCEL,
+    OP_PROCESS,
+    OP_STATUS,
+    OP_STREAM,
+    ProtocolError,
+    encode_frame,
+    parse_address,
+    read_frame,
+    response_from_wire,
+)
+
+logger = get_logger("service")
+
+# Acima disso no buffer de saída, quem envia espera o socket esvaziar
+WRITE_BUFFER_LIMIT = 1024 * 1024
+
+
+class _Connection:
+    """Uma conexão com o serviço e as requisições em andamento nela."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, codec: int, stats: Dict[str, int]):
+        self.reader = reader
+        self.writer = writer
+        self.codec = codec
+        self.closed = False
+        self.pending: Dict[int, asyncio.Queue] = {}
+        self._outgoing: List[bytes] = []
+        self._stats = stats
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    def open_request(self, request_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.pending[request_id] = queue
+        return queue
+
+    def close_request(self, request_id: int):
+        self.pending.pop(request_id, None)
+
+    async def send(self, message: Dict[str, Any]):
+        """Enfileira o frame; todos os frames deste ciclo saem num write só."""
+        if self.closed:
+            raise ConnectionError("Conexão com o engine fechada")
+        if not self._outgoing:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self._outgoing.append(encode_frame(message, self.codec))
+        if self.writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+            await self.writer.drain()
+
+    def _flush(self):
+        if not self._outgoing or self.closed:
+            self._outgoing.clear()
+            return
+        self._stats["writes"] += 1
+        self._stats["frames"] += len(self._outgoing)
+        self.writer.write(b"".join(self._outgoing))
+        self._outgoing.clear()
+
+    async def _read_loop(self):
+        error = "Conexão com o engine encerrada"
+        try:
+            while True:
+                frame = await read_frame(self.reader)
+                if frame is None:
+                    break
+                message, _ = frame
+                queue = self.pending.get(message.get("id"))
+                if queue is not None:
+                    queue.put_nowait(message)
+        except (ProtocolError, ConnectionError, asyncio.IncompleteReadError) as e:
+            error = f"Conexão com o engine perdida: {e}"
+        finally:
+            self.closed = True
+            # Quem está esperando recebe o erro agora, não no timeout
+            for queue in self.pending.values():
+                queue.put_nowait({"error": error, "connection_lost": True})
+            self.writer.close()
+
+    def close(self):
+        self.closed = True
+        self._reader_task.cancel()
+        self.writer.close()
+
+
+class EngineClient:
+    """
+    Cliente do serviço do engine (mesma interface que os adapters usam).
+
+    Uso:
+        engine = EngineClient("unix:data/run/engine.sock")
+        await engine.connect()
+        resposta = await engine.process_message("quando é a matrícula?", contexto)
+    """
+
+    def __init__(self, address: str, pool_size: int = 2, request_timeout: float = 120.0,
+                 connect_timeout: float = 5.0, codec: int = DEFAULT_CODEC):
+        """
+        Args:
+            address: "unix:/caminho/do.sock" ou "host:porta"
+            pool_size: Conexões abertas com o serviço
+            request_timeout: Espera máxima por uma resposta (ou pedaço do stream)
+            connect_timeout: Espera máxima para abrir uma conexão
+            codec: CODEC_MSGPACK (padrão, se instalado) ou CODEC_JSON
+        """
+        self.address = address
+        self.pool_size = max(1, pool_size)
+        self.request_timeout = request_timeout
+        self.connect_timeout = connect_timeout
+        self.codec = codec
+        self._connections: List[_Connection] = []
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._ids = itertools.count(1)
+        self._status: Dict[str, Any] = {}
+        self._stats = {"requests": 0, "connects": 0, "connection_errors": 0, "writes": 0, "frames": 0}
+
+    @property
+    def is_initialized(self) -> bool:
+        return bool(self._status.get("initialized"))
+
+    async def connect(self):
+        """Abre o pool (falha logo se o serviço não estiver de pé) e lê o status."""
+        await self._connection()
+        await self.fetch_status()
+
+    async def _open(self) -> _Connection:
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            opening = asyncio.open_unix_connection(path=target)
+        else:
+            opening = asyncio.open_connection(*target)
+        reader, writer = await asyncio.wait_for(opening, self.connect_timeout)
+        self._stats["connects"] += 1
+        return _Connection(reader, writer, self.codec, self._stats)
+
+    async def _connection(self) -> _Connection:
+        """A conexão viva menos ocupada (abrindo as que faltam no pool)."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        self._connections = [connection for connection in self._connections if not connection.closed]
+        if len(self._connections) < self.pool_size:
+            async with self._connect_lock:
+                self._connections = [connection for connection in self._connections if not connection.closed]
+                while len(self._connections) < self.pool_size:
+                    try:
+                        self._connections.append(await self._open())
+                    except (OSError, asyncio.TimeoutError) as e:
+                        self._stats["connection_errors"] += 1
+                        if not self._connections:
+                            raise ConnectionError(f"Serviço do engine indisponível em {self.address}: {e}") from e
+                        break  # Segue com as que abriram; tenta completar na próxima
+        return min(self._connections, key=lambda connection: len(connection.pending))
+
+    async def _call(self, op: str, **payload) -> Dict[str, Any]:
+        connection = await self._connection()
+        request_id = next(self._ids)
+        queue = connection.open_request(request_id)
+        self._stats["requests"] += 1
+        try:
+            await connection.send({"id": request_id, "op": op, **payload})
+            return await asyncio.wait_for(queue.get(), self.request_timeout)
+        finally:
+            connection.close_request(request_id)
+
+    async def process_message(self, user_message: str, user_context: Dict[str, Any] = None) -> BotResponse:
+        try:
+            reply = await self._call(OP_PROCESS, message=user_message, context=user_context or {})
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            return self._unavailable_response(e)
+        if "response" not in reply:
+            return self._unavailable_response(reply.get("error"))
+        return response_from_wire(reply["response"])
+
+    async def stream_message(self, user_message: str,
+                             user_context: Dict[str, Any] = None) -> AsyncIterator[StreamEvent]:
+        """Os mesmos eventos do TesseraBotEngine.stream_message, vindos do serviço."""
+        try:
+            connection = await self._connection()
+        except ConnectionError as e:
+            yield StreamEvent(response=self._unavailable_response(e))
+            return
+        request_id = next(self._ids)
+        queue = connection.open_request(request_id)
+        self._stats["requests"] += 1
+        finished = False
+        try:
+            try:
+                await connection.send({"id": request_id, "op": OP_STREAM, "message": user_message,
+                                       "context": user_context or {}})
+            except ConnectionError as e:
+                # Conexão caiu agora: o adapter recebe a resposta de erro, não a exceção
+                finished = True
+                yield StreamEvent(response=self._unavailable_response(e))
+                return
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.request_timeout)
+                except asyncio.TimeoutError as e:
+                    finished = True
+                    yield StreamEvent(response=self._unavailable_response(e))
+                    return
+                if "delta" in message:
+                    yield StreamEvent(delta=message["delta"])
+                    continue
+                finished = True
+                if "response" in message:
+                    yield StreamEvent(response=response_from_wire(message["response"]))
+                else:
+                    yield StreamEvent(response=self._unavailable_response(message.get("error")))
+                return
+        finally:
+            connection.close_request(request_id)
+            # Adapter desistiu no meio: o servidor para de gerar
+            if not finished and not connection.closed:
+                try:
+                    await connection.send({"id": request_id, "op": OP_CANCEL})
+                except ConnectionError:
+                    pass
+
+    async def fetch_status(self) -> Dict[str, Any]:
+        """Status do engine remoto (com os números deste cliente em service.client)."""
+        reply = await self._call(OP_STATUS)
+        if "status" not in reply:
+            raise ConnectionError(reply.get("error"))
+        status = reply["status"]
+        status["service"]["client"] = self.get_stats()
+        self._status = status
+        return status
+
+    def get_status(self) -> Dict[str, Any]:
+        """Último status lido (use fetch_status para um atual)."""
+        return self._status
+
+    async def warmup(self):
+        """Nada a fazer: o serviço aquece o próprio engine."""
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        writes = self._stats["writes"]
+        return {
+            **self._stats,
+            "open_connections": sum(1 for connection in self._connections if not connection.closed),
+            "in_flight": sum(len(connection.pending) for connection in self._connections),
+            "frames_per_write": round(self._stats["frames"] / writes, 2) if writes else 0.0,
+        }
+
+    @staticmethod
+    def _unavailable_response(error) -> BotResponse:
+        logger.warning("⚠️ Serviço do engine não respondeu", extra=fields(error=str(error)))
+        return BotResponse(
+            content="Desculpe, tive um problema técnico. Tente novamente em alguns segundos.",
+            error=f"Serviço do engine: {error}"
+        )
+
+
+async def open_engine():
+    """
+    O engine que um adapter deve usar.
+
+    Com ENGINE_SERVICE definido, um EngineClient conectado ao serviço
+    local (PLATFORM=engine em outro processo); sem, o engine no próprio
+    processo, como sempre.
+    """
+    address = os.getenv('ENGINE_SERVICE')
+    if not address:
+        return get_engine()
+    client = EngineClient(
+        address,
+        pool_size=int(os.getenv('ENGINE_SERVICE_POOL', '2')),
+        request_timeout=float(os.getenv('ENGINE_SERVICE_TIMEOUT', '120'))
+    )
+    await client.connect()
+    return client
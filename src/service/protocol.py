@@ -0,0 +1,139 @@
+"""
+Engine Protocol - As mensagens entre os adapters e o serviço do engine
+
+Um engine por máquina atende Discord, Telegram e Web ao mesmo tempo
+(ver server.py e client.py). Cada mensagem trafega num frame:
+
+    [4 bytes: tamanho do payload][1 byte: codec][payload]
+
+    codec 1 = msgpack (binário e compacto, se estiver instalado)
+    codec 0 = JSON (sempre disponível)
+
+O servidor responde no mesmo codec da requisição, então um cliente sem
+msgpack conversa com um servidor que tem (e vice-versa).
+
+Várias requisições dividem a mesma conexão: cada uma leva um "id" e as
+respostas voltam na ordem em que ficam prontas (multiplexação):
+
+    -> {"id": 7, "op": "process", "message": "...", "context": {...}}
+    -> {"id": 8, "op": "stream", "message": "...", "context": {...}}
+    <- {"id": 8, "delta": "As inscrições"}
+    <- {"id": 7, "response": {...}}
+    <- {"id": 8, "response": {...}}          # fim do stream
+
+Conceitos que você vai aprender aqui:
+- Framing com prefixo de tamanho sobre um stream (TCP / Unix socket)
+- Serialização binária (msgpack) com fallback para JSON
+- Multiplexação de requisições por id
+"""
+
+import asyncio
+import json
+import struct
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.bot_engine import BotResponse
+
+try:
+    import msgpack
+except ImportError:  # Opcional: sem ele tudo funciona em JSON
+    msgpack = None
+
+# Cabeçalho do frame: tamanho (uint32) + codec (uint8)
+HEADER = struct.Struct("!IB")
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+# Codec preferido: o mais compacto disponível
+DEFAULT_CODEC = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+
+# Nenhuma mensagem legítima chega perto disso (o status é a maior)
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# Endereço padrão: um Unix socket dentro de data/ (só processos desta máquina)
+DEFAULT_ADDRESS = f"unix:{Path(__file__).resolve().parents[2] / 'data' / 'run' / 'engine.sock'}"
+
+# Operações aceitas pelo servidor
+OP_PROCESS = "process"
+OP_STREAM = "stream"
+OP_STATUS = "status"
+OP_CANCEL = "cancel"
+OP_PING = "ping"
+
+
+class ProtocolError(Exception):
+    """Frame inválido (tamanho, codec ou conteúdo)."""
+
+
+def encode_frame(message: Dict[str, Any], codec: int = DEFAULT_CODEC) -> bytes:
+    if codec == CODEC_MSGPACK:
+        payload = msgpack.packb(message, use_bin_type=True, default=str)
+    else:
+        payload = json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(payload) > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Mensagem grande demais: {len(payload)} bytes")
+    return HEADER.pack(len(payload), codec) + payload
+
+
+def decode_payload(payload: bytes, codec: int) -> Dict[str, Any]:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ProtocolError("Frame em msgpack, mas o msgpack não está instalado")
+        message = msgpack.unpackb(payload, raw=False)
+    elif codec == CODEC_JSON:
+        message = json.loads(payload)
+    else:
+        raise ProtocolError(f"Codec desconhecido: {codec}")
+    if not isinstance(message, dict):
+        raise ProtocolError("Mensagem não é um objeto")
+    return message
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Lê um frame inteiro.
+
+    Returns:
+        (mensagem, codec) ou None se a conexão foi fechada entre frames
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ProtocolError("Conexão fechada no meio do cabeçalho") from e
+    size, codec = HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame grande demais: {size} bytes")
+    payload = await reader.readexactly(size)
+    return decode_payload(payload, codec), codec
+
+
+def response_to_wire(response: BotResponse) -> Dict[str, Any]:
+    data = asdict(response)
+    data["timestamp"] = response.timestamp.isoformat()
+    return data
+
+
+def response_from_wire(data: Dict[str, Any]) -> BotResponse:
+    data = dict(data)
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"]) if data.get("timestamp") else None
+    return BotResponse(**data)
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """
+    Endereço do serviço -> ("unix", caminho) ou ("tcp", (host, porta)).
+
+    Formatos: "unix:data/run/engine.sock" ou "127.0.0.1:8765".
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"Endereço do engine inválido: {address!r} (use unix:/caminho ou host:porta)")
+    return "tcp", (host or "127.0.0.1", int(port))
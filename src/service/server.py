@@ -0,0 +1,166 @@
+"""
+Engine Server - Um engine por máquina, vários adapters
+
+Cada adapter (Discord, Telegram, Web) criando o próprio TesseraBotEngine
+duplica cliente do Gemini, caches em memória e índice carregado. Com
+PLATFORM=engine, o main.py sobe só o engine e este servidor; os adapters
+rodam em outros processos e falam com ele por um Unix socket (ou
+localhost) usando o EngineClient (ver client.py).
+
+Por conexão:
+- Cada requisição vira uma task: uma pergunta lenta não segura as outras
+- As respostas são escritas sob um lock (frames nunca se misturam)
+- Cliente desconectou? As tasks dele são canceladas
+
+Conceitos que você vai aprender aqui:
+- asyncio.start_unix_server / start_server
+- Uma task por requisição numa conexão multiplexada
+- Cancelamento propagado do cliente até o engine
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.log import fields, get_logger
+from src.service.protocol import (
+    OP_CANCEL,
+    OP_PING,
+    OP_PROCESS,
+    OP_STATUS,
+    OP_STREAM,
+    ProtocolError,
+    encode_frame,
+    parse_address,
+    read_frame,
+    response_to_wire,
+)
+
+logger = get_logger("service")
+
+
+class EngineServer:
+    """
+    Expõe um TesseraBotEngine para outros processos.
+
+    Uso:
+        server = EngineServer(engine, "unix:data/run/engine.sock")
+        await server.start()
+        await server.serve_forever()
+    """
+
+    def __init__(self, engine, address: str):
+        """
+        Args:
+            engine: O engine que atende todos os adapters
+            address: "unix:/caminho/do.sock" ou "host:porta" (use localhost:
+                o protocolo não tem autenticação)
+        """
+        self.engine = engine
+        self.address = address
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = 0
+        self._stats = {"connections": 0, "requests": 0, "streams": 0, "cancelled": 0, "errors": 0}
+
+    async def start(self):
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            path = Path(target)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                path.unlink()  # Socket de uma execução anterior
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=str(path))
+            os.chmod(path, 0o660)  # Só o usuário (e o grupo) do bot conectam
+        else:
+            host, port = target
+            self._server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        logger.info("🔌 Serviço do engine ouvindo", extra=fields(address=self.address))
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        kind, target = parse_address(self.address)
+        if kind == "unix" and Path(target).exists():
+            Path(target).unlink()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "open_connections": self._connections, "address": self.address}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections += 1
+        self._stats["connections"] += 1
+        write_lock = asyncio.Lock()
+        tasks: Dict[Any, asyncio.Task] = {}
+
+        async def send(message: Dict[str, Any], codec: int):
+            frame = encode_frame(message, codec)
+            async with write_lock:
+                writer.write(frame)
+                await writer.drain()
+
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                message, codec = frame
+                request_id = message.get("id")
+                if message.get("op") == OP_CANCEL:
+                    task = tasks.get(request_id)
+                    if task is not None:
+                        task.cancel()
+                    continue
+                task = asyncio.create_task(self._handle_request(message, codec, send))
+                tasks[request_id] = task
+                task.add_done_callback(lambda _, request_id=request_id: tasks.pop(request_id, None))
+        except (ProtocolError, ConnectionError, asyncio.IncompleteReadError) as e:
+            self._stats["errors"] += 1
+            logger.warning("⚠️ Conexão de adapter encerrada com erro: %s", e)
+        finally:
+            self._connections -= 1
+            # Ninguém mais vai ler essas respostas
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(self, message: Dict[str, Any], codec: int, send):
+        request_id = message.get("id")
+        op = message.get("op")
+        self._stats["requests"] += 1
+        try:
+            if op == OP_PROCESS:
+                response = await self.engine.process_message(message["message"], message.get("context") or {})
+                await send({"id": request_id, "response": response_to_wire(response)}, codec)
+            elif op == OP_STREAM:
+                self._stats["streams"] += 1
+                async for event in self.engine.stream_message(message["message"], message.get("context") or {}):
+                    if event.done:
+                        await send({"id": request_id, "response": response_to_wire(event.response)}, codec)
+                    else:
+                        await send({"id": request_id, "delta": event.delta}, codec)
+            elif op == OP_STATUS:
+                status = await self.engine.fetch_status()
+                await send({"id": request_id, "status": {**status, "service": self.get_stats()}}, codec)
+            elif op == OP_PING:
+                await send({"id": request_id, "pong": time.time()}, codec)
+            else:
+                await send({"id": request_id, "error": f"Operação desconhecida: {op}"}, codec)
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            raise
+        except (ConnectionError, RuntimeError):
+            pass  # Cliente foi embora no meio da resposta
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.exception("❌ Erro no serviço do engine", extra=fields(op=op))
+            try:
+                await send({"id": request_id, "error": str(e)}, codec)
+            except (ConnectionError, RuntimeError):
+                pass